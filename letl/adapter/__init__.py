@@ -1,4 +1,9 @@
 from letl.adapter import db
+from letl.adapter.cached_status_repo import *
+from letl.adapter.db_lease_repo import *
 from letl.adapter.db_log_repo import *
 from letl.adapter.db_status_repo import *
+from letl.adapter.mp_resource_limiter import *
+from letl.adapter.priority_set_queue import *
 from letl.adapter.set_queue import *
+from letl.adapter.segment_log_repo import *
@@ -0,0 +1,150 @@
+import contextlib
+import dataclasses
+import datetime
+import threading
+import time
+import typing
+
+from letl import domain
+
+__all__ = ("CachedStatusRepo",)
+
+
+class CachedStatusRepo(domain.StatusRepo):
+    def __init__(
+        self,
+        *,
+        repo: domain.StatusRepo,
+        revalidate_seconds: typing.Optional[float] = None,
+    ):
+        """Write-through cache in front of another StatusRepo
+
+        Parameters
+        ----------
+        repo
+            StatusRepo that the cache writes through to
+        revalidate_seconds
+            Reload the cache from repo after this many seconds, so changes made by other
+            processes sharing the database are picked up.  None means never reload.
+        """
+        self._repo = repo
+        self._revalidate_seconds = revalidate_seconds
+
+        self._lock = threading.RLock()
+        self._cache: typing.Dict[str, domain.JobStatus] = {}
+        self._last_loaded: typing.Optional[float] = None
+
+    def all(self) -> typing.Set[domain.JobStatus]:
+        with self._lock:
+            return set(self._statuses().values())
+
+    def done(
+        self,
+        *,
+        job_name: str,
+        metrics: typing.Optional[domain.RunMetrics] = None,
+    ) -> None:
+        with self._invalidate_on_error():
+            self._repo.done(job_name=job_name, metrics=metrics)
+        self._update(job_name=job_name, status=domain.Status.Success)
+
+    def error(
+        self,
+        *,
+        job_name: str,
+        error: str,
+        metrics: typing.Optional[domain.RunMetrics] = None,
+    ) -> None:
+        with self._invalidate_on_error():
+            self._repo.error(job_name=job_name, error=error, metrics=metrics)
+        self._update(job_name=job_name, status=domain.Status.Error, error_message=error)
+
+    def skipped(
+        self,
+        *,
+        job_name: str,
+        reason: str,
+        metrics: typing.Optional[domain.RunMetrics] = None,
+    ) -> None:
+        with self._invalidate_on_error():
+            self._repo.skipped(job_name=job_name, reason=reason, metrics=metrics)
+        self._update(
+            job_name=job_name, status=domain.Status.Skipped, skipped_reason=reason
+        )
+
+    def start(self, *, job_name: str) -> None:
+        self._repo.start(job_name=job_name)
+        with self._lock:
+            self._statuses()[job_name] = domain.JobStatus.running(job_name=job_name)
+
+    def delete(self, *, job_name: str) -> None:
+        self._repo.delete(job_name=job_name)
+        with self._lock:
+            self._statuses().pop(job_name, None)
+
+    def delete_before(self, /, ts: datetime.datetime) -> None:
+        self._repo.delete_before(ts)
+        with self._lock:
+            statuses = self._statuses()
+            for job_name, status in list(statuses.items()):
+                if status.started <= ts:
+                    del statuses[job_name]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._last_loaded = None
+
+    @contextlib.contextmanager
+    def _invalidate_on_error(self) -> typing.Generator[None, None, None]:
+        # the write may have partly succeeded, so the cache is reloaded instead of guessed
+        try:
+            yield
+        except:
+            self.invalidate()
+            raise
+
+    def status(self, *, job_name: str) -> typing.Optional[domain.JobStatus]:
+        with self._lock:
+            return self._statuses().get(job_name)
+
+    def status_map(
+        self, *, job_names: typing.AbstractSet[str]
+    ) -> typing.Dict[str, domain.JobStatus]:
+        with self._lock:
+            statuses = self._statuses()
+            return {
+                job_name: statuses[job_name]
+                for job_name in job_names
+                if job_name in statuses
+            }
+
+    def _statuses(self) -> typing.Dict[str, domain.JobStatus]:
+        now = time.monotonic()
+        if (
+            self._last_loaded is None
+            or self._revalidate_seconds is not None
+            and now - self._last_loaded >= self._revalidate_seconds
+        ):
+            self._cache = {s.job_name: s for s in self._repo.all()}
+            self._last_loaded = now
+        return self._cache
+
+    def _update(
+        self,
+        *,
+        job_name: str,
+        status: domain.Status,
+        error_message: typing.Optional[str] = None,
+        skipped_reason: typing.Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            statuses = self._statuses()
+            # mirror the repo: updates to a job that was never started are ignored
+            if current := statuses.get(job_name):
+                statuses[job_name] = dataclasses.replace(
+                    current,
+                    status=status,
+                    ended=datetime.datetime.now(),
+                    error_message=error_message or current.error_message,
+                    skipped_reason=skipped_reason or current.skipped_reason,
+                )
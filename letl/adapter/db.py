@@ -1,7 +1,10 @@
 import sqlalchemy as sa
 
+from letl import domain
+
 __all__ = (
     "create_tables",
+    "lease",
     "log",
     "status",
 )
@@ -11,6 +14,15 @@ SCHEMA = "letl"
 metadata = sa.MetaData(schema=SCHEMA)
 
 
+lease = sa.Table(
+    "lease",
+    metadata,
+    sa.Column("job_name", sa.String, primary_key=True),
+    sa.Column("node_id", sa.String, nullable=False),
+    sa.Column("acquired", sa.DateTime, nullable=False),
+    sa.Column("expires", sa.DateTime, nullable=False),
+)
+
 log = sa.Table(
     "log",
     metadata,
@@ -41,6 +53,12 @@ job_history = sa.Table(
     sa.Column("ended", sa.DateTime, nullable=True),
     sa.Column("error_message", sa.String, nullable=True),
     sa.Column("skipped_reason", sa.String, nullable=True),
+    sa.Column("cpu_user_seconds", sa.Float, nullable=True),
+    sa.Column("cpu_system_seconds", sa.Float, nullable=True),
+    sa.Column("peak_rss_mb", sa.Float, nullable=True),
+    sa.Column("read_bytes", sa.BigInteger, nullable=True),
+    sa.Column("write_bytes", sa.BigInteger, nullable=True),
+    sa.Column("queue_wait_seconds", sa.Float, nullable=True),
 )
 
 status = sa.Table(
@@ -60,3 +78,27 @@ def create_tables(*, engine: sa.engine.Engine, recreate: bool = False) -> None:
         if recreate:
             metadata.drop_all(con)
         metadata.create_all(con)
+        add_missing_columns(con=con, table=job_history)
+
+
+def add_missing_columns(*, con: sa.engine.Connection, table: sa.Table) -> None:
+    """Add the nullable columns that a table created by an earlier version is missing
+
+    create_all skips tables that already exist, so columns added to a table since it was
+    created have to be added separately.
+    """
+    columns = sa.inspect(con).get_columns(table.name, schema=SCHEMA)
+    existing = {col["name"] for col in columns}
+    preparer = con.dialect.identifier_preparer
+    for col in table.columns:
+        if col.name in existing:
+            continue
+        if not col.nullable:
+            raise domain.error.MissingColumn(table=table.fullname, column=col.name)
+        col_type = col.type.compile(dialect=con.dialect)
+        con.execute(
+            sa.text(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.quote(col.name)} {col_type}"
+            )
+        )
@@ -0,0 +1,98 @@
+import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from letl import domain
+from letl.adapter import db
+
+__all__ = ("DbLeaseRepo",)
+
+
+class DbLeaseRepo(domain.LeaseRepo):
+    def __init__(self, *, engine: sa.engine.Engine):
+        """Leases stored in the ETL database, so that nodes sharing it don't run the same job
+
+        Lease times come from each node's clock, so the nodes' clocks should be kept in sync.
+        """
+        self._engine = engine
+
+    def claim(self, *, job_name: str, node_id: str, seconds: float) -> bool:
+        now = datetime.datetime.now()
+        expires = now + datetime.timedelta(seconds=seconds)
+        if self._engine.dialect.name == "postgresql":
+            return self._claim_skip_locked(
+                job_name=job_name, node_id=node_id, now=now, expires=expires
+            )
+        else:
+            return self._claim_conditional_update(
+                job_name=job_name, node_id=node_id, now=now, expires=expires
+            )
+
+    def release(self, *, job_name: str, node_id: str) -> None:
+        with self._engine.begin() as con:
+            con.execute(
+                db.lease.update()
+                .where(db.lease.c.job_name == job_name)
+                .where(db.lease.c.node_id == node_id)
+                .values(expires=datetime.datetime.now())
+            )
+
+    def _claim_conditional_update(
+        self,
+        *,
+        job_name: str,
+        node_id: str,
+        now: datetime.datetime,
+        expires: datetime.datetime,
+    ) -> bool:
+        # the database serializes the updates, so only one node sees its update match the row
+        with self._engine.begin() as con:
+            result = con.execute(
+                db.lease.update()
+                .where(db.lease.c.job_name == job_name)
+                .where(db.lease.c.expires <= now)
+                .values(node_id=node_id, acquired=now, expires=expires)
+            )
+            if result.rowcount:
+                return True
+        try:
+            with self._engine.begin() as con:
+                con.execute(
+                    db.lease.insert().values(
+                        job_name=job_name, node_id=node_id, acquired=now, expires=expires
+                    )
+                )
+            return True
+        except sa.exc.IntegrityError:
+            return False
+
+    def _claim_skip_locked(
+        self,
+        *,
+        job_name: str,
+        node_id: str,
+        now: datetime.datetime,
+        expires: datetime.datetime,
+    ) -> bool:
+        with self._engine.begin() as con:
+            con.execute(
+                postgresql.insert(db.lease)
+                .values(job_name=job_name, node_id=node_id, acquired=now, expires=now)
+                .on_conflict_do_nothing(index_elements=[db.lease.c.job_name])
+            )
+        with self._engine.begin() as con:
+            # a row locked by another node means it is claiming the job right now
+            row = con.execute(
+                db.lease.select()
+                .where(db.lease.c.job_name == job_name)
+                .with_for_update(skip_locked=True)
+            ).first()
+            if row is None or row.expires > now:
+                return False
+            con.execute(
+                db.lease.update()
+                .where(db.lease.c.job_name == job_name)
+                .values(node_id=node_id, acquired=now, expires=expires)
+            )
+            return True
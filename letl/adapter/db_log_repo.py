@@ -31,6 +31,24 @@ class DbLogRepo(domain.LogRepo):
             )
             con.execute(stmt)
 
+    def add_many(self, /, messages: typing.Sequence[domain.LogMessage]) -> None:
+        if not messages:
+            return
+        with self._engine.begin() as con:
+            # a list of parameter sets is sent with executemany
+            con.execute(
+                db.log.insert(),
+                [
+                    {
+                        "name": msg.logger_name,
+                        "level": str(msg.level),
+                        "message": msg.message,
+                        "ts": msg.ts,
+                    }
+                    for msg in messages
+                ],
+            )
+
     def delete_before(self, /, ts: datetime.datetime) -> None:
         with self._engine.begin() as con:
             con.execute(db.log.delete().where(db.log.c.ts < ts))
@@ -19,7 +19,12 @@ class DbStatusRepo(domain.StatusRepo):
                 map_row_to_domain(row=row) for row in con.execute(db.status.select())
             }
 
-    def done(self, *, job_name: str) -> None:
+    def done(
+        self,
+        *,
+        job_name: str,
+        metrics: typing.Optional[domain.RunMetrics] = None,
+    ) -> None:
         with self._engine.begin() as con:
             con.execute(
                 db.status.update()
@@ -29,9 +34,15 @@ class DbStatusRepo(domain.StatusRepo):
                     ended=datetime.datetime.now(),
                 )
             )
-        append_to_history(engine=self._engine, job_name=job_name)
-
-    def error(self, *, job_name: str, error: str) -> None:
+        append_to_history(engine=self._engine, job_name=job_name, metrics=metrics)
+
+    def error(
+        self,
+        *,
+        job_name: str,
+        error: str,
+        metrics: typing.Optional[domain.RunMetrics] = None,
+    ) -> None:
         with self._engine.begin() as con:
             con.execute(
                 db.status.update()
@@ -42,9 +53,15 @@ class DbStatusRepo(domain.StatusRepo):
                     ended=datetime.datetime.now(),
                 )
             )
-        append_to_history(engine=self._engine, job_name=job_name)
-
-    def skipped(self, *, job_name: str, reason: str) -> None:
+        append_to_history(engine=self._engine, job_name=job_name, metrics=metrics)
+
+    def skipped(
+        self,
+        *,
+        job_name: str,
+        reason: str,
+        metrics: typing.Optional[domain.RunMetrics] = None,
+    ) -> None:
         with self._engine.begin() as con:
             con.execute(
                 db.status.update()
@@ -55,7 +72,7 @@ class DbStatusRepo(domain.StatusRepo):
                     ended=datetime.datetime.now(),
                 )
             )
-        append_to_history(engine=self._engine, job_name=job_name)
+        append_to_history(engine=self._engine, job_name=job_name, metrics=metrics)
 
     def start(self, *, job_name: str) -> None:
         with self._engine.begin() as con:
@@ -97,8 +114,32 @@ class DbStatusRepo(domain.StatusRepo):
             else:
                 return None
 
+    def status_map(
+        self, *, job_names: typing.AbstractSet[str]
+    ) -> typing.Dict[str, domain.JobStatus]:
+        if not job_names:
+            return {}
+
+        with self._engine.begin() as con:
+            # fmt: off
+            stmt = (
+                db.status
+                .select()
+                .where(db.status.c.job_name.in_(sorted(job_names)))
+            )
+            # fmt: on
+            return {
+                row.job_name: map_row_to_domain(row=row) for row in con.execute(stmt)
+            }
+
 
-def append_to_history(*, engine: sa.engine.Engine, job_name: str) -> None:
+def append_to_history(
+    *,
+    engine: sa.engine.Engine,
+    job_name: str,
+    metrics: typing.Optional[domain.RunMetrics] = None,
+) -> None:
+    metrics = metrics or domain.RunMetrics()
     with engine.begin() as con:
         result = con.execute(
             db.status.select().where(db.status.c.job_name == job_name)
@@ -112,6 +153,12 @@ def append_to_history(*, engine: sa.engine.Engine, job_name: str) -> None:
                     ended=result.ended,
                     skipped_reason=result.skipped_reason,
                     error_message=result.error_message,
+                    cpu_user_seconds=metrics.cpu_user_seconds,
+                    cpu_system_seconds=metrics.cpu_system_seconds,
+                    peak_rss_mb=metrics.peak_rss_mb,
+                    read_bytes=metrics.read_bytes,
+                    write_bytes=metrics.write_bytes,
+                    queue_wait_seconds=metrics.queue_wait_seconds,
                 )
             )
 
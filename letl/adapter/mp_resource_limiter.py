@@ -0,0 +1,69 @@
+import multiprocessing as mp
+import time
+import typing
+
+from letl import domain
+
+__all__ = ("MpResourceLimiter",)
+
+
+class MpResourceLimiter(domain.ResourceLimiter):
+    def __init__(self, *, resources: typing.Iterable[domain.Resource[typing.Any]]):
+        """ResourceLimiter backed by multiprocessing primitives
+
+        Only the main process should take slots.  A process killed while holding a semaphore
+        or the token bucket's lock would never release it.
+        """
+        self._semaphores: typing.Dict[str, typing.Any] = {}
+        self._buckets: typing.Dict[str, TokenBucket] = {}
+        for res in resources:
+            if res.max_concurrent is not None:
+                self._semaphores[res.key] = mp.BoundedSemaphore(res.max_concurrent)
+            if res.max_per_second is not None:
+                self._buckets[res.key] = TokenBucket(
+                    per_second=res.max_per_second, burst=res.burst
+                )
+
+    def acquire(self, /, key: str, *, block: bool = True) -> bool:
+        semaphore = self._semaphores.get(key)
+        if semaphore is not None and not semaphore.acquire(block=block):
+            return False
+        bucket = self._buckets.get(key)
+        if bucket is not None and not bucket.take(block=block):
+            if semaphore is not None:
+                semaphore.release()
+            return False
+        return True
+
+    def release(self, /, key: str) -> None:
+        semaphore = self._semaphores.get(key)
+        if semaphore is not None:
+            semaphore.release()
+
+
+class TokenBucket:
+    def __init__(self, *, per_second: float, burst: int):
+        self._per_second = per_second
+        self._burst = burst
+
+        self._lock = mp.Lock()
+        self._tokens = mp.Value("d", float(burst), lock=False)
+        # CLOCK_MONOTONIC is shared by every process on the machine
+        self._last_refill = mp.Value("d", time.monotonic(), lock=False)
+
+    def take(self, *, block: bool = True) -> bool:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens.value = min(
+                    self._burst,
+                    self._tokens.value + (now - self._last_refill.value) * self._per_second,
+                )
+                self._last_refill.value = now
+                if self._tokens.value >= 1:
+                    self._tokens.value -= 1
+                    return True
+                seconds_until_next_token = (1 - self._tokens.value) / self._per_second
+            if not block:
+                return False
+            time.sleep(seconds_until_next_token)
@@ -0,0 +1,57 @@
+import datetime
+import heapq
+import itertools
+import queue
+import typing
+
+from letl import domain
+
+__all__ = ("PrioritySetQueue",)
+
+
+class PrioritySetQueue(queue.Queue):  # type: ignore
+    def __init__(
+        self,
+        maxsize: int = 0,
+        *,
+        due_since: typing.Optional[
+            typing.Callable[[domain.Job], typing.Optional[datetime.datetime]]
+        ] = None,
+    ):
+        """Hands out the highest priority job first and ignores jobs that are already queued
+
+        Jobs with the same priority come out most overdue first, i.e., the one that became due
+        earliest.  due_since is called when a job is added, usually Dispatcher.due_since, and
+        jobs it has no due time for count as due since they were added.
+        """
+        self._due_since = due_since
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        self.queue: typing.List[
+            typing.Tuple[int, datetime.datetime, int, domain.Job]
+        ] = []
+        self._queued: typing.Set[domain.Job] = set()
+        self._counter = itertools.count()
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _put(self, item: domain.Job) -> None:
+        if item not in self._queued:
+            self._queued.add(item)
+            due_since = self._due_since(item) if self._due_since else None
+            heapq.heappush(
+                self.queue,
+                (
+                    -item.priority,
+                    due_since or datetime.datetime.now(),
+                    next(self._counter),
+                    item,
+                ),
+            )
+
+    def _get(self) -> domain.Job:
+        _, _, _, item = heapq.heappop(self.queue)
+        self._queued.discard(item)
+        return item
@@ -0,0 +1,199 @@
+import datetime
+import gzip
+import json
+import os
+import pathlib
+import threading
+import time
+import typing
+
+from letl import domain
+from letl.domain import log_level
+
+__all__ = ("SegmentLogRepo", "read_segment")
+
+OPEN_SUFFIX = ".open"
+
+
+class SegmentLogRepo(domain.LogRepo):
+    def __init__(
+        self,
+        *,
+        folder: typing.Union[str, pathlib.Path],
+        max_segment_bytes: int = 16 * 1024 * 1024,
+        max_segment_seconds: float = 60,
+        fsync_seconds: float = 1,
+        compress: bool = False,
+    ):
+        """Appends log messages to local segment files, one JSON object per line
+
+        Messages go to the open segment, whose name ends in .open, until it holds
+        max_segment_bytes or is max_segment_seconds old.  It is then closed by renaming it,
+        and closed segments are left for a LogShipper to load into the database.  Writes are
+        flushed after every batch, but fsynced at most once every fsync_seconds.
+        """
+        self._folder = pathlib.Path(folder)
+        self._max_segment_bytes = max_segment_bytes
+        self._max_segment_seconds = max_segment_seconds
+        self._fsync_seconds = fsync_seconds
+        self._compress = compress
+
+        self._lock = threading.Lock()
+        # with compression, the gzip writer wraps the segment file
+        self._file: typing.Optional[typing.BinaryIO] = None
+        self._writer: typing.Optional[typing.BinaryIO] = None
+        self._path: typing.Optional[pathlib.Path] = None
+        self._opened_at = 0.0
+        self._synced_at = 0.0
+        self._bytes_written = 0
+        self._sequence = 0
+
+        self._folder.mkdir(parents=True, exist_ok=True)
+        # segments left open by a previous run are complete up to their last fsync
+        for path in self._folder.glob(f"*{OPEN_SUFFIX}"):
+            path.rename(path.with_name(path.name[: -len(OPEN_SUFFIX)]))
+
+    def add(
+        self,
+        *,
+        name: str,
+        level: log_level.LogLevel,
+        message: str,
+        ts: typing.Optional[datetime.datetime] = None,
+    ) -> None:
+        self.add_many(
+            [
+                domain.LogMessage(
+                    logger_name=name,
+                    level=level,
+                    message=message,
+                    ts=ts or datetime.datetime.now(),
+                )
+            ]
+        )
+
+    def add_many(self, /, messages: typing.Sequence[domain.LogMessage]) -> None:
+        if not messages:
+            return
+        data = b"".join(encode(msg) for msg in messages)
+        with self._lock:
+            writer = self._open_segment()
+            writer.write(data)
+            writer.flush()
+            self._bytes_written += len(data)
+            now = time.monotonic()
+            if self._file is not None and now - self._synced_at >= self._fsync_seconds:
+                os.fsync(self._file.fileno())
+                self._synced_at = now
+            if self._bytes_written >= self._max_segment_bytes:
+                self._close_segment()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+    def closed_segments(self) -> typing.List[pathlib.Path]:
+        """The closed segments, oldest first"""
+        return sorted(
+            path
+            for path in self._folder.glob("*.jsonl*")
+            if not path.name.endswith(OPEN_SUFFIX)
+        )
+
+    def delete_before(self, /, ts: datetime.datetime) -> None:
+        cutoff = ts.timestamp()
+        for path in self.closed_segments():
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+
+    def rotate_if_stale(self) -> None:
+        """Close the open segment if it is older than max_segment_seconds"""
+        with self._lock:
+            if (
+                self._writer is not None
+                and time.monotonic() - self._opened_at >= self._max_segment_seconds
+            ):
+                self._close_segment()
+
+    def _close_segment(self) -> None:
+        if self._file is None or self._writer is None or self._path is None:
+            return
+        if self._writer is not self._file:
+            # writes the gzip trailer, but leaves the segment file open
+            self._writer.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._path.rename(self._path.with_name(self._path.name[: -len(OPEN_SUFFIX)]))
+        self._file = None
+        self._writer = None
+        self._path = None
+
+    def _open_segment(self) -> typing.BinaryIO:
+        now = time.monotonic()
+        if self._writer is not None and now - self._opened_at >= self._max_segment_seconds:
+            self._close_segment()
+        if self._writer is None:
+            self._sequence += 1
+            # names sort in the order the segments were opened
+            name = (
+                f"{datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+                f"-{os.getpid()}-{self._sequence:06d}.jsonl"
+            )
+            if self._compress:
+                name += ".gz"
+            self._path = self._folder / f"{name}{OPEN_SUFFIX}"
+            self._file = open(self._path, "ab")
+            if self._compress:
+                self._writer = typing.cast(
+                    typing.BinaryIO, gzip.GzipFile(fileobj=self._file, mode="ab")
+                )
+            else:
+                self._writer = self._file
+            self._opened_at = now
+            self._synced_at = now
+            self._bytes_written = 0
+        return self._writer
+
+
+def encode(msg: domain.LogMessage, /) -> bytes:
+    return (
+        json.dumps(
+            {
+                "name": msg.logger_name,
+                "level": str(msg.level),
+                "message": msg.message,
+                "ts": msg.ts.isoformat(),
+            }
+        )
+        + "\n"
+    ).encode()
+
+
+def read_segment(path: pathlib.Path, /) -> typing.List[domain.LogMessage]:
+    """Read the messages in a closed segment
+
+    A segment that was open when its process died can end in a partial line, or be missing
+    its gzip trailer, so reading stops at the first line that can't be decoded.
+    """
+    f: typing.Union[gzip.GzipFile, typing.BinaryIO]
+    if path.name.endswith(".gz"):
+        f = gzip.open(path, "rb")
+    else:
+        f = open(path, "rb")
+    messages = []
+    try:
+        with f:
+            for line in f:
+                row = json.loads(line)
+                messages.append(
+                    domain.LogMessage(
+                        logger_name=row["name"],
+                        level=domain.LogLevel(row["level"]),
+                        message=row["message"],
+                        ts=datetime.datetime.fromisoformat(row["ts"]),
+                    )
+                )
+    except (EOFError, OSError, ValueError, KeyError):
+        pass
+    return messages
@@ -1,17 +1,30 @@
 from letl.domain import error
+from letl.domain.backoff import *
 from letl.domain.cfg import *
+from letl.domain.cron import *
+from letl.domain.execution_mode import *
 from letl.domain.interval import *
 from letl.domain.job import *
+from letl.domain.job_graph import *
 from letl.domain.job_result import *
 from letl.domain.job_status import *
+from letl.domain.lease_repo import *
 from letl.domain.log import *
 from letl.domain.log_level import *
 from letl.domain.log_message import *
+from letl.domain.log_overflow_policy import *
 from letl.domain.log_repo import *
 from letl.domain.logger import *
+from letl.domain.queue_type import *
 from letl.domain.resource import *
+from letl.domain.resource_limiter import *
 from letl.domain.resource_manager import *
+from letl.domain.resource_pool import *
+from letl.domain.run_metrics import *
 from letl.domain.schedule import *
+from letl.domain.schedule_window import *
 from letl.domain.scheduler import *
+from letl.domain.scheduler_mode import *
 from letl.domain.status import *
 from letl.domain.status_repo import *
+from letl.domain.weekday import *
@@ -0,0 +1,24 @@
+import dataclasses
+import random
+
+__all__ = ("Backoff",)
+
+
+@dataclasses.dataclass(frozen=True)
+class Backoff:
+    """How long to wait before retrying a failed job
+
+    The delay grows by factor with each failed attempt, up to max_seconds, and is then randomly
+    shortened by up to jitter (a fraction of the delay) so that jobs that failed together don't
+    all retry at the same moment.
+    """
+
+    base_seconds: float = 5.0
+    factor: float = 2.0
+    max_seconds: float = 300.0
+    jitter: float = 0.1
+
+    def delay(self, *, attempt: int) -> float:
+        """Seconds to wait before retrying after the attempt-th failure (starting at 1)"""
+        delay = min(self.base_seconds * self.factor ** (attempt - 1), self.max_seconds)
+        return delay * (1 - self.jitter * random.random())
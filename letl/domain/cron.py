@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import typing
+
+from letl.domain import error
+from letl.domain.schedule_window import first_of_next_month, next_set_bit
+
+__all__ = ("CronExpression",)
+
+MONTH_NAMES = {
+    name: i
+    for i, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"),
+        start=1,
+    )
+}
+WEEKDAY_NAMES = {
+    name: i for i, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class CronExpression:
+    """A 5-field cron expression (minute hour day-of-month month day-of-week) parsed to bitsets
+
+    Bit n of each mask is set when the field allows the value n, except months and monthdays,
+    which are shifted down by one so that bit 0 is January and the 1st respectively.  Weekdays
+    use cron numbering, 0 = Sunday.
+    """
+
+    expression: str
+    minutes: int
+    hours: int
+    monthdays: int
+    months: int
+    weekdays: int
+    monthdays_restricted: bool
+    weekdays_restricted: bool
+
+    @staticmethod
+    def parse(expression: str, /) -> CronExpression:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise error.InvalidCronExpression(
+                expression=expression,
+                reason=f"expected 5 fields, but got {len(fields)}",
+            )
+        minute, hour, monthday, month, weekday = fields
+        weekdays = parse_field(expression, weekday, 0, 7, WEEKDAY_NAMES)
+        # 7 is an alias for Sunday
+        if weekdays & (1 << 7):
+            weekdays = (weekdays | 1) & ~(1 << 7)
+        parsed = CronExpression(
+            expression=expression,
+            minutes=parse_field(expression, minute, 0, 59),
+            hours=parse_field(expression, hour, 0, 23),
+            monthdays=parse_field(expression, monthday, 1, 31) >> 1,
+            months=parse_field(expression, month, 1, 12, MONTH_NAMES) >> 1,
+            weekdays=weekdays,
+            monthdays_restricted=monthday != "*",
+            weekdays_restricted=weekday != "*",
+        )
+        if parsed.next_fire(datetime.datetime(2000, 1, 1)) is None:
+            raise error.InvalidCronExpression(
+                expression=expression, reason="it never fires"
+            )
+        return parsed
+
+    def matches(self, ts: datetime.datetime, /) -> bool:
+        return (
+            bool(self.months >> (ts.month - 1) & 1)
+            and self.day_matches(ts)
+            and bool(self.hours >> ts.hour & 1)
+            and bool(self.minutes >> ts.minute & 1)
+        )
+
+    def day_matches(self, ts: datetime.datetime, /) -> bool:
+        monthday = bool(self.monthdays >> (ts.day - 1) & 1)
+        weekday = bool(self.weekdays >> (ts.isoweekday() % 7) & 1)
+        # standard cron behavior: when both day fields are restricted, either one can match
+        if self.monthdays_restricted and self.weekdays_restricted:
+            return monthday or weekday
+        return monthday and weekday
+
+    def next_fire(
+        self, after: datetime.datetime, /
+    ) -> typing.Optional[datetime.datetime]:
+        """First minute strictly after the given time that matches the expression"""
+        ts = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        # Feb 29th only comes around every 4 years (8 across a skipped century leap year)
+        horizon = ts.year + 8
+        while ts.year <= horizon:
+            month_offset = next_set_bit(self.months, ts.month - 1)
+            if month_offset is None:
+                ts = datetime.datetime(ts.year + 1, 1, 1)
+                continue
+            elif month_offset:
+                ts = datetime.datetime(ts.year, ts.month + month_offset, 1)
+
+            if not self.day_matches(ts):
+                ts = datetime.datetime.combine(
+                    ts.date() + datetime.timedelta(days=1), datetime.time()
+                )
+                continue
+
+            hour_offset = next_set_bit(self.hours, ts.hour)
+            if hour_offset is None:
+                ts = datetime.datetime.combine(
+                    ts.date() + datetime.timedelta(days=1), datetime.time()
+                )
+                continue
+            elif hour_offset:
+                ts = ts.replace(hour=ts.hour + hour_offset, minute=0)
+
+            minute_offset = next_set_bit(self.minutes, ts.minute)
+            if minute_offset is None:
+                ts = ts.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            return ts.replace(minute=ts.minute + minute_offset)
+        return None
+
+    def __str__(self) -> str:
+        return self.expression
+
+
+def parse_field(
+    expression: str,
+    field: str,
+    lo: int,
+    hi: int,
+    names: typing.Optional[typing.Dict[str, int]] = None,
+) -> int:
+    def parse_value(value: str) -> int:
+        value = value.lower()
+        if names and value in names:
+            return names[value]
+        try:
+            n = int(value)
+        except ValueError:
+            raise error.InvalidCronExpression(
+                expression=expression, reason=f"{value!r} is not a valid value"
+            )
+        if not lo <= n <= hi:
+            raise error.InvalidCronExpression(
+                expression=expression,
+                reason=f"{n} is outside of the range {lo}-{hi}",
+            )
+        return n
+
+    mask = 0
+    for part in field.split(","):
+        rng, _, step_str = part.partition("/")
+        step = parse_value(step_str) if step_str else 1
+        if step < 1:
+            raise error.InvalidCronExpression(
+                expression=expression, reason=f"invalid step in {part!r}"
+            )
+        if rng == "*":
+            start, end = lo, hi
+        elif "-" in rng:
+            start_str, end_str = rng.split("-", 1)
+            start, end = parse_value(start_str), parse_value(end_str)
+        else:
+            start = parse_value(rng)
+            end = hi if step_str else start
+        if end < start:
+            raise error.InvalidCronExpression(
+                expression=expression, reason=f"invalid range {part!r}"
+            )
+        for n in range(start, end + 1, step):
+            mask |= 1 << n
+    return mask
@@ -4,11 +4,19 @@ import traceback
 import typing
 
 __all__ = (
+    "AsyncResourceRequired",
+    "DependencyCycle",
     "DuplicateJobNames",
     "DuplicateResourceKey",
+    "InvalidCronExpression",
+    "JobSoftTimeout",
+    "MissingColumn",
+    "MissingDependencies",
     "OptionNotFound",
     "parse_exception",
     "ResourceKeyNotFound",
+    "ShardsFailed",
+    "WorkerDied",
 )
 
 
@@ -61,6 +69,24 @@ class LetlError(Exception):
         self.message = message
 
 
+class AsyncResourceRequired(LetlError):
+    def __init__(self, *, key: str):
+        self.key = key
+        super().__init__(
+            f"The resource, {key!r}, is async, so it must be opened with get_async from an "
+            f"async job."
+        )
+
+
+class DependencyCycle(LetlError):
+    def __init__(self, jobs: typing.Set[str]):
+        self.jobs = jobs
+        super().__init__(
+            "The dependencies of the following jobs form a cycle: "
+            + ", ".join(sorted(jobs))
+        )
+
+
 class DuplicateJobNames(LetlError):
     def __init__(self, jobs: typing.Set[str]):
         self.message = "The following job names are duplicated: " + ", ".join(jobs)
@@ -74,12 +100,44 @@ class DuplicateResourceKey(LetlError):
         super().__init__(f"The following keys are duplicated: {dupes_msg}")
 
 
+class InvalidCronExpression(LetlError):
+    def __init__(self, *, expression: str, reason: str):
+        self.expression = expression
+        self.reason = reason
+        super().__init__(f"The cron expression, {expression!r}, is invalid: {reason}.")
+
+
 class JobTimedOut(LetlError):
     def __init__(self, message: str):
         self.message = message
         super().__init__(message)
 
 
+class JobSoftTimeout(JobTimedOut):
+    """Raised inside a job when it has run past its timeout
+
+    Jobs may catch it to clean up, but they are killed if they are still running after a
+    short grace period.
+    """
+
+    def __init__(self, *, job_name: str, timeout_seconds: int):
+        self.job_name = job_name
+        self.timeout_seconds = timeout_seconds
+        super().__init__(
+            f"The job, [{job_name}], timed out after {timeout_seconds} seconds."
+        )
+
+
+class MissingColumn(LetlError):
+    def __init__(self, *, table: str, column: str):
+        self.table = table
+        self.column = column
+        super().__init__(
+            f"The table, {table}, is missing the required column, {column}, which can't be "
+            f"added automatically, so it must be added manually."
+        )
+
+
 class MissingJobImplementation(LetlError):
     def __init__(self, *, job_name: str):
         self.job_name = job_name
@@ -87,6 +145,18 @@ class MissingJobImplementation(LetlError):
         super().__init__(self.message)
 
 
+class MissingDependencies(LetlError):
+    def __init__(self, missing: typing.Dict[str, typing.Set[str]]):
+        self.missing = missing
+        missing_msg = ", ".join(
+            f"{job_name} ({', '.join(sorted(deps))})"
+            for job_name, deps in sorted(missing.items())
+        )
+        super().__init__(
+            f"The following jobs depend on jobs that do not exist: {missing_msg}"
+        )
+
+
 class OptionNotFound(LetlError):
     def __init__(self, *, key: str, available_keys: typing.Set[str]):
         self.key = key
@@ -105,3 +175,20 @@ class ResourceKeyNotFound(LetlError):
             f"The resource, {key!r}, was not found.  Available keys include the following: "
             f"{', '.join(sorted(repr(k) for k in available_keys))}"
         )
+
+
+class ShardsFailed(LetlError):
+    def __init__(self, *, job_name: str, errors: typing.Dict[str, str]):
+        self.job_name = job_name
+        self.errors = errors
+        shards = ", ".join(f"[{shard}]" for shard in sorted(errors))
+        super().__init__(f"The job, [{job_name}], failed because these shards failed: {shards}.")
+
+
+class WorkerDied(LetlError):
+    def __init__(self, *, job_name: str, exitcode: typing.Optional[int]):
+        self.job_name = job_name
+        self.exitcode = exitcode
+        super().__init__(
+            f"The worker process running [{job_name}] died with exit code {exitcode}."
+        )
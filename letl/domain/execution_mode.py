@@ -0,0 +1,12 @@
+import enum
+
+
+__all__ = ("ExecutionMode",)
+
+
+class ExecutionMode(str, enum.Enum):
+    Process = "process"
+    Worker = "worker"
+
+    def __str__(self) -> str:
+        return str.__str__(self)
@@ -3,10 +3,16 @@ from __future__ import annotations
 import abc
 import datetime
 
+from letl.domain import cron
+
 __all__ = ("Interval",)
 
 
 class Interval(abc.ABC):
+    @staticmethod
+    def cron(expression: str, /) -> Interval:
+        return Cron(expression)
+
     @staticmethod
     def daily() -> Interval:
         return Daily()
@@ -20,16 +26,52 @@ class Interval(abc.ABC):
     def description(self) -> str:
         raise NotImplementedError
 
+    def first_due(self, earliest: datetime.datetime, /) -> datetime.datetime:
+        """When the first run of a job that has never run is due, if it may run from earliest"""
+        return earliest
+
     @abc.abstractmethod
     def next(
         self, last: datetime.datetime, now: datetime.datetime
     ) -> datetime.datetime:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def next_due(self, *, last: datetime.datetime) -> datetime.datetime:
+        """Earliest time the interval allows another run after a run that completed at last"""
+        raise NotImplementedError
+
     def __str__(self) -> str:
         return self.description
 
 
+class Cron(Interval):
+    def __init__(self, expression: str, /):
+        self._expression = cron.CronExpression.parse(expression)
+
+    @property
+    def description(self) -> str:
+        return f"cron: {self._expression}"
+
+    def first_due(self, earliest: datetime.datetime, /) -> datetime.datetime:
+        # wait for the expression to fire, unless it fired within the current minute
+        return self.next_due(last=earliest - datetime.timedelta(minutes=1))
+
+    def next(
+        self, last: datetime.datetime, now: datetime.datetime
+    ) -> datetime.datetime:
+        return self.next_due(last=last)
+
+    def next_due(self, *, last: datetime.datetime) -> datetime.datetime:
+        next_fire = self._expression.next_fire(last)
+        # CronExpression.parse rejects expressions that never fire
+        assert next_fire is not None
+        return next_fire
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({str(self._expression)!r})"
+
+
 class Daily(Interval):
     @property
     def description(self) -> str:
@@ -43,6 +85,11 @@ class Daily(Interval):
         else:
             return now
 
+    def next_due(self, *, last: datetime.datetime) -> datetime.datetime:
+        return datetime.datetime.combine(
+            last.date() + datetime.timedelta(days=1), datetime.time()
+        )
+
     def __repr__(self) -> str:
         return "Daily()"
 
@@ -64,6 +111,9 @@ class EveryXSeconds(Interval):
         else:
             return last + datetime.timedelta(seconds=self._seconds)
 
+    def next_due(self, *, last: datetime.datetime) -> datetime.datetime:
+        return last + datetime.timedelta(seconds=self._seconds)
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(seconds={self._seconds})"
 
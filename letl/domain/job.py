@@ -1,7 +1,8 @@
 import dataclasses
+import inspect
 import typing
 
-from letl.domain import cfg, logger as log, job_result, resource_manager, schedule
+from letl.domain import backoff, cfg, logger as log, job_result, resource_manager, schedule
 
 __all__ = ("Job",)
 
@@ -11,10 +12,46 @@ class Job:
     job_name: str
     timeout_seconds: int
     retries: int
+    # either a plain function or an async def, which is run on a shared event loop
     run: typing.Callable[
         [cfg.Config, log.Logger, resource_manager.ResourceManager],
-        typing.Optional[job_result.JobResult],
+        typing.Union[
+            typing.Optional[job_result.JobResult],
+            typing.Awaitable[typing.Optional[job_result.JobResult]],
+        ],
     ]
     schedule: typing.FrozenSet[schedule.Schedule]
     config: cfg.Config
     dependencies: typing.FrozenSet[str] = frozenset()
+    # only used by QueueType.Priority, higher runs first
+    priority: int = 0
+    # delay between retries, each retry is scheduled as a separate run
+    retry_backoff: backoff.Backoff = backoff.Backoff()
+    # resources with limits that the job uses; a slot is taken for each before the job starts,
+    # and the job is put back on the queue rather than holding a runner if any are saturated.
+    # If it's empty, jobs that run in their own process hold every limited resource.
+    resource_keys: typing.FrozenSet[str] = frozenset()
+    # splits the job into shards that run in parallel, each with the config it yields
+    partitioner: typing.Optional[
+        typing.Callable[[cfg.Config], typing.Iterable[cfg.Config]]
+    ] = None
+
+    def shard(self, index: int, /, *, config: cfg.Config) -> "Job":
+        """Part of a partitioned job, run and tracked as a job of its own named job_name[index]"""
+        return dataclasses.replace(
+            self,
+            job_name=f"{self.job_name}[{index}]",
+            config=config,
+            schedule=frozenset(),
+            dependencies=frozenset(),
+            partitioner=None,
+        )
+
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self.run)
+
+    def __post_init__(self) -> None:
+        # compile the schedule windows up front rather than on the first scan
+        for s in self.schedule:
+            _ = s.window
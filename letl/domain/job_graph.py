@@ -0,0 +1,94 @@
+import collections
+import typing
+
+from letl.domain import error, job
+
+__all__ = ("JobGraph",)
+
+
+class JobGraph:
+    def __init__(self, jobs: typing.Iterable[job.Job]):
+        """Validated dependency graph of jobs
+
+        Raises
+        ------
+        MissingDependencies
+            If a job depends on a job that is not in jobs
+        DependencyCycle
+            If the dependencies form a cycle
+        """
+        self._jobs = {j.job_name: j for j in jobs}
+
+        check_dependencies_exist(self._jobs.values())
+
+        dependents: typing.Dict[str, typing.Set[str]] = {
+            job_name: set() for job_name in self._jobs
+        }
+        for j in self._jobs.values():
+            for dep in j.dependencies:
+                dependents[dep].add(j.job_name)
+        self._dependents = {
+            job_name: frozenset(names) for job_name, names in dependents.items()
+        }
+
+        self._topological_order = topological_order(
+            jobs=self._jobs.values(), dependents=self._dependents
+        )
+
+    def dependents(self, job_name: str, /) -> typing.FrozenSet[str]:
+        """Names of the jobs that depend directly on job_name"""
+        return self._dependents.get(job_name, frozenset())
+
+    def get(self, job_name: str, /) -> job.Job:
+        return self._jobs[job_name]
+
+    @property
+    def jobs(self) -> typing.List[job.Job]:
+        """Jobs in topological order, i.e., each job comes after its dependencies"""
+        return [self._jobs[job_name] for job_name in self._topological_order]
+
+    @property
+    def topological_order(self) -> typing.List[str]:
+        return list(self._topological_order)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}: {', '.join(self._topological_order)}"
+
+
+def check_dependencies_exist(jobs: typing.Iterable[job.Job]) -> None:
+    job_list = list(jobs)
+    job_names = {j.job_name for j in job_list}
+    missing = {
+        j.job_name: set(j.dependencies - job_names)
+        for j in job_list
+        if j.dependencies - job_names
+    }
+    if missing:
+        raise error.MissingDependencies(missing)
+
+
+def topological_order(
+    *,
+    jobs: typing.Iterable[job.Job],
+    dependents: typing.Mapping[str, typing.FrozenSet[str]],
+) -> typing.List[str]:
+    # Kahn's algorithm, ties are broken by name to keep the order stable between runs
+    remaining = {j.job_name: len(j.dependencies) for j in jobs}
+    ready = collections.deque(
+        sorted(job_name for job_name, ct in remaining.items() if ct == 0)
+    )
+    order: typing.List[str] = []
+    while ready:
+        job_name = ready.popleft()
+        order.append(job_name)
+        for dependent in sorted(dependents[job_name]):
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+
+    if len(order) < len(remaining):
+        raise error.DependencyCycle(
+            {job_name for job_name, ct in remaining.items() if ct > 0}
+        )
+
+    return order
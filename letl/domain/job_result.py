@@ -3,7 +3,7 @@ from __future__ import annotations
 import dataclasses
 import typing
 
-from letl.domain import error
+from letl.domain import error, run_metrics
 
 __all__ = ("JobResult",)
 
@@ -15,6 +15,7 @@ class JobResult:
     is_success: bool
     error_message: typing.Optional[str]
     skipped_reason: typing.Optional[str]
+    metrics: typing.Optional[run_metrics.RunMetrics] = None
 
     @staticmethod
     def error(e: Exception, /) -> JobResult:
@@ -0,0 +1,19 @@
+import abc
+
+__all__ = ("LeaseRepo",)
+
+
+class LeaseRepo(abc.ABC):
+    @abc.abstractmethod
+    def claim(self, *, job_name: str, node_id: str, seconds: float) -> bool:
+        """Take the lease on a job for the given number of seconds
+
+        Returns
+        -------
+        False if another node holds an unexpired lease on the job
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def release(self, *, job_name: str, node_id: str) -> None:
+        raise NotImplementedError
@@ -0,0 +1,16 @@
+import enum
+
+
+__all__ = ("LogOverflowPolicy",)
+
+
+class LogOverflowPolicy(str, enum.Enum):
+    """What a logger does with a message when the bounded log queue is full"""
+
+    Block = "block"
+    DropDebug = "drop_debug"
+    DropOldest = "drop_oldest"
+    Sample = "sample"
+
+    def __str__(self) -> str:
+        return str.__str__(self)
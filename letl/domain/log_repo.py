@@ -2,7 +2,7 @@ import abc
 import datetime
 import typing
 
-from letl.domain import log_level
+from letl.domain import log_level, log_message
 
 __all__ = ("LogRepo",)
 
@@ -19,6 +19,10 @@ class LogRepo(abc.ABC):
     ) -> None:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def add_many(self, /, messages: typing.Sequence[log_message.LogMessage]) -> None:
+        raise NotImplementedError
+
     @abc.abstractmethod
     def delete_before(self, /, ts: datetime.datetime) -> None:
         raise NotImplementedError
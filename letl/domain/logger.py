@@ -6,19 +6,30 @@ import typing
 
 from letl.domain import log_level
 
-__all__ = ("Logger",)
+__all__ = ("Logger", "LogText")
+
+# a callable is only called, and args are only interpolated, if the level is enabled
+LogText = typing.Union[str, typing.Callable[[], str]]
 
 
 class Logger(abc.ABC):
     @abc.abstractmethod
     def debug(
-        self, /, message: str, *, ts: typing.Optional[datetime.datetime] = None
+        self,
+        /,
+        message: LogText,
+        *args: typing.Any,
+        ts: typing.Optional[datetime.datetime] = None,
     ) -> None:
         raise NotImplementedError
 
     @abc.abstractmethod
     def error(
-        self, /, message: str, *, ts: typing.Optional[datetime.datetime] = None
+        self,
+        /,
+        message: LogText,
+        *args: typing.Any,
+        ts: typing.Optional[datetime.datetime] = None,
     ) -> None:
         raise NotImplementedError
 
@@ -30,10 +41,18 @@ class Logger(abc.ABC):
 
     @abc.abstractmethod
     def info(
-        self, /, message: str, *, ts: typing.Optional[datetime.datetime] = None
+        self,
+        /,
+        message: LogText,
+        *args: typing.Any,
+        ts: typing.Optional[datetime.datetime] = None,
     ) -> None:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def is_enabled(self, /, level: log_level.LogLevel) -> bool:
+        raise NotImplementedError
+
     @property
     @abc.abstractmethod
     def name(self) -> str:
@@ -48,3 +67,11 @@ class Logger(abc.ABC):
         min_log_level: typing.Optional[log_level.LogLevel] = None,
     ) -> Logger:
         raise NotImplementedError
+
+
+def render(message: LogText, args: typing.Tuple[typing.Any, ...], /) -> str:
+    if callable(message):
+        return message()
+    if args:
+        return message % args
+    return message
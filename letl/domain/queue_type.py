@@ -0,0 +1,12 @@
+import enum
+
+
+__all__ = ("QueueType",)
+
+
+class QueueType(str, enum.Enum):
+    Priority = "priority"
+    Set = "set"
+
+    def __str__(self) -> str:
+        return str.__str__(self)
@@ -2,14 +2,47 @@ import abc
 import types
 import typing
 
-__all__ = ("Resource",)
+from letl.domain import error
+
+__all__ = ("AsyncResource", "Resource")
 
 Handle = typing.TypeVar("Handle")
 
 
 class Resource(abc.ABC, typing.Generic[Handle]):
-    def __init__(self, *, key: str):
+    def __init__(
+        self,
+        *,
+        key: str,
+        pool_size: int = 0,
+        max_idle_seconds: float = 300,
+        max_concurrent: typing.Optional[int] = None,
+        max_per_second: typing.Optional[float] = None,
+        burst: int = 1,
+    ):
+        """
+        Parameters
+        ----------
+        key
+            Name jobs use to get a handle from the ResourceManager
+        pool_size
+            Number of idle handles a worker process keeps open between jobs.  0 disables pooling,
+            so each job opens and closes its own handle.
+        max_idle_seconds
+            Pooled handles that haven't been used for this long are closed
+        max_concurrent
+            Maximum number of jobs using the resource at once, across all runners and processes
+        max_per_second
+            Maximum rate at which jobs may start using the resource (a token bucket)
+        burst
+            Number of uses that may start at once before max_per_second kicks in
+        """
         self._key = key
+        self._pool_size = pool_size
+        self._max_idle_seconds = max_idle_seconds
+        self._max_concurrent = max_concurrent
+        self._max_per_second = max_per_second
+        self._burst = burst
 
         self._handle: typing.Optional[Handle] = None
 
@@ -21,10 +54,38 @@ class Resource(abc.ABC, typing.Generic[Handle]):
     def close(self, /, handle: Handle) -> None:
         raise NotImplementedError
 
+    def is_healthy(self, /, handle: Handle) -> bool:
+        """Checked before a pooled handle is reused, unhealthy handles are closed and replaced"""
+        return True
+
     @property
     def key(self) -> str:
         return self._key
 
+    @property
+    def burst(self) -> int:
+        return self._burst
+
+    @property
+    def is_limited(self) -> bool:
+        return self._max_concurrent is not None or self._max_per_second is not None
+
+    @property
+    def max_concurrent(self) -> typing.Optional[int]:
+        return self._max_concurrent
+
+    @property
+    def max_idle_seconds(self) -> float:
+        return self._max_idle_seconds
+
+    @property
+    def max_per_second(self) -> typing.Optional[float]:
+        return self._max_per_second
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
     def __eq__(self, other: object) -> bool:
         if other.__class__ is self.__class__:
             return self.key == typing.cast(Resource[typing.Any], other).key
@@ -58,3 +119,24 @@ class Resource(abc.ABC, typing.Generic[Handle]):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}: {self._key}"
+
+
+class AsyncResource(Resource[Handle]):
+    """Resource whose handles are opened and closed with await
+
+    Async jobs get them with ResourceManager.get_async.
+    """
+
+    @abc.abstractmethod
+    async def open_async(self) -> Handle:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def close_async(self, /, handle: Handle) -> None:
+        raise NotImplementedError
+
+    def open(self) -> Handle:
+        raise error.AsyncResourceRequired(key=self.key)
+
+    def close(self, /, handle: Handle) -> None:
+        raise error.AsyncResourceRequired(key=self.key)
@@ -0,0 +1,56 @@
+import abc
+import typing
+
+from letl.domain import resource
+
+__all__ = ("ResourceLimiter", "keys_to_hold")
+
+
+class ResourceLimiter(abc.ABC):
+    """Enforces each resource's max_concurrent and max_per_second across runners and processes"""
+
+    @abc.abstractmethod
+    def acquire(self, /, key: str, *, block: bool = True) -> bool:
+        """Take a slot for the resource
+
+        Returns
+        -------
+        False if block is False and the resource is saturated
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def release(self, /, key: str) -> None:
+        raise NotImplementedError
+
+    def acquire_all(self, /, keys: typing.AbstractSet[str]) -> bool:
+        """Take a slot for each resource without blocking, or none of them if any is saturated"""
+        acquired: typing.List[str] = []
+        # a consistent order keeps jobs from each holding what the other is waiting on
+        for key in sorted(keys):
+            if not self.acquire(key, block=False):
+                for k in acquired:
+                    self.release(k)
+                return False
+            acquired.append(key)
+        return True
+
+    def release_all(self, /, keys: typing.AbstractSet[str]) -> None:
+        for key in keys:
+            self.release(key)
+
+
+def keys_to_hold(
+    *,
+    resource_keys: typing.AbstractSet[str],
+    resources: typing.Iterable[resource.Resource[typing.Any]],
+) -> typing.FrozenSet[str]:
+    """The limited resources to take a slot for before starting a job in another process
+
+    Slots are only taken by the parent process, since a job process that is killed while
+    holding one would never give it back.  A job that doesn't list its resource_keys is
+    assumed to use every limited resource.
+    """
+    if resource_keys:
+        return frozenset(resource_keys)
+    return frozenset(res.key for res in resources if res.is_limited)
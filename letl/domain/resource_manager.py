@@ -1,7 +1,8 @@
+import asyncio
 import collections
 import typing
 
-from letl.domain import error, logger, resource
+from letl.domain import error, logger, resource, resource_limiter, resource_pool
 
 __all__ = ("ResourceManager",)
 
@@ -14,36 +15,130 @@ class ResourceManager:
         *,
         resources: typing.FrozenSet[resource.Resource[typing.Any]],
         log: logger.Logger,
+        pool: typing.Optional[resource_pool.ResourcePool] = None,
+        limiter: typing.Optional[resource_limiter.ResourceLimiter] = None,
+        held_keys: typing.AbstractSet[str] = frozenset(),
     ):
+        """Hands out resource handles to a job, opening each resource at most once per run
+
+        Parameters
+        ----------
+        resources
+            Resources the job may use
+        log
+            Logger for errors raised while closing handles
+        pool
+            Handles of pooled resources are taken from and returned to this pool rather than
+            opened and closed for each run
+        limiter
+            Limits how many jobs use a resource at once and how often.  get() waits for a slot
+            the first time a resource is used in a run, and the slot is released by close().
+        held_keys
+            Resources the job runner already took a limiter slot for before the run started
+        """
         check_keys_are_unique(resources)
 
         self._resources = resources
         self._log = log
+        self._pool = pool
+        self._limiter = limiter
+        self._held_keys = held_keys
 
+        self._acquired: typing.Set[str] = set()
         self._handles: typing.Dict[
             resource.Resource[typing.Any], typing.Optional[typing.Any]
         ] = {res: None for res in resources}
 
+    async def aclose(self) -> None:
+        for res, handle in self._handles.items():
+            if handle is not None:
+                try:
+                    if isinstance(res, resource.AsyncResource):
+                        await res.close_async(handle)
+                    else:
+                        res.close(handle)
+                except Exception as e:
+                    self._log.error(
+                        f"An error occurred while closing the resource, {res.key}: {e}"
+                    )
+                self._handles[res] = None
+        self._release()
+
     def close(self) -> None:
         for res, handle in self._handles.items():
             if handle is not None:
                 try:
-                    res.close(handle)
+                    if self._is_pooled(res):
+                        assert self._pool is not None
+                        self._pool.release(res, handle)
+                    else:
+                        res.close(handle)
                 except Exception as e:
                     self._log.error(
                         f"An error occurred while closing the resource, {res.key}: {e}"
                     )
+                self._handles[res] = None
+        self._release()
 
     def key_exists(self, /, key: str) -> bool:
         return key in self.keys
 
     def get(self, /, key: str, _type: typing.Type[Handle]) -> Handle:
-        try:
-            res = next(res for res in self._resources if res.key == key)
-            handle = res.open()
-            assert isinstance(handle, _type)
+        res = self._resource(key)
+        handle = self._handles[res]
+        if handle is None:
+            self._acquire(res.key)
+            if self._is_pooled(res):
+                assert self._pool is not None
+                handle = self._pool.acquire(res)
+            else:
+                handle = res.open()
             self._handles[res] = handle
-            return handle
+        assert isinstance(handle, _type)
+        return handle
+
+    async def get_async(self, /, key: str, _type: typing.Type[Handle]) -> Handle:
+        res = self._resource(key)
+        handle = self._handles[res]
+        if handle is None:
+            if self._needs_slot(res.key):
+                assert self._limiter is not None
+                # don't block the event loop while waiting for a slot
+                while not self._limiter.acquire(res.key, block=False):
+                    await asyncio.sleep(0.1)
+                self._acquired.add(res.key)
+            if isinstance(res, resource.AsyncResource):
+                handle = await res.open_async()
+            else:
+                handle = res.open()
+            self._handles[res] = handle
+        assert isinstance(handle, _type)
+        return handle
+
+    def _acquire(self, /, key: str) -> None:
+        if self._needs_slot(key):
+            assert self._limiter is not None
+            self._limiter.acquire(key)
+            self._acquired.add(key)
+
+    def _needs_slot(self, /, key: str) -> bool:
+        return (
+            self._limiter is not None
+            and key not in self._held_keys
+            and key not in self._acquired
+        )
+
+    def _release(self) -> None:
+        if self._limiter is not None:
+            self._limiter.release_all(self._acquired)
+        self._acquired.clear()
+
+    def _is_pooled(self, res: resource.Resource[typing.Any], /) -> bool:
+        return self._pool is not None and res.pool_size > 0
+
+    def _resource(self, /, key: str) -> resource.Resource[typing.Any]:
+        try:
+            return next(res for res in self._resources if res.key == key)
         except StopIteration:
             raise error.ResourceKeyNotFound(key=key, available_keys=self.keys)
 
@@ -0,0 +1,71 @@
+import collections
+import time
+import typing
+
+from letl.domain import logger, resource
+
+__all__ = ("ResourcePool",)
+
+
+class ResourcePool:
+    def __init__(self, *, log: logger.Logger):
+        """Keeps handles open between jobs run by the same process
+
+        Only resources with a pool_size > 0 are pooled.  Each resource keeps at most pool_size
+        idle handles, handles idle for longer than the resource's max_idle_seconds are closed,
+        and a handle is only reused if the resource's is_healthy check passes.
+        """
+        self._log = log
+
+        self._idle: typing.Dict[
+            resource.Resource[typing.Any],
+            typing.Deque[typing.Tuple[typing.Any, float]],
+        ] = collections.defaultdict(collections.deque)
+
+    def acquire(self, res: resource.Resource[typing.Any], /) -> typing.Any:
+        idle = self._idle[res]
+        while idle:
+            # most recently used first, so rarely used extra handles age out
+            handle, last_used = idle.pop()
+            if time.monotonic() - last_used > res.max_idle_seconds:
+                self._close(res, handle)
+            elif self._is_healthy(res, handle):
+                return handle
+            else:
+                self._close(res, handle)
+        return res.open()
+
+    def release(self, res: resource.Resource[typing.Any], /, handle: typing.Any) -> None:
+        idle = self._idle[res]
+        if len(idle) < res.pool_size:
+            idle.append((handle, time.monotonic()))
+        else:
+            self._close(res, handle)
+
+    def evict_idle(self) -> None:
+        now = time.monotonic()
+        for res, idle in self._idle.items():
+            while idle and now - idle[0][1] > res.max_idle_seconds:
+                handle, _ = idle.popleft()
+                self._close(res, handle)
+
+    def close(self) -> None:
+        for res, idle in self._idle.items():
+            while idle:
+                handle, _ = idle.popleft()
+                self._close(res, handle)
+
+    def _close(self, res: resource.Resource[typing.Any], /, handle: typing.Any) -> None:
+        try:
+            res.close(handle)
+        except Exception as e:
+            self._log.error(
+                f"An error occurred while closing the resource, {res.key}: {e}"
+            )
+
+    def _is_healthy(self, res: resource.Resource[typing.Any], /, handle: typing.Any) -> bool:
+        try:
+            return res.is_healthy(handle)
+        except Exception as e:
+            self._log.debug(f"The health check for {res.key} failed: {e}")
+            return False
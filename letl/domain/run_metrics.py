@@ -0,0 +1,20 @@
+import dataclasses
+import typing
+
+__all__ = ("RunMetrics",)
+
+
+@dataclasses.dataclass(frozen=True)
+class RunMetrics:
+    """Resources used by one run of a job
+
+    Values that could not be measured on the current platform are None.
+    """
+
+    cpu_user_seconds: typing.Optional[float] = None
+    cpu_system_seconds: typing.Optional[float] = None
+    # peak resident memory of the process that ran the job, so for a worker it is the peak so far
+    peak_rss_mb: typing.Optional[float] = None
+    read_bytes: typing.Optional[int] = None
+    write_bytes: typing.Optional[int] = None
+    queue_wait_seconds: typing.Optional[float] = None
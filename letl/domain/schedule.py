@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import dataclasses
 import datetime
+import functools
 import typing
 
-from letl.domain import interval, weekday
+from letl.domain import interval, schedule_window, weekday
 
 __all__ = ("Schedule",)
 
@@ -53,6 +54,41 @@ class Schedule:
         overrides_provided = {k: v for k, v in overrides.items() if v is not None}
         return dataclasses.replace(self, **overrides_provided)
 
+    @staticmethod
+    def cron(
+        expression: str,
+        start: typing.Optional[datetime.datetime] = None,
+        start_month: int = 1,
+        end_month: int = 12,
+        start_monthday: int = 1,
+        end_monthday: int = 31,
+        start_weekday: weekday.Weekday = weekday.Weekday.Mon,
+        end_weekday: weekday.Weekday = weekday.Weekday.Sun,
+        start_hour: int = 0,
+        start_minute: int = 0,
+        end_hour: int = 23,
+        end_minute: int = 59,
+    ) -> Schedule:
+        """Schedule that fires on a 5-field cron expression, e.g. "5,35 * * * mon-fri"
+
+        The expression is parsed once up front, and the next fire time is computed directly from
+        it, so one cron schedule can replace many windowed schedules.
+        """
+        return Schedule(
+            interval=interval.Interval.cron(expression),
+            start=start,
+            start_month=start_month,
+            end_month=end_month,
+            start_monthday=start_monthday,
+            end_monthday=end_monthday,
+            start_weekday=start_weekday,
+            end_weekday=end_weekday,
+            start_hour=start_hour,
+            start_minute=start_minute,
+            end_hour=end_hour,
+            end_minute=end_minute,
+        )
+
     @staticmethod
     def daily(
         start: typing.Optional[datetime.datetime] = None,
@@ -112,24 +148,19 @@ class Schedule:
             end_minute=end_minute,
         )
 
-    def is_due(self, *, last_completed: typing.Optional[datetime.datetime]) -> bool:
-        ts = datetime.datetime.now()
-        if ts.month < self.start_month or ts.month > self.end_month:
-            return False
-        elif ts.day < self.start_monthday or ts.day > self.end_monthday:
-            return False
-        elif ts.isoweekday() < self.start_weekday or ts.isoweekday() > self.end_weekday:
-            return False
-        elif ts.hour < self.start_hour or ts.hour > self.end_hour:
-            return False
-        elif ts.minute < self.start_minute or ts.minute > self.end_minute:
+    def is_due(
+        self,
+        *,
+        last_completed: typing.Optional[datetime.datetime],
+        now: typing.Optional[datetime.datetime] = None,
+    ) -> bool:
+        ts = now or datetime.datetime.now()
+        if not self.window.contains(ts):
             return False
         else:
             if last_completed is None:
-                if self.start:
-                    return ts >= self.start
-                else:
-                    return True
+                earliest = max(self.start, ts) if self.start else ts
+                return ts >= self.interval.first_due(earliest)
             else:
                 next_due = self.interval.next(last=last_completed, now=ts)
                 if ts >= next_due:
@@ -137,6 +168,74 @@ class Schedule:
                 else:
                     return False
 
+    def due_since(
+        self,
+        *,
+        last_completed: typing.Optional[datetime.datetime],
+        now: typing.Optional[datetime.datetime] = None,
+    ) -> typing.Optional[datetime.datetime]:
+        """When the schedule became due, or None if it is not due now
+
+        Time outside the schedule's window doesn't count, so a run that came due overnight is
+        due since the window opened.
+        """
+        now = now or datetime.datetime.now()
+        if not self.is_due(last_completed=last_completed, now=now):
+            return None
+        if last_completed is None:
+            earliest = max(self.start, now) if self.start else now
+            due = self.interval.first_due(earliest)
+        else:
+            due = self.interval.next_due(last=last_completed)
+        return min(self.next_open(due) or now, now)
+
+    def next_due(
+        self,
+        *,
+        last_completed: typing.Optional[datetime.datetime],
+        now: typing.Optional[datetime.datetime] = None,
+    ) -> typing.Optional[datetime.datetime]:
+        """Next time at or after now that the schedule will be due
+
+        Parameters
+        ----------
+        last_completed
+            When the job last completed, or None if it has not run yet
+        now
+            Defaults to datetime.datetime.now()
+
+        Returns
+        -------
+        The datetime, or None if the schedule's window never opens (e.g., start_monthday=30
+        with start_month=end_month=2)
+        """
+        now = now or datetime.datetime.now()
+        if last_completed is None:
+            earliest = max(self.start, now) if self.start else now
+            earliest = max(self.interval.first_due(earliest), now)
+        else:
+            earliest = max(self.interval.next_due(last=last_completed), now)
+        return self.next_open(earliest)
+
+    def next_open(self, ts: datetime.datetime, /) -> typing.Optional[datetime.datetime]:
+        """First time at or after ts that falls within the schedule's window"""
+        return self.window.next_open(ts)
+
+    @functools.cached_property
+    def window(self) -> schedule_window.ScheduleWindow:
+        return schedule_window.ScheduleWindow.compile(
+            start_month=self.start_month,
+            end_month=self.end_month,
+            start_monthday=self.start_monthday,
+            end_monthday=self.end_monthday,
+            start_weekday=self.start_weekday,
+            end_weekday=self.end_weekday,
+            start_hour=self.start_hour,
+            start_minute=self.start_minute,
+            end_hour=self.end_hour,
+            end_minute=self.end_minute,
+        )
+
 
 if __name__ == "__main__":
     print(f"Fri: {datetime.date(2021, 5, 7).isoweekday()=}")
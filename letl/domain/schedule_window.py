@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import calendar
+import dataclasses
+import datetime
+import functools
+import typing
+
+__all__ = ("ScheduleWindow",)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+@dataclasses.dataclass(frozen=True)
+class ScheduleWindow:
+    """A Schedule's window compiled to bitsets
+
+    months has bit (month - 1) set for each open month, monthdays has bit (day - 1) set for each
+    open day of the month, and minutes_of_week has bit minute_of_week(ts) set for each open
+    minute of the week.
+    """
+
+    months: int
+    monthdays: int
+    minutes_of_week: int
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def compile(
+        *,
+        start_month: int,
+        end_month: int,
+        start_monthday: int,
+        end_monthday: int,
+        start_weekday: int,
+        end_weekday: int,
+        start_hour: int,
+        start_minute: int,
+        end_hour: int,
+        end_minute: int,
+    ) -> ScheduleWindow:
+        hour = bit_range(start_minute, end_minute)
+        day = 0
+        for h in range(start_hour, end_hour + 1):
+            day |= hour << (h * 60)
+        week = 0
+        for d in range(start_weekday, end_weekday + 1):
+            week |= day << ((d - 1) * MINUTES_PER_DAY)
+        return ScheduleWindow(
+            months=bit_range(start_month - 1, end_month - 1),
+            monthdays=bit_range(start_monthday - 1, end_monthday - 1),
+            minutes_of_week=week,
+        )
+
+    def contains(self, ts: datetime.datetime, /) -> bool:
+        return bool(
+            (self.months >> (ts.month - 1))
+            & (self.monthdays >> (ts.day - 1))
+            & (self.minutes_of_week >> minute_of_week(ts))
+            & 1
+        )
+
+    def next_open(self, ts: datetime.datetime, /) -> typing.Optional[datetime.datetime]:
+        """First time at or after ts that falls within the window, or None if it never opens"""
+        if not (self.months and self.monthdays and self.minutes_of_week):
+            return None
+
+        # every window repeats at least once within a leap cycle
+        horizon = ts.year + 8
+        while ts.year <= horizon:
+            month_offset = next_set_bit(self.months, ts.month - 1)
+            if month_offset is None:
+                ts = datetime.datetime(ts.year + 1, 1, 1)
+                continue
+            elif month_offset:
+                ts = datetime.datetime(ts.year, ts.month + month_offset, 1)
+
+            day_offset = next_set_bit(self.monthdays, ts.day - 1)
+            days_in_month = calendar.monthrange(ts.year, ts.month)[1]
+            if day_offset is None or ts.day + day_offset > days_in_month:
+                ts = first_of_next_month(ts)
+                continue
+            elif day_offset:
+                ts = datetime.datetime(ts.year, ts.month, ts.day + day_offset)
+
+            minute = minute_of_week(ts)
+            minute_offset = next_set_bit(self.minutes_of_week, minute)
+            if minute_offset is None:
+                # wrap around to the start of the next week
+                minute_offset = MINUTES_PER_WEEK - minute
+                minute_offset += typing.cast(int, next_set_bit(self.minutes_of_week, 0))
+            if minute_offset == 0:
+                return ts
+
+            ts = ts.replace(second=0, microsecond=0) + datetime.timedelta(
+                minutes=minute_offset
+            )
+            if minute % MINUTES_PER_DAY + minute_offset < MINUTES_PER_DAY:
+                # still the same day, so the month and day of the month are still open
+                return ts
+        return None
+
+
+def bit_range(start: int, end: int, /) -> int:
+    if end < start:
+        return 0
+    return ((1 << (end - start + 1)) - 1) << start
+
+
+def first_of_next_month(ts: datetime.datetime, /) -> datetime.datetime:
+    if ts.month == 12:
+        return datetime.datetime(ts.year + 1, 1, 1)
+    return datetime.datetime(ts.year, ts.month + 1, 1)
+
+
+def minute_of_week(ts: datetime.datetime, /) -> int:
+    return (ts.isoweekday() - 1) * MINUTES_PER_DAY + ts.hour * 60 + ts.minute
+
+
+def next_set_bit(mask: int, start: int, /) -> typing.Optional[int]:
+    """Distance from start to the next set bit at or above start"""
+    remaining = mask >> start
+    if remaining:
+        return (remaining & -remaining).bit_length() - 1
+    return None
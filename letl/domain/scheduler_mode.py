@@ -0,0 +1,12 @@
+import enum
+
+
+__all__ = ("SchedulerMode",)
+
+
+class SchedulerMode(str, enum.Enum):
+    Event = "event"
+    Scan = "scan"
+
+    def __str__(self) -> str:
+        return str.__str__(self)
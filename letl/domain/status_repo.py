@@ -2,7 +2,7 @@ import abc
 import datetime
 import typing
 
-from letl.domain import job_status
+from letl.domain import job_status, run_metrics
 
 __all__ = ("StatusRepo",)
 
@@ -13,15 +13,32 @@ class StatusRepo(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def done(self, *, job_name: str) -> None:
+    def done(
+        self,
+        *,
+        job_name: str,
+        metrics: typing.Optional[run_metrics.RunMetrics] = None,
+    ) -> None:
         raise NotImplementedError
 
     @abc.abstractmethod
-    def error(self, *, job_name: str, error: str) -> None:
+    def error(
+        self,
+        *,
+        job_name: str,
+        error: str,
+        metrics: typing.Optional[run_metrics.RunMetrics] = None,
+    ) -> None:
         raise NotImplementedError
 
     @abc.abstractmethod
-    def skipped(self, *, job_name: str, reason: str) -> None:
+    def skipped(
+        self,
+        *,
+        job_name: str,
+        reason: str,
+        metrics: typing.Optional[run_metrics.RunMetrics] = None,
+    ) -> None:
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -39,3 +56,9 @@ class StatusRepo(abc.ABC):
     @abc.abstractmethod
     def status(self, *, job_name: str) -> typing.Optional[job_status.JobStatus]:
         raise NotImplementedError
+
+    @abc.abstractmethod
+    def status_map(
+        self, *, job_names: typing.AbstractSet[str]
+    ) -> typing.Dict[str, job_status.JobStatus]:
+        raise NotImplementedError
@@ -1,28 +1,29 @@
 import typing
 
-import sqlalchemy as sa
-
-from letl import adapter, domain
+from letl import domain
 
 __all__ = ("delete_orphan_jobs",)
 
 
 def delete_orphan_jobs(
     *,
-    admin_engine: sa.engine.Engine,
+    status_repo: domain.StatusRepo,
     current_jobs: typing.List[domain.Job],
     logger: domain.Logger,
+    distributed: bool = False,
 ) -> None:
     """Delete job entries that are no longer active or died during a previous run.
 
     Parameters
     ----------
-    admin_engine
-        SqlAlchemy engine instance associated with database that stores the ETL logs
+    status_repo
+        domain.StatusRepo for the database that stores the ETL logs
     current_jobs
         Jobs that will be sent to job runners to execute
     logger
         domain.Logger that logs messages to the ETL database
+    distributed
+        Other nodes share the database, so jobs marked as running may really be running
 
     Returns
     -------
@@ -30,7 +31,6 @@ def delete_orphan_jobs(
     """
     logger.debug("Deleting jobs that are no longer active.")
     active_jobs = {job.job_name for job in current_jobs}
-    status_repo = adapter.DbStatusRepo(engine=admin_engine)
     statuses = status_repo.all()
     job_names = {s.job_name for s in statuses}
     orphan_jobs = job_names - active_jobs
@@ -38,12 +38,13 @@ def delete_orphan_jobs(
         logger.debug(f"Removing [{job_name}] from the queue as it is no longer active.")
         status_repo.delete(job_name=job_name)
 
-    logger.debug(
-        "Deleting jobs from the queue that are currently running at the same time."
-    )
-    running_job_names = {s.job_name for s in statuses if s.is_running}
-    for job_name in running_job_names:
-        status_repo.delete(job_name=job_name)
+    if not distributed:
+        logger.debug(
+            "Deleting jobs from the queue that are currently running at the same time."
+        )
+        running_job_names = {s.job_name for s in statuses if s.is_running}
+        for job_name in running_job_names:
+            status_repo.delete(job_name=job_name)
 
     logger.debug("Deleting jobs that are past their expiration date.")
     schedules: typing.Dict[str, typing.FrozenSet[domain.Schedule]] = {
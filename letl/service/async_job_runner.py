@@ -0,0 +1,200 @@
+import asyncio
+import functools
+import threading
+import typing
+
+from letl import domain
+from letl.service.dispatcher import Dispatcher
+from letl.service.job_claimer import JobClaimer
+from letl.service.job_lifecycle import (
+    add_queue_wait,
+    save_result,
+    schedule_retry,
+    start_job,
+)
+from letl.service.scheduler import enqueue_ready_dependents
+from letl.service.shard_tracker import ShardTracker
+
+__all__ = ("AsyncJobRunner",)
+
+mod_logger = domain.root_logger.getChild("async_job_runner")
+
+T = typing.TypeVar("T")
+
+
+class AsyncJobRunner(threading.Thread):
+    def __init__(
+        self,
+        *,
+        status_repo: domain.StatusRepo,
+        dispatcher: Dispatcher,
+        logger: domain.Logger,
+        resources: typing.FrozenSet[domain.Resource[typing.Any]],
+        max_concurrent_jobs: int,
+        on_status_change: typing.Optional[typing.Callable[[str], None]] = None,
+        job_graph: typing.Optional[domain.JobGraph] = None,
+        limiter: typing.Optional[domain.ResourceLimiter] = None,
+        claimer: typing.Optional[JobClaimer] = None,
+        shards: typing.Optional[ShardTracker] = None,
+    ):
+        """Runs async def jobs concurrently on one event loop
+
+        Timeouts are enforced by cancelling the job.  Status updates and other blocking calls
+        are pushed to the loop's default executor so they don't stall the other jobs.
+        """
+        super().__init__()
+
+        self._status_repo = status_repo
+        self._dispatcher = dispatcher
+        self._logger = logger
+        self._resources = resources
+        self._max_concurrent_jobs = max_concurrent_jobs
+        self._on_status_change = on_status_change
+        self._job_graph = job_graph
+        self._limiter = limiter
+        self._claimer = claimer
+        self._shards = shards
+
+        self._loop = asyncio.new_event_loop()
+        self._semaphore: typing.Optional[asyncio.Semaphore] = None
+
+    def run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def submit(self, job: domain.Job, queue_wait_seconds: float, /) -> None:
+        """Schedule an async job on the event loop.  Safe to call from any thread."""
+        asyncio.run_coroutine_threadsafe(
+            self._run_job(job, queue_wait_seconds), self._loop
+        )
+
+    async def _run_job(self, job: domain.Job, queue_wait_seconds: float) -> None:
+        # created on first use so that it is bound to the event loop's thread
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent_jobs)
+
+        try:
+            try:
+                async with self._semaphore:
+                    result = await run_async_job(
+                        job=job,
+                        status_repo=self._status_repo,
+                        logger=self._logger,
+                        resources=self._resources,
+                        on_status_change=self._on_status_change,
+                        limiter=self._limiter,
+                        queue_wait_seconds=queue_wait_seconds,
+                    )
+            finally:
+                try:
+                    # the job runner took these before handing the job off
+                    if self._claimer:
+                        await in_executor(self._claimer.release, job)
+                    if self._limiter:
+                        self._limiter.release_all(job.resource_keys)
+                finally:
+                    self._dispatcher.finished(job.job_name)
+            # see JobRunner.run for why this waits until the job is finished
+            retrying = schedule_retry(
+                job=job,
+                result=result,
+                dispatcher=self._dispatcher,
+                logger=self._logger,
+            )
+            if self._shards and self._shards.is_shard(job.job_name):
+                if not retrying:
+                    await in_executor(self._shards.shard_finished, job, result)
+            elif self._job_graph and not result.is_error:
+                await in_executor(
+                    enqueue_ready_dependents,
+                    job_name=job.job_name,
+                    job_graph=self._job_graph,
+                    dispatcher=self._dispatcher,
+                    status_repo=self._status_repo,
+                    logger=self._logger,
+                )
+        except Exception as e:
+            # noinspection PyBroadException
+            try:
+                self._logger.exception(e)
+            except:
+                mod_logger.exception(e)
+
+
+async def run_async_job(
+    *,
+    job: domain.Job,
+    status_repo: domain.StatusRepo,
+    logger: domain.Logger,
+    resources: typing.FrozenSet[domain.Resource[typing.Any]],
+    on_status_change: typing.Optional[typing.Callable[[str], None]] = None,
+    limiter: typing.Optional[domain.ResourceLimiter] = None,
+    queue_wait_seconds: typing.Optional[float] = None,
+) -> domain.JobResult:
+    await in_executor(
+        start_job,
+        job=job,
+        status_repo=status_repo,
+        logger=logger,
+        on_status_change=on_status_change,
+    )
+    resource_manager = domain.ResourceManager(
+        resources=resources,
+        log=logger,
+        limiter=limiter,
+        held_keys=job.resource_keys,
+    )
+    try:
+        result = await asyncio.wait_for(
+            execute_async_job(
+                job=job,
+                logger=logger.new(name=f"{logger.name}.{job.job_name}"),
+                resources=resource_manager,
+            ),
+            timeout=job.timeout_seconds,
+        )
+    except asyncio.TimeoutError:
+        result = domain.JobResult.error(
+            domain.error.JobTimedOut(
+                f"The job, [{job.job_name}], timed out after {job.timeout_seconds} seconds."
+            )
+        )
+    finally:
+        await resource_manager.aclose()
+    if queue_wait_seconds is not None:
+        result = add_queue_wait(result, seconds=queue_wait_seconds)
+    await in_executor(
+        save_result,
+        job=job,
+        result=result,
+        status_repo=status_repo,
+        logger=logger,
+        on_status_change=on_status_change,
+    )
+    return result
+
+
+# noinspection PyBroadException
+async def execute_async_job(
+    *,
+    job: domain.Job,
+    logger: domain.Logger,
+    resources: domain.ResourceManager,
+) -> domain.JobResult:
+    try:
+        result = await typing.cast(
+            typing.Awaitable[typing.Optional[domain.JobResult]],
+            job.run(job.config, logger, resources),
+        )
+        if result is None:
+            result = domain.JobResult.success()
+        return result
+    except Exception as e:
+        return domain.JobResult.error(e)
+
+
+async def in_executor(
+    fn: typing.Callable[..., T], /, *args: typing.Any, **kwargs: typing.Any
+) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
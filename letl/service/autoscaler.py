@@ -0,0 +1,137 @@
+import dataclasses
+import math
+import os
+import threading
+import time
+import typing
+
+from letl import domain
+from letl.service.dispatcher import DispatchStats, Dispatcher
+
+__all__ = ("Autoscaler",)
+
+mod_logger = domain.root_logger.getChild("autoscaler")
+
+
+@dataclasses.dataclass(frozen=True)
+class HostLoad:
+    load_per_cpu: typing.Optional[float]
+    available_memory_mb: typing.Optional[float]
+
+
+class Autoscaler(threading.Thread):
+    def __init__(
+        self,
+        *,
+        dispatcher: Dispatcher,
+        logger: domain.Logger,
+        min_runners: int,
+        max_runners: int,
+        seconds_between_checks: float = 30,
+        max_load_per_cpu: float = 1.5,
+        min_available_memory_mb: float = 256,
+    ):
+        """Grows and shrinks the number of jobs that may run at once
+
+        The dispatcher's capacity is raised while jobs pile up in the queue faster than the
+        current runners can clear them, and lowered while runners sit idle or while the host
+        is short on CPU or memory.  Job runner threads beyond the capacity wait in
+        Dispatcher.take, so max_runners threads are started up front.
+        """
+        super().__init__()
+
+        self._dispatcher = dispatcher
+        self._logger = logger
+        self._min_runners = min_runners
+        self._max_runners = max_runners
+        self._seconds_between_checks = seconds_between_checks
+        self._max_load_per_cpu = max_load_per_cpu
+        self._min_available_memory_mb = min_available_memory_mb
+
+    def run(self) -> None:
+        while True:
+            try:
+                time.sleep(self._seconds_between_checks)
+                self.check()
+            except Exception as e:
+                # noinspection PyBroadException
+                try:
+                    self._logger.exception(e)
+                except:
+                    mod_logger.exception(e)
+
+    def check(self) -> int:
+        stats = self._dispatcher.stats
+        load = host_load()
+        capacity = next_capacity(
+            stats=stats,
+            load=load,
+            min_runners=self._min_runners,
+            max_runners=self._max_runners,
+            max_load_per_cpu=self._max_load_per_cpu,
+            min_available_memory_mb=self._min_available_memory_mb,
+            seconds_between_checks=self._seconds_between_checks,
+        )
+        if capacity != stats.runners:
+            self._logger.info(
+                f"Changing the number of runners from {stats.runners} to {capacity}: "
+                f"{stats}, load per cpu {load.load_per_cpu}, "
+                f"{load.available_memory_mb} MB available."
+            )
+            self._dispatcher.set_capacity(capacity)
+        return capacity
+
+
+def next_capacity(
+    *,
+    stats: DispatchStats,
+    load: HostLoad,
+    min_runners: int,
+    max_runners: int,
+    max_load_per_cpu: float,
+    min_available_memory_mb: float,
+    seconds_between_checks: float,
+) -> int:
+    capacity = stats.runners
+    overloaded = (
+        load.load_per_cpu is not None and load.load_per_cpu > max_load_per_cpu
+    ) or (
+        load.available_memory_mb is not None
+        and load.available_memory_mb < min_available_memory_mb
+    )
+    if overloaded:
+        return max(capacity - 1, min_runners)
+
+    if stats.queued:
+        # recent run times tell whether the current runners will clear the backlog before the
+        # next check; with no history, assume they won't
+        run_seconds = stats.avg_run_seconds or seconds_between_checks
+        runners_needed = math.ceil(stats.queued * run_seconds / seconds_between_checks)
+        if stats.in_flight + runners_needed > capacity:
+            return min(stats.in_flight + runners_needed, max_runners)
+        return capacity
+
+    idle_runners = capacity - stats.in_flight
+    if idle_runners > 1:
+        return max(capacity - 1, min_runners)
+    return max(capacity, min_runners)
+
+
+def host_load() -> HostLoad:
+    try:
+        load_per_cpu: typing.Optional[float] = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        load_per_cpu = None
+    return HostLoad(load_per_cpu=load_per_cpu, available_memory_mb=available_memory_mb())
+
+
+def available_memory_mb() -> typing.Optional[float]:
+    """Read MemAvailable from /proc/meminfo, which is only available on Linux"""
+    try:
+        with open("/proc/meminfo") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
@@ -0,0 +1,258 @@
+import collections
+import dataclasses
+import datetime
+import queue
+import threading
+import time
+import typing
+
+from letl import domain
+from letl.service.reaper import Reaped
+
+__all__ = ("DispatchStats", "Dispatcher")
+
+
+@dataclasses.dataclass(frozen=True)
+class DispatchStats:
+    runners: int
+    queued: int
+    in_flight: int
+    async_in_flight: int
+    retrying: int
+    oldest_wait_seconds: float
+    avg_wait_seconds: float
+    avg_run_seconds: float
+    timeouts: int = 0
+    timeouts_killed: int = 0
+    avg_reap_seconds: float = 0.0
+
+    @property
+    def is_saturated(self) -> bool:
+        return self.queued > 0 and self.in_flight >= self.runners
+
+    def __str__(self) -> str:
+        return (
+            f"{self.in_flight}/{self.runners} runners busy, {self.async_in_flight} async jobs "
+            f"running, {self.retrying} jobs waiting to retry, {self.queued} jobs queued "
+            f"(oldest waiting {self.oldest_wait_seconds:.1f}s, "
+            f"recent avg wait {self.avg_wait_seconds:.1f}s), {self.timeouts} timed out "
+            f"({self.timeouts_killed} killed, recent avg stop {self.avg_reap_seconds:.1f}s)"
+        )
+
+
+class Dispatcher:
+    def __init__(self, *, job_queue: "queue.Queue[domain.Job]", runners: int):
+        """Hands jobs to the job runners without ever blocking the caller
+
+        Parameters
+        ----------
+        job_queue
+            Queue the job runners take jobs from.  It should be unbounded, since the dispatcher
+            already keeps each job from being queued more than once.
+        runners
+            Number of jobs that may run at once.  Job runners beyond this number wait in take()
+            until it is raised with set_capacity.
+        """
+        self._job_queue = job_queue
+        self._runners = runners
+
+        self._lock = threading.Condition()
+        self._taking = 0
+        self._queued: typing.Dict[str, float] = {}
+        self._checked_at: typing.Dict[str, datetime.datetime] = {}
+        self._due_since: typing.Dict[str, datetime.datetime] = {}
+        self._in_flight: typing.Set[str] = set()
+        self._async_in_flight: typing.Set[str] = set()
+        self._fanned_out: typing.Set[str] = set()
+        self._retrying: typing.Dict[str, threading.Timer] = {}
+        self._failed_attempts: typing.Dict[str, int] = {}
+        self._recent_waits: typing.Deque[float] = collections.deque(maxlen=100)
+        self._started: typing.Dict[str, float] = {}
+        self._recent_durations: typing.Deque[float] = collections.deque(maxlen=100)
+        self._timeouts = 0
+        self._timeouts_killed = 0
+        self._recent_reap_seconds: typing.Deque[float] = collections.deque(maxlen=100)
+
+    def dispatch(
+        self,
+        job: domain.Job,
+        /,
+        *,
+        checked_at: typing.Optional[datetime.datetime] = None,
+        due_since: typing.Optional[datetime.datetime] = None,
+    ) -> bool:
+        """Add a job to the queue unless it is already queued or running
+
+        Parameters
+        ----------
+        job
+            Job to queue
+        checked_at
+            When the statuses that showed the job was ready were read.  Defaults to now.
+        due_since
+            When the job became due, which orders jobs of the same priority in a
+            PrioritySetQueue.  Defaults to now.
+
+        Returns
+        -------
+        True if the job was added to the queue
+        """
+        with self._lock:
+            if (
+                job.job_name in self._queued
+                or job.job_name in self._in_flight
+                or job.job_name in self._async_in_flight
+                or job.job_name in self._fanned_out
+                or job.job_name in self._retrying
+            ):
+                return False
+            now = datetime.datetime.now()
+            self._due_since[job.job_name] = due_since or now
+            try:
+                self._job_queue.put_nowait(job)
+            except queue.Full:
+                del self._due_since[job.job_name]
+                return False
+            self._queued[job.job_name] = time.monotonic()
+            self._checked_at[job.job_name] = checked_at or now
+            return True
+
+    def fanned_out(self, job_name: str, /) -> None:
+        """A partitioned job's shards were queued, so the job no longer holds a runner"""
+        with self._lock:
+            self._free_runner(job_name)
+            self._fanned_out.add(job_name)
+
+    def finished(self, job_name: str, /) -> None:
+        with self._lock:
+            self._free_runner(job_name, ran=True)
+            self._async_in_flight.discard(job_name)
+            self._fanned_out.discard(job_name)
+
+    def checked_at(self, job_name: str, /) -> typing.Optional[datetime.datetime]:
+        """When the statuses that showed a job taken by a runner was ready were read"""
+        with self._lock:
+            return self._checked_at.get(job_name)
+
+    def due_since(self, job_name: str, /) -> typing.Optional[datetime.datetime]:
+        """When a queued job became due"""
+        with self._lock:
+            return self._due_since.get(job_name)
+
+    def failed_attempts(self, job_name: str, /) -> int:
+        """Number of consecutive failed attempts since the job last succeeded or gave up"""
+        with self._lock:
+            return self._failed_attempts.get(job_name, 0)
+
+    def give_up(self, job_name: str, /) -> None:
+        """Forget the job's failed attempts, so the next run starts a fresh set of retries"""
+        with self._lock:
+            self._failed_attempts.pop(job_name, None)
+
+    def defer(self, job: domain.Job, /, *, delay_seconds: float) -> None:
+        """Dispatch the job again after a delay
+
+        The job doesn't hold a runner while it waits, and it can't be dispatched by the scheduler
+        in the meantime.
+        """
+        with self._lock:
+            self._free_runner(job.job_name)
+            self._async_in_flight.discard(job.job_name)
+            timer = threading.Timer(delay_seconds, self._retry_now, args=(job,))
+            timer.daemon = True
+            self._retrying[job.job_name] = timer
+            timer.start()
+
+    def retry(self, job: domain.Job, /, *, delay_seconds: float) -> None:
+        """Count a failed attempt and dispatch the job again after a delay"""
+        with self._lock:
+            self._failed_attempts[job.job_name] = (
+                self._failed_attempts.get(job.job_name, 0) + 1
+            )
+        self.defer(job, delay_seconds=delay_seconds)
+
+    def _retry_now(self, job: domain.Job, /) -> None:
+        with self._lock:
+            self._retrying.pop(job.job_name, None)
+        self.dispatch(job)
+
+    def reaped(self, reaped: Reaped, /) -> None:
+        """Count a job process that was stopped because it timed out"""
+        with self._lock:
+            self._timeouts += 1
+            if reaped.killed:
+                self._timeouts_killed += 1
+            self._recent_reap_seconds.append(reaped.seconds)
+
+    def handed_off(self, job_name: str, /) -> None:
+        """A runner handed the job to the event loop, so it no longer holds a runner"""
+        with self._lock:
+            self._free_runner(job_name)
+            self._async_in_flight.add(job_name)
+
+    @property
+    def stats(self) -> DispatchStats:
+        now = time.monotonic()
+        with self._lock:
+            return DispatchStats(
+                runners=self._runners,
+                queued=len(self._queued),
+                in_flight=len(self._in_flight),
+                async_in_flight=len(self._async_in_flight),
+                retrying=len(self._retrying),
+                oldest_wait_seconds=now - min(self._queued.values(), default=now),
+                avg_wait_seconds=average(self._recent_waits),
+                avg_run_seconds=average(self._recent_durations),
+                timeouts=self._timeouts,
+                timeouts_killed=self._timeouts_killed,
+                avg_reap_seconds=average(self._recent_reap_seconds),
+            )
+
+    def take(self) -> typing.Tuple[domain.Job, float]:
+        """Block until a job is available
+
+        Returns
+        -------
+        The job and the number of seconds it waited in the queue
+        """
+        with self._lock:
+            while self._taking + len(self._in_flight) >= self._runners:
+                self._lock.wait()
+            self._taking += 1
+        try:
+            job = self._job_queue.get()
+        except BaseException:
+            with self._lock:
+                self._taking -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._taking -= 1
+            now = time.monotonic()
+            queued_at = self._queued.pop(job.job_name, None)
+            self._due_since.pop(job.job_name, None)
+            wait_seconds = now - queued_at if queued_at else 0.0
+            self._in_flight.add(job.job_name)
+            self._started[job.job_name] = now
+            self._recent_waits.append(wait_seconds)
+        return job, wait_seconds
+
+    def set_capacity(self, runners: int, /) -> None:
+        """Change the number of jobs that may run at once"""
+        with self._lock:
+            self._runners = runners
+            self._lock.notify_all()
+
+    def _free_runner(self, job_name: str, /, *, ran: bool = False) -> None:
+        # must be called while holding the lock
+        started = self._started.pop(job_name, None)
+        self._checked_at.pop(job_name, None)
+        if job_name in self._in_flight:
+            self._in_flight.discard(job_name)
+            if ran and started is not None:
+                self._recent_durations.append(time.monotonic() - started)
+            self._lock.notify()
+
+
+def average(values: typing.Collection[float], /) -> float:
+    return sum(values) / len(values) if values else 0.0
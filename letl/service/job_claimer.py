@@ -0,0 +1,67 @@
+import datetime
+
+from letl import domain
+
+__all__ = ("JobClaimer",)
+
+# leases outlive the job's timeout by this much, to cover the soft-timeout grace period
+LEASE_MARGIN_SECONDS = 30
+
+
+class JobClaimer:
+    def __init__(
+        self,
+        *,
+        lease_repo: domain.LeaseRepo,
+        status_repo: domain.StatusRepo,
+        node_id: str,
+        logger: domain.Logger,
+    ):
+        """Makes sure only one of the nodes sharing an ETL database runs a job at a time
+
+        A node that dies holding a lease is taken over by another node once the lease expires.
+        """
+        self._lease_repo = lease_repo
+        self._status_repo = status_repo
+        self._node_id = node_id
+        self._logger = logger
+
+    @property
+    def node_id(self) -> str:
+        return self._node_id
+
+    def claim(self, job: domain.Job, /, *, checked_at: datetime.datetime) -> bool:
+        """Take the lease on a job
+
+        Parameters
+        ----------
+        job
+            Job to claim
+        checked_at
+            When the statuses that showed the job was ready were read
+
+        Returns
+        -------
+        False if another node is running the job, or has started it since it was checked,
+        even if that run has already finished
+        """
+        if not self._lease_repo.claim(
+            job_name=job.job_name,
+            node_id=self._node_id,
+            seconds=job.timeout_seconds + LEASE_MARGIN_SECONDS,
+        ):
+            self._logger.debug(f"[{job.job_name}] is leased by another node.")
+            return False
+
+        # another node may have run the job between the check and the claim
+        status = self._status_repo.status(job_name=job.job_name)
+        if status and status.started >= checked_at:
+            self._logger.debug(
+                f"[{job.job_name}] was started by another node at {status.started}."
+            )
+            self.release(job)
+            return False
+        return True
+
+    def release(self, job: domain.Job, /) -> None:
+        self._lease_repo.release(job_name=job.job_name, node_id=self._node_id)
@@ -0,0 +1,76 @@
+import dataclasses
+import typing
+
+from letl import domain
+from letl.service.dispatcher import Dispatcher
+
+__all__ = ("add_queue_wait", "save_result", "schedule_retry", "start_job")
+
+
+def add_queue_wait(result: domain.JobResult, /, *, seconds: float) -> domain.JobResult:
+    metrics = result.metrics or domain.RunMetrics()
+    return dataclasses.replace(
+        result, metrics=dataclasses.replace(metrics, queue_wait_seconds=seconds)
+    )
+
+
+def start_job(
+    *,
+    job: domain.Job,
+    status_repo: domain.StatusRepo,
+    logger: domain.Logger,
+    on_status_change: typing.Optional[typing.Callable[[str], None]] = None,
+) -> None:
+    logger.info(f"Starting [{job.job_name}]...")
+    status_repo.start(job_name=job.job_name)
+    if on_status_change:
+        on_status_change(job.job_name)
+
+
+def save_result(
+    *,
+    job: domain.Job,
+    result: domain.JobResult,
+    status_repo: domain.StatusRepo,
+    logger: domain.Logger,
+    on_status_change: typing.Optional[typing.Callable[[str], None]] = None,
+) -> None:
+    logger.debug(f"Saving results of [{job.job_name}] to database")
+    if result.is_error:
+        err_msg = result.error_message or "no error message was provided."
+        status_repo.error(
+            job_name=job.job_name, error=err_msg, metrics=result.metrics
+        )
+        logger.error(err_msg)
+    else:
+        status_repo.done(job_name=job.job_name, metrics=result.metrics)
+        logger.info(f"[{job.job_name}] finished.")
+    if on_status_change:
+        on_status_change(job.job_name)
+
+
+def schedule_retry(
+    *,
+    job: domain.Job,
+    result: domain.JobResult,
+    dispatcher: Dispatcher,
+    logger: domain.Logger,
+) -> bool:
+    """Dispatch a failed job again after its backoff delay if it has retries left
+
+    Returns
+    -------
+    True if a retry was scheduled
+    """
+    if result.is_error:
+        attempt = dispatcher.failed_attempts(job.job_name) + 1
+        if attempt <= job.retries:
+            delay_seconds = job.retry_backoff.delay(attempt=attempt)
+            logger.info(
+                f"[{job.job_name}] failed on attempt {attempt} of {job.retries + 1}, retrying in "
+                f"{delay_seconds:.1f}s."
+            )
+            dispatcher.retry(job, delay_seconds=delay_seconds)
+            return True
+    dispatcher.give_up(job.job_name)
+    return False
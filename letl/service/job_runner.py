@@ -1,43 +1,137 @@
+import datetime
 import multiprocessing as mp
 import queue
 import threading
 import typing
 
-import sqlalchemy as sa
-
-from letl import adapter, domain
+from letl import domain
+from letl.service.dispatcher import Dispatcher
+from letl.service.job_claimer import JobClaimer
+from letl.service.job_lifecycle import (
+    add_queue_wait,
+    save_result,
+    schedule_retry,
+    start_job,
+)
+from letl.service.logger import flush_logs
+from letl.service.reaper import Reaped, reap, soft_timeout, timed_out
+from letl.service.scheduler import enqueue_ready_dependents
+from letl.service.shard_tracker import ShardTracker
+from letl.service.worker import Worker, execute_job
 
 __all__ = ("JobRunner",)
 
 mod_logger = domain.root_logger.getChild("job_runner")
 
+SATURATED_RESOURCE_RETRY_SECONDS = 1
+
 
 class JobRunner(threading.Thread):
     def __init__(
         self,
         *,
-        engine: sa.engine.Engine,
-        job_queue: "queue.Queue[domain.Job]",
+        status_repo: domain.StatusRepo,
+        dispatcher: Dispatcher,
         logger: domain.Logger,
         resources: typing.FrozenSet[domain.Resource[typing.Any]],
+        on_status_change: typing.Optional[typing.Callable[[str], None]] = None,
+        job_graph: typing.Optional[domain.JobGraph] = None,
+        worker: typing.Optional[Worker] = None,
+        submit_async: typing.Optional[
+            typing.Callable[[domain.Job, float], None]
+        ] = None,
+        limiter: typing.Optional[domain.ResourceLimiter] = None,
+        claimer: typing.Optional[JobClaimer] = None,
+        shards: typing.Optional[ShardTracker] = None,
     ):
         super().__init__()
 
-        self._engine = engine
-        self._job_queue = job_queue
+        self._status_repo = status_repo
+        self._dispatcher = dispatcher
         self._logger = logger
         self._resources = resources
+        self._on_status_change = on_status_change
+        self._job_graph = job_graph
+        self._worker = worker
+        self._submit_async = submit_async
+        self._limiter = limiter
+        self._claimer = claimer
+        self._shards = shards
 
     def run(self) -> None:
         while True:
             try:
-                job = self._job_queue.get()
-                run_job(
+                job, wait_seconds = self._dispatcher.take()
+                self._logger.debug(
+                    f"[{job.job_name}] waited {wait_seconds:.3f}s in the queue."
+                )
+                checked_at = self._dispatcher.checked_at(job.job_name)
+                if checked_at is None:
+                    checked_at = datetime.datetime.now() - datetime.timedelta(
+                        seconds=wait_seconds
+                    )
+                if job.partitioner and self._shards:
+                    self._fan_out(job, checked_at=checked_at)
+                    continue
+
+                held_keys = self._keys_to_hold(job)
+                if self._limiter and not self._limiter.acquire_all(held_keys):
+                    self._logger.debug(
+                        f"[{job.job_name}] is waiting for a saturated resource."
+                    )
+                    self._dispatcher.defer(
+                        job, delay_seconds=SATURATED_RESOURCE_RETRY_SECONDS
+                    )
+                    continue
+
+                if self._claimer and not self._claimer.claim(job, checked_at=checked_at):
+                    if self._limiter:
+                        self._limiter.release_all(held_keys)
+                    self._dispatcher.finished(job.job_name)
+                    continue
+
+                # the async runner releases the job's resource slots and lease when it finishes
+                if job.is_async and self._submit_async:
+                    self._dispatcher.handed_off(job.job_name)
+                    self._submit_async(job, wait_seconds)
+                    continue
+
+                try:
+                    result = run_job(
+                        job=job,
+                        status_repo=self._status_repo,
+                        logger=self._logger,
+                        resources=self._resources,
+                        on_status_change=self._on_status_change,
+                        worker=self._worker,
+                        queue_wait_seconds=wait_seconds,
+                        on_reaped=self._dispatcher.reaped,
+                    )
+                finally:
+                    if self._claimer:
+                        self._claimer.release(job)
+                    if self._limiter:
+                        self._limiter.release_all(held_keys)
+                    self._dispatcher.finished(job.job_name)
+                # only once the lease, slots and runner are free, or a retry with no delay
+                # could find the job still running and be dropped
+                retrying = schedule_retry(
                     job=job,
-                    engine=self._engine,
+                    result=result,
+                    dispatcher=self._dispatcher,
                     logger=self._logger,
-                    resources=self._resources,
                 )
+                if self._shards and self._shards.is_shard(job.job_name):
+                    if not retrying:
+                        self._shards.shard_finished(job, result)
+                elif self._job_graph and not result.is_error:
+                    enqueue_ready_dependents(
+                        job_name=job.job_name,
+                        job_graph=self._job_graph,
+                        dispatcher=self._dispatcher,
+                        status_repo=self._status_repo,
+                        logger=self._logger,
+                    )
             except Exception as e:
                 # noinspection PyBroadException
                 try:
@@ -45,35 +139,65 @@ class JobRunner(threading.Thread):
                 except:
                     mod_logger.exception(e)
 
+    def _keys_to_hold(self, job: domain.Job, /) -> typing.AbstractSet[str]:
+        # async jobs run in this process, so they can also take slots as they open resources
+        if job.is_async and self._submit_async:
+            return job.resource_keys
+        return domain.keys_to_hold(resource_keys=job.resource_keys, resources=self._resources)
+
+    def _fan_out(self, job: domain.Job, /, *, checked_at: datetime.datetime) -> None:
+        assert self._shards is not None
+        if self._claimer and not self._claimer.claim(job, checked_at=checked_at):
+            self._dispatcher.finished(job.job_name)
+            return
+        try:
+            self._shards.fan_out(job)
+        except Exception:
+            self._dispatcher.finished(job.job_name)
+            raise
+        finally:
+            # each shard is claimed on its own when it runs
+            if self._claimer:
+                self._claimer.release(job)
+
 
 def run_job(
     *,
     job: domain.Job,
-    engine: sa.engine.Engine,
+    status_repo: domain.StatusRepo,
     logger: domain.Logger,
     resources: typing.FrozenSet[domain.Resource[typing.Any]],
-) -> None:
-    status_repo = adapter.DbStatusRepo(engine=engine)
-    logger.info(f"Starting [{job.job_name}]...")
-    status_repo.start(job_name=job.job_name)
-    resource_manager = domain.ResourceManager(resources=resources, log=logger)
-    try:
+    on_status_change: typing.Optional[typing.Callable[[str], None]] = None,
+    worker: typing.Optional[Worker] = None,
+    queue_wait_seconds: typing.Optional[float] = None,
+    on_reaped: typing.Optional[typing.Callable[[Reaped], None]] = None,
+) -> domain.JobResult:
+    start_job(
+        job=job,
+        status_repo=status_repo,
+        logger=logger,
+        on_status_change=on_status_change,
+    )
+    if worker:
+        result = worker.run(job=job, on_reaped=on_reaped)
+    else:
         result = run_job_in_process(
             logger=logger.new(name=f"{logger.name}.{job.job_name}"),
             job=job,
-            resources=resource_manager,
+            # the caller holds the job's limiter slots, see domain.keys_to_hold
+            resources=domain.ResourceManager(resources=resources, log=logger),
+            on_reaped=on_reaped,
         )
-        logger.debug(f"Saving results of [{job.job_name}] to database")
-        if result.is_error:
-            err_msg = result.error_message or "no error message was provided."
-            status_repo.error(job_name=job.job_name, error=err_msg)
-            logger.error(err_msg)
-        else:
-            status_repo.done(job_name=job.job_name)
-            logger.info(f"[{job.job_name}] finished.")
-    finally:
-        resource_manager.close()
-        logger.debug(f"{job.job_name} resources have been closed.")
+    if queue_wait_seconds is not None:
+        result = add_queue_wait(result, seconds=queue_wait_seconds)
+    save_result(
+        job=job,
+        result=result,
+        status_repo=status_repo,
+        logger=logger,
+        on_status_change=on_status_change,
+    )
+    return result
 
 
 def run_job_in_process(
@@ -81,11 +205,12 @@ def run_job_in_process(
     logger: domain.Logger,
     job: domain.Job,
     resources: domain.ResourceManager,
+    on_reaped: typing.Optional[typing.Callable[[Reaped], None]] = None,
 ) -> domain.JobResult:
     result_queue: "mp.Queue[domain.JobResult]" = mp.Queue()
     p = mp.Process(
-        target=run_job_with_retry,
-        args=(result_queue, job, logger, resources, 0),
+        target=run_job_in_child,
+        args=(result_queue, job, logger, resources),
     )
     try:
         p.start()
@@ -93,11 +218,11 @@ def run_job_in_process(
         p.join()
         return result
     except queue.Empty:
-        return domain.JobResult.error(
-            domain.error.JobTimedOut(
-                f"The job, [{job.job_name}], timed out after {job.timeout_seconds} seconds."
-            )
-        )
+        reaped = reap(p)
+        logger.info(f"[{job.job_name}] timed out: {reaped}.")
+        if on_reaped:
+            on_reaped(reaped)
+        return timed_out(job=job, reaped=reaped)
     except Exception as e:
         logger.exception(e)
         return domain.JobResult.error(e)
@@ -105,27 +230,17 @@ def run_job_in_process(
         result_queue.close()
 
 
-# noinspection PyBroadException
-def run_job_with_retry(
+def run_job_in_child(
     result_queue: "mp.Queue[domain.JobResult]",
     job: domain.Job,
     logger: domain.Logger,
     resources: domain.ResourceManager,
-    retries_so_far: int = 0,
 ) -> None:
     try:
-        result = job.run(job.config, logger, resources)  # type: ignore
-        if result is None:
-            result = domain.JobResult.success()
-        result_queue.put(result)
-    except Exception as e:
-        if job.retries > retries_so_far:
-            run_job_with_retry(
-                result_queue=result_queue,
-                job=job,
-                logger=logger,
-                resources=resources,
-                retries_so_far=retries_so_far + 1,
-            )
-        else:
-            result_queue.put(domain.JobResult.error(e))
+        with soft_timeout(job_name=job.job_name, timeout_seconds=job.timeout_seconds):
+            result = execute_job(job=job, logger=logger, resources=resources)
+    except domain.error.JobSoftTimeout:
+        return
+    finally:
+        flush_logs()
+    result_queue.put(result)
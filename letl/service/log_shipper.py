@@ -0,0 +1,56 @@
+import threading
+
+from letl import adapter, domain
+
+__all__ = ("LogShipper",)
+
+mod_logger = domain.root_logger.getChild("log_shipper")
+
+
+class LogShipper(threading.Thread):
+    def __init__(
+        self,
+        *,
+        segments: adapter.SegmentLogRepo,
+        repo: domain.LogRepo,
+        seconds_between_checks: float = 5,
+    ):
+        """Loads the closed log segments into another repo, usually the database
+
+        Each segment is loaded in one add_many call and deleted once that succeeds, so a
+        segment that fails to load is retried on the next check.
+        """
+        super().__init__()
+
+        self._segments = segments
+        self._repo = repo
+        self._seconds_between_checks = seconds_between_checks
+
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self._seconds_between_checks):
+            self._segments.rotate_if_stale()
+            self.ship()
+        # the LoggerThread has written its last batch by now
+        self._segments.close()
+        self.ship()
+
+    def ship(self) -> int:
+        """Load the closed segments, and return how many messages were loaded"""
+        messages_shipped = 0
+        for path in self._segments.closed_segments():
+            try:
+                messages = adapter.read_segment(path)
+                self._repo.add_many(messages)
+            except Exception as e:
+                # the database may be down, so this can't be logged there
+                mod_logger.exception(e)
+                break
+            path.unlink()
+            messages_shipped += len(messages)
+        return messages_shipped
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
@@ -1,32 +1,66 @@
+import collections
+import dataclasses
 import datetime
 import multiprocessing as mp
+import os
+import queue
 import sys
 import threading
+import time
 import traceback
 import typing
 
-import sqlalchemy as sa
+from letl import domain, Logger
 
-from letl import adapter, domain, Logger
-
-__all__ = ("LoggerThread", "NamedLogger")
+__all__ = ("LoggerThread", "LogQueueItem", "NamedLogger", "flush_logs")
 
 std_logger = domain.root_logger.getChild("sa_logger")
 
+# job processes send their messages in batches, and None tells the LoggerThread to stop
+LogQueueItem = typing.Union[None, domain.LogMessage, typing.Tuple[domain.LogMessage, ...]]
+
+CHILD_LOG_BATCH_SIZE = 100
+CHILD_LOG_FLUSH_SECONDS = 1
+
+OVERFLOW_SAMPLE_EVERY = 10
+OVERFLOW_SUMMARY_SECONDS = 60
+
+# forked job processes inherit this, so they can tell that they are not the main process
+_main_pid = os.getpid()
+
+
+@dataclasses.dataclass
+class _Recent:
+    last_sent: float
+    suppressed: int = 0
+
 
 class NamedLogger(domain.Logger):
+    """Logger that sends its messages to the LoggerThread through a queue
+
+    A message that repeats within dedup_seconds of the last time it was sent is suppressed.
+    The dedup_capacity most recently seen messages are remembered, and the next time a
+    suppressed message is sent, it notes how many repeats were dropped.
+    """
+
     def __init__(
         self,
         *,
         name: str,
-        message_queue: "mp.Queue[domain.LogMessage]",
+        message_queue: "mp.Queue[LogQueueItem]",
         log_to_console: bool = False,
         min_log_level: domain.LogLevel = domain.LogLevel.Info,
+        dedup_capacity: int = 30,
+        dedup_seconds: float = 10,
+        overflow_policy: domain.LogOverflowPolicy = domain.LogOverflowPolicy.Block,
     ):
         self._name = name
         self._message_queue = message_queue
         self._log_to_console = log_to_console
         self._min_log_level = min_log_level
+        self._dedup_capacity = dedup_capacity
+        self._dedup_seconds = dedup_seconds
+        self._overflow_policy = overflow_policy
 
         self._log_level_numeric_value = {
             domain.LogLevel.Debug: 0,
@@ -34,86 +68,100 @@ class NamedLogger(domain.Logger):
             domain.LogLevel.Error: 2,
         }
 
-        self._recent_messages: typing.Dict[str, datetime.datetime] = {}
+        # least recently seen first
+        self._recent_messages: "collections.OrderedDict[str, _Recent]" = (
+            collections.OrderedDict()
+        )
+        self._suppressed = 0
+
+    @property
+    def suppressed(self) -> int:
+        """How many repeated messages this logger has dropped"""
+        return self._suppressed
+
+    def is_enabled(self, /, level: domain.LogLevel) -> bool:
+        return (
+            self._log_level_numeric_value[level]
+            >= self._log_level_numeric_value[self._min_log_level]
+        )
 
     def _log(
         self,
         *,
         level: domain.LogLevel,
-        message: str,
+        message: domain.LogText,
+        args: typing.Tuple[typing.Any, ...] = (),
         ts: typing.Optional[datetime.datetime] = None,
     ) -> None:
-        if (
-            self._log_level_numeric_value[level]
-            >= self._log_level_numeric_value[self._min_log_level]
-        ):
-            self._recent_messages = {
-                msg: last_sent
-                for msg, last_sent in sorted(
-                    self._recent_messages.items(),
-                    key=lambda tup: tup[1],
-                    reverse=True,
-                )[:30]
-            }
-            if message in self._recent_messages:
-                last_sent = self._recent_messages[message]
-                if last_sent:
-                    seconds_since_last_sent: typing.Optional[float] = (
-                        datetime.datetime.now() - last_sent
-                    ).total_seconds()
-                else:
-                    seconds_since_last_sent = None
-            else:
-                seconds_since_last_sent = None
-
-            if not seconds_since_last_sent or seconds_since_last_sent > 10:
-                self._recent_messages[message] = datetime.datetime.now()
-                if ts is None:
-                    ts = datetime.datetime.now()
-                msg = domain.LogMessage(
-                    logger_name=self._name, level=level, message=message, ts=ts
-                )
-                # noinspection PyBroadException
-                try:
-                    self._message_queue.put_nowait(msg)
-                except Exception as e:
-                    traceback.print_exc(file=sys.stderr)
-                    std_logger.exception(e)
-                if self._log_to_console:
-                    print(
-                        f"{datetime.datetime.now().strftime('%H:%M:%S')} ({level.value!s}) "
-                        f"[{self._name}]: {message}"
-                    )
+        if not self.is_enabled(level):
+            return
+
+        message = domain.logger.render(message, args)
+        now = time.monotonic()
+        recent = self._recent_messages.get(message)
+        if recent is not None:
+            self._recent_messages.move_to_end(message)
+            if now - recent.last_sent <= self._dedup_seconds:
+                recent.suppressed += 1
+                self._suppressed += 1
+                return
+            text = message
+            if recent.suppressed:
+                text = f"{message} [repeated {recent.suppressed} more times]"
+            recent.last_sent = now
+            recent.suppressed = 0
+        else:
+            text = message
+            self._recent_messages[message] = _Recent(last_sent=now)
+            if len(self._recent_messages) > self._dedup_capacity:
+                self._recent_messages.popitem(last=False)
+
+        if ts is None:
+            ts = datetime.datetime.now()
+        msg = domain.LogMessage(logger_name=self._name, level=level, message=text, ts=ts)
+        if os.getpid() == _main_pid:
+            put(self._message_queue, msg, policy=self._overflow_policy)
+        else:
+            child_batch(self._message_queue, policy=self._overflow_policy).add(msg)
+        if self._log_to_console:
+            print(
+                f"{datetime.datetime.now().strftime('%H:%M:%S')} ({level.value!s}) "
+                f"[{self._name}]: {text}"
+            )
 
     def debug(
-        self, /, message: str, *, ts: typing.Optional[datetime.datetime] = None
+        self,
+        /,
+        message: domain.LogText,
+        *args: typing.Any,
+        ts: typing.Optional[datetime.datetime] = None,
     ) -> None:
-        return self._log(
-            level=domain.LogLevel.Debug,
-            message=message,
-        )
+        return self._log(level=domain.LogLevel.Debug, message=message, args=args, ts=ts)
 
     def error(
-        self, /, message: str, *, ts: typing.Optional[datetime.datetime] = None
+        self,
+        /,
+        message: domain.LogText,
+        *args: typing.Any,
+        ts: typing.Optional[datetime.datetime] = None,
     ) -> None:
-        return self._log(
-            level=domain.LogLevel.Error,
-            message=message,
-        )
+        return self._log(level=domain.LogLevel.Error, message=message, args=args, ts=ts)
 
     def exception(
         self, /, e: Exception, *, ts: typing.Optional[datetime.datetime] = None
     ) -> None:
-        msg = domain.error.parse_exception(e).text()
-        self._log(level=domain.LogLevel.Error, message=msg)
+        if self.is_enabled(domain.LogLevel.Error):
+            msg = domain.error.parse_exception(e).text()
+            self._log(level=domain.LogLevel.Error, message=msg, ts=ts)
 
     def info(
-        self, /, message: str, *, ts: typing.Optional[datetime.datetime] = None
+        self,
+        /,
+        message: domain.LogText,
+        *args: typing.Any,
+        ts: typing.Optional[datetime.datetime] = None,
     ) -> None:
-        return self._log(
-            level=domain.LogLevel.Info,
-            message=message,
-        )
+        return self._log(level=domain.LogLevel.Info, message=message, args=args, ts=ts)
 
     @property
     def name(self) -> str:
@@ -131,36 +179,284 @@ class NamedLogger(domain.Logger):
             message_queue=self._message_queue,
             log_to_console=log_to_console or self._log_to_console,
             min_log_level=min_log_level or self._min_log_level,
+            dedup_capacity=self._dedup_capacity,
+            dedup_seconds=self._dedup_seconds,
+            overflow_policy=self._overflow_policy,
         )
 
 
+class ChildLogBatch:
+    """Collects the log messages of a job process, so they can be sent to the parent together
+
+    A batch is sent once it holds CHILD_LOG_BATCH_SIZE messages, and otherwise every
+    CHILD_LOG_FLUSH_SECONDS.  The job process entry points call flush_logs before they exit.
+    """
+
+    def __init__(
+        self,
+        *,
+        message_queue: "mp.Queue[LogQueueItem]",
+        policy: domain.LogOverflowPolicy,
+    ):
+        self._message_queue = message_queue
+        self._policy = policy
+
+        self._lock = threading.Lock()
+        self._messages: typing.List[domain.LogMessage] = []
+        self._flusher: typing.Optional[threading.Thread] = None
+
+    def add(self, msg: domain.LogMessage, /) -> None:
+        with self._lock:
+            self._messages.append(msg)
+            full = len(self._messages) >= CHILD_LOG_BATCH_SIZE
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+                self._flusher.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._messages:
+                return
+            batch = tuple(self._messages)
+            self._messages.clear()
+        put(self._message_queue, batch, policy=self._policy)
+
+    def _flush_periodically(self) -> None:
+        while True:
+            time.sleep(CHILD_LOG_FLUSH_SECONDS)
+            self.flush()
+
+
+# keyed by process id and queue id, since forked processes inherit their parent's entries
+_child_batches: typing.Dict[typing.Tuple[int, int], ChildLogBatch] = {}
+
+
+def child_batch(
+    message_queue: "mp.Queue[LogQueueItem]", /, *, policy: domain.LogOverflowPolicy
+) -> ChildLogBatch:
+    key = (os.getpid(), id(message_queue))
+    batch = _child_batches.get(key)
+    if batch is None:
+        batch = _child_batches.setdefault(
+            key, ChildLogBatch(message_queue=message_queue, policy=policy)
+        )
+    return batch
+
+
+def flush_logs() -> None:
+    """Send this process's batched messages, and a summary of any that overflow discarded"""
+    pid = os.getpid()
+    for (batch_pid, _), batch in list(_child_batches.items()):
+        if batch_pid == pid:
+            batch.flush()
+    for (overflow_pid, _), overflow in list(_overflows.items()):
+        if overflow_pid == pid:
+            overflow.report(force=True)
+
+
+class Overflow:
+    """Applies the overflow policy when the log queue is full, and counts what it discards
+
+    Every OVERFLOW_SUMMARY_SECONDS, a summary of the messages that were dropped or sampled
+    out is logged, so a logging storm shows up in the log without filling it.
+    """
+
+    def __init__(self, *, message_queue: "mp.Queue[LogQueueItem]"):
+        self._message_queue = message_queue
+
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self._sampled = 0
+        self._times_seen: typing.Counter[str] = collections.Counter()
+        self._reported_at = time.monotonic()
+
+    def handle(
+        self,
+        messages: typing.Tuple[domain.LogMessage, ...],
+        /,
+        *,
+        policy: domain.LogOverflowPolicy,
+    ) -> None:
+        if policy == domain.LogOverflowPolicy.DropOldest:
+            self._drop_oldest()
+            try:
+                self._message_queue.put_nowait(messages)
+            except queue.Full:
+                self._count(dropped=len(messages))
+            return
+
+        if policy == domain.LogOverflowPolicy.DropDebug:
+            kept = tuple(msg for msg in messages if not msg.is_debug)
+            self._count(dropped=len(messages) - len(kept))
+        elif policy == domain.LogOverflowPolicy.Sample:
+            kept = self._sample(messages)
+            self._count(sampled=len(messages) - len(kept))
+        else:
+            kept = messages
+        if kept:
+            # the messages that are kept wait for room, which slows down the loggers
+            self._message_queue.put(kept)
+
+    def report(self, *, force: bool = False) -> None:
+        with self._lock:
+            if not (self._dropped or self._sampled):
+                return
+            seconds = time.monotonic() - self._reported_at
+            if seconds < OVERFLOW_SUMMARY_SECONDS and not force:
+                return
+            msg = domain.LogMessage(
+                logger_name="LogQueue",
+                level=domain.LogLevel.Info,
+                message=(
+                    f"The log queue was full, so {self._dropped} messages were dropped and "
+                    f"{self._sampled} repeated messages were sampled out in the last "
+                    f"{seconds:.0f} seconds."
+                ),
+                ts=datetime.datetime.now(),
+            )
+            self._dropped = 0
+            self._sampled = 0
+            self._times_seen.clear()
+            self._reported_at = time.monotonic()
+        try:
+            self._message_queue.put(msg, timeout=1)
+        except queue.Full:
+            std_logger.error(msg.message)
+
+    def _count(self, *, dropped: int = 0, sampled: int = 0) -> None:
+        with self._lock:
+            self._dropped += dropped
+            self._sampled += sampled
+
+    def _drop_oldest(self) -> None:
+        try:
+            oldest = self._message_queue.get_nowait()
+        except queue.Empty:
+            return
+        if oldest is None:
+            # never drop the signal for the LoggerThread to stop
+            self._message_queue.put(None)
+        elif isinstance(oldest, tuple):
+            self._count(dropped=len(oldest))
+        else:
+            self._count(dropped=1)
+
+    def _sample(
+        self, messages: typing.Tuple[domain.LogMessage, ...], /
+    ) -> typing.Tuple[domain.LogMessage, ...]:
+        kept = []
+        with self._lock:
+            for msg in messages:
+                self._times_seen[msg.message] += 1
+                if self._times_seen[msg.message] % OVERFLOW_SAMPLE_EVERY == 1:
+                    kept.append(msg)
+        return tuple(kept)
+
+
+_overflows: typing.Dict[typing.Tuple[int, int], Overflow] = {}
+
+
+def put(
+    message_queue: "mp.Queue[LogQueueItem]",
+    item: LogQueueItem,
+    /,
+    *,
+    policy: domain.LogOverflowPolicy = domain.LogOverflowPolicy.Block,
+) -> None:
+    key = (os.getpid(), id(message_queue))
+    # noinspection PyBroadException
+    try:
+        try:
+            message_queue.put_nowait(item)
+        except queue.Full:
+            overflow = _overflows.get(key)
+            if overflow is None:
+                overflow = _overflows.setdefault(key, Overflow(message_queue=message_queue))
+            if isinstance(item, tuple):
+                overflow.handle(item, policy=policy)
+            elif item is not None:
+                overflow.handle((item,), policy=policy)
+        if key in _overflows:
+            _overflows[key].report()
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        std_logger.exception(e)
+
+
 class LoggerThread(threading.Thread):
+    """Writes queued log messages to the database in batches
+
+    A batch is written once it holds batch_size messages or flush_seconds have passed since
+    the oldest message in it was received, whichever comes first.  Whatever is left over is
+    written when the thread is stopped or the queue is closed.
+    """
+
     def __init__(
         self,
         *,
-        message_queue: "mp.Queue[domain.LogMessage]",
-        engine: sa.engine.Engine,
+        message_queue: "mp.Queue[LogQueueItem]",
+        repo: domain.LogRepo,
+        batch_size: int = 500,
+        flush_seconds: float = 1,
     ):
         super().__init__()
 
         self._message_queue = message_queue
+        self._batch_size = batch_size
+        self._flush_seconds = flush_seconds
 
-        self._repo = adapter.DbLogRepo(engine=engine)
+        self._repo = repo
 
     def run(self) -> None:
+        batch: typing.List[domain.LogMessage] = []
+        flush_at: typing.Optional[float] = None
         while True:
             # noinspection PyBroadException
             try:
-                msg: domain.LogMessage = self._message_queue.get()
-                self._repo.add(
-                    name=msg.logger_name,
-                    level=msg.level,
-                    message=msg.message,
-                    ts=msg.ts or datetime.datetime.now(),
-                )
+                if flush_at is None:
+                    msg = self._message_queue.get()
+                else:
+                    msg = self._message_queue.get(
+                        timeout=max(flush_at - time.monotonic(), 0)
+                    )
+                if msg is None:
+                    break
+                if isinstance(msg, tuple):
+                    batch.extend(msg)
+                else:
+                    batch.append(msg)
+                if flush_at is None:
+                    flush_at = time.monotonic() + self._flush_seconds
+                if len(batch) >= self._batch_size:
+                    self._flush(batch)
+                    flush_at = None
+            except queue.Empty:
+                self._flush(batch)
+                flush_at = None
             except (KeyboardInterrupt, SystemExit):
+                self._flush(batch)
                 raise
-            except EOFError:
+            except (EOFError, OSError, ValueError):
+                # the queue was closed
                 break
             except:
                 traceback.print_exc(file=sys.stderr)
+        self._flush(batch)
+
+    def stop(self) -> None:
+        """Write any messages still on the queue, then exit"""
+        self._message_queue.put(None)
+        self.join()
+
+    def _flush(self, batch: typing.List[domain.LogMessage], /) -> None:
+        if not batch:
+            return
+        # noinspection PyBroadException
+        try:
+            self._repo.add_many(batch)
+        except:
+            traceback.print_exc(file=sys.stderr)
+        finally:
+            batch.clear()
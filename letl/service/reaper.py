@@ -0,0 +1,121 @@
+import contextlib
+import dataclasses
+import multiprocessing as mp
+import os
+import signal
+import time
+import types
+import typing
+
+from letl import domain
+
+__all__ = ("Reaped", "soft_timeout", "reap", "timed_out")
+
+DEFAULT_GRACE_SECONDS = 5
+
+
+@dataclasses.dataclass(frozen=True)
+class Reaped:
+    pid: typing.Optional[int]
+    seconds: float
+    killed: bool
+    descendants_killed: int
+
+    def __str__(self) -> str:
+        how = "killed" if self.killed else "terminated"
+        return (
+            f"process {self.pid} {how} in {self.seconds:.3f}s, "
+            f"{self.descendants_killed} child processes killed"
+        )
+
+
+@contextlib.contextmanager
+def soft_timeout(*, job_name: str, timeout_seconds: int) -> typing.Iterator[None]:
+    """Turn the SIGTERM sent on timeout into a JobSoftTimeout raised inside the job"""
+
+    def handler(signum: int, frame: typing.Optional[types.FrameType]) -> None:
+        raise domain.error.JobSoftTimeout(
+            job_name=job_name, timeout_seconds=timeout_seconds
+        )
+
+    previous = signal.signal(signal.SIGTERM, handler)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def reap(
+    process: mp.Process,
+    /,
+    *,
+    grace_seconds: float = DEFAULT_GRACE_SECONDS,
+) -> Reaped:
+    """Stop a job process and any processes it started
+
+    The process is sent SIGTERM first, so the job gets a chance to clean up, and it is killed if it
+    is still running after grace_seconds.  Processes the job started are killed outright, since
+    they would otherwise be re-parented to init and keep running.
+    """
+    start = time.monotonic()
+    descendants = descendant_pids(process.pid) if process.pid else []
+    killed = False
+    if process.is_alive():
+        process.terminate()
+        process.join(grace_seconds)
+        if process.is_alive():
+            process.kill()
+            killed = True
+    process.join()
+
+    descendants_killed = 0
+    for pid in descendants:
+        try:
+            os.kill(pid, signal.SIGKILL)
+            descendants_killed += 1
+        except ProcessLookupError:
+            pass
+
+    return Reaped(
+        pid=process.pid,
+        seconds=time.monotonic() - start,
+        killed=killed,
+        descendants_killed=descendants_killed,
+    )
+
+
+def timed_out(*, job: domain.Job, reaped: Reaped) -> domain.JobResult:
+    """The result of a job whose process was reaped after it timed out"""
+    return domain.JobResult.error(
+        domain.error.JobTimedOut(
+            f"The job, [{job.job_name}], timed out after {job.timeout_seconds} "
+            f"seconds ({reaped})."
+        )
+    )
+
+
+def descendant_pids(pid: int, /) -> typing.List[int]:
+    """Find the processes started by pid, directly or indirectly, by walking /proc"""
+    children: typing.Dict[int, typing.List[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for entry in entries:
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as fh:
+                    stat = fh.read()
+                # the command name is in parens and may contain spaces
+                ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+
+    descendants: typing.List[int] = []
+    stack = list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        descendants.append(child)
+        stack.extend(children.get(child, []))
+    return descendants
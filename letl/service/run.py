@@ -1,5 +1,7 @@
 import multiprocessing as mp
+import os
 import queue
+import socket
 import threading
 import typing
 
@@ -7,9 +9,16 @@ import sqlalchemy as sa
 
 from letl import adapter, domain
 from letl.service import admin
+from letl.service.async_job_runner import AsyncJobRunner
+from letl.service.autoscaler import Autoscaler
+from letl.service.dispatcher import Dispatcher
+from letl.service.job_claimer import JobClaimer
 from letl.service.job_runner import *
-from letl.service.logger import LoggerThread, NamedLogger
-from letl.service.scheduler import Scheduler
+from letl.service.log_shipper import LogShipper
+from letl.service.logger import LoggerThread, LogQueueItem, NamedLogger
+from letl.service.scheduler import EventScheduler, Scheduler
+from letl.service.shard_tracker import ShardTracker
+from letl.service.worker import Worker
 
 __all__ = ("start",)
 
@@ -22,10 +31,25 @@ def start(
     resources: typing.Iterable[domain.Resource[typing.Any]],
     etl_db_uri: str,
     max_job_runners: int = 5,
+    min_job_runners: typing.Optional[int] = None,
+    seconds_between_autoscale_checks: float = 30,
     days_logs_to_keep: int = 3,
     log_level: domain.LogLevel = domain.LogLevel.Info,
     log_to_console: bool = False,
     log_sql_to_console: bool = False,
+    log_queue_size: typing.Optional[int] = None,
+    log_overflow_policy: domain.LogOverflowPolicy = domain.LogOverflowPolicy.Block,
+    log_segment_folder: typing.Optional[str] = None,
+    compress_log_segments: bool = False,
+    scheduler_mode: domain.SchedulerMode = domain.SchedulerMode.Scan,
+    status_revalidation_seconds: typing.Optional[int] = 60,
+    queue_type: domain.QueueType = domain.QueueType.Set,
+    execution_mode: domain.ExecutionMode = domain.ExecutionMode.Process,
+    worker_max_jobs: int = 100,
+    worker_max_memory_mb: typing.Optional[int] = None,
+    max_async_jobs: int = 100,
+    distributed: bool = False,
+    node_id: typing.Optional[str] = None,
 ) -> None:
     try:
         std_logger.info("Started.")
@@ -39,6 +63,13 @@ def start(
         ]
         all_jobs = jobs + admin_jobs
         check_job_names_are_unique(jobs=all_jobs)
+        job_graph = domain.JobGraph(jobs)
+        jobs = job_graph.jobs
+        resource_set = frozenset(resources)
+        # created before any job processes start, so that they share its semaphores
+        limiter: typing.Optional[domain.ResourceLimiter] = None
+        if any(res.is_limited for res in resource_set):
+            limiter = adapter.MpResourceLimiter(resources=resource_set)
         std_logger.info("Jobs have been loaded.")
 
         engine = sa.create_engine(
@@ -48,12 +79,23 @@ def start(
             future=True,
         )
         std_logger.info("Engine created.")
-        # fmt: off
-        log_message_queue: "mp.Queue[domain.LogMessage]" = mp.Queue(-1)  # -1 = infinite size
-        # fmt: on
+        # without a log_queue_size the queue is unbounded, and log_overflow_policy never applies
+        log_message_queue: "mp.Queue[LogQueueItem]" = mp.Queue(log_queue_size or -1)
+        log_repo: domain.LogRepo = adapter.DbLogRepo(engine=engine)
+        log_shipper: typing.Optional[LogShipper] = None
+        if log_segment_folder:
+            # messages are written to local files, and loaded into the database in bulk
+            segments = adapter.SegmentLogRepo(
+                folder=log_segment_folder,
+                compress=compress_log_segments,
+            )
+            log_shipper = LogShipper(segments=segments, repo=log_repo)
+            threads.append(log_shipper)
+            log_shipper.start()
+            log_repo = segments
         logger_thread = LoggerThread(
             message_queue=log_message_queue,
-            engine=engine,
+            repo=log_repo,
         )
         threads.append(logger_thread)
         logger_thread.start()
@@ -63,44 +105,150 @@ def start(
             message_queue=log_message_queue,
             min_log_level=log_level,
             log_to_console=log_to_console,
+            overflow_policy=log_overflow_policy,
         )
         logger.info("Logger started.")
 
         adapter.db.create_tables(engine=engine)
 
+        status_repo: domain.StatusRepo
+        claimer: typing.Optional[JobClaimer] = None
+        if distributed:
+            # other nodes update the statuses too, so they are always read from the database
+            status_repo = adapter.DbStatusRepo(engine=engine)
+            claimer = JobClaimer(
+                lease_repo=adapter.DbLeaseRepo(engine=engine),
+                status_repo=status_repo,
+                node_id=node_id or f"{socket.gethostname()}:{os.getpid()}",
+                logger=logger,
+            )
+            logger.info(f"Running as node {claimer.node_id}.")
+        else:
+            status_repo = adapter.CachedStatusRepo(
+                repo=adapter.DbStatusRepo(engine=engine),
+                revalidate_seconds=status_revalidation_seconds,
+            )
+
         admin.delete_orphan_jobs(
-            admin_engine=engine,
+            status_repo=status_repo,
             current_jobs=jobs,
             logger=logger,
+            distributed=distributed,
         )
 
-        job_queue: "queue.Queue[domain.Job]" = adapter.SetQueue(max_job_runners)
-
-        scheduler = Scheduler(
-            engine=engine,
+        # the dispatcher never blocks on the queue, so it is unbounded
+        job_queue: "queue.Queue[domain.Job]"
+        if queue_type == domain.QueueType.Priority:
+            # dispatcher is assigned below, before anything is queued
+            job_queue = adapter.PrioritySetQueue(
+                due_since=lambda job: dispatcher.due_since(job.job_name)
+            )
+        else:
+            job_queue = adapter.SetQueue()
+        # with min_job_runners, the autoscaler varies how many of the runners may be busy
+        dispatcher = Dispatcher(
             job_queue=job_queue,
-            jobs=jobs,
-            logger=logger,
-            seconds_between_scans=10,
+            runners=max_job_runners if min_job_runners is None else min_job_runners,
         )
+
+        scheduler: threading.Thread
+        on_status_change: typing.Optional[typing.Callable[[str], None]] = None
+        if scheduler_mode == domain.SchedulerMode.Event:
+            scheduler = EventScheduler(
+                status_repo=status_repo,
+                dispatcher=dispatcher,
+                jobs=jobs,
+                logger=logger,
+            )
+            on_status_change = scheduler.notify
+        else:
+            scheduler = Scheduler(
+                status_repo=status_repo,
+                dispatcher=dispatcher,
+                jobs=jobs,
+                logger=logger,
+                seconds_between_scans=10,
+            )
         threads.append(scheduler)
         scheduler.start()
         logger.info("Scheduler started.")
 
+        shards = ShardTracker(
+            status_repo=status_repo,
+            dispatcher=dispatcher,
+            logger=logger,
+            on_status_change=on_status_change,
+            job_graph=job_graph,
+        )
+
+        submit_async: typing.Optional[typing.Callable[[domain.Job, float], None]] = None
+        if any(job.is_async for job in jobs):
+            async_job_runner = AsyncJobRunner(
+                status_repo=status_repo,
+                dispatcher=dispatcher,
+                logger=logger.new(name="AsyncJobRunner"),
+                resources=resource_set,
+                max_concurrent_jobs=max_async_jobs,
+                on_status_change=on_status_change,
+                job_graph=job_graph,
+                limiter=limiter,
+                claimer=claimer,
+                shards=shards,
+            )
+            threads.append(async_job_runner)
+            async_job_runner.start()
+            submit_async = async_job_runner.submit
+            logger.info("AsyncJobRunner started.")
+
         for i in range(max_job_runners):
+            runner_logger = logger.new(name=f"JobRunner{i}")
+            worker: typing.Optional[Worker] = None
+            if execution_mode == domain.ExecutionMode.Worker:
+                worker = Worker(
+                    jobs=jobs,
+                    logger=runner_logger,
+                    resources=resource_set,
+                    max_jobs=worker_max_jobs,
+                    max_memory_mb=worker_max_memory_mb,
+                )
             job_runner = JobRunner(
-                engine=engine,
-                job_queue=job_queue,
-                logger=logger.new(name=f"JobRunner{i}"),
-                resources=frozenset(resources),
+                status_repo=status_repo,
+                dispatcher=dispatcher,
+                logger=runner_logger,
+                resources=resource_set,
+                on_status_change=on_status_change,
+                job_graph=job_graph,
+                worker=worker,
+                submit_async=submit_async,
+                limiter=limiter,
+                claimer=claimer,
+                shards=shards,
             )
             threads.append(job_runner)
             job_runner.start()
 
         logger.info("JobRunners started.")
 
-        for thread in threads:
-            thread.join()
+        if min_job_runners is not None:
+            autoscaler = Autoscaler(
+                dispatcher=dispatcher,
+                logger=logger.new(name="Autoscaler"),
+                min_runners=min_job_runners,
+                max_runners=max_job_runners,
+                seconds_between_checks=seconds_between_autoscale_checks,
+            )
+            threads.append(autoscaler)
+            autoscaler.start()
+            logger.info("Autoscaler started.")
+
+        try:
+            for thread in threads:
+                thread.join()
+        finally:
+            # write out the messages still waiting in the current batch
+            logger_thread.stop()
+            if log_shipper is not None:
+                log_shipper.stop()
     except Exception as e:
         std_logger.exception(e)
         raise
@@ -1,30 +1,30 @@
 import datetime
+import heapq
 import queue
 import threading
 import time
 import typing
 
-import sqlalchemy as sa
+from letl import domain
+from letl.service.dispatcher import Dispatcher
 
-from letl import adapter, domain
-
-__all__ = ("Scheduler",)
+__all__ = ("EventScheduler", "Scheduler", "enqueue_ready_dependents")
 
 
 class Scheduler(threading.Thread):
     def __init__(
         self,
         *,
-        engine: sa.engine.Engine,
-        job_queue: "queue.Queue[domain.Job]",
+        status_repo: domain.StatusRepo,
+        dispatcher: Dispatcher,
         jobs: typing.List[domain.Job],
         logger: domain.Logger,
         seconds_between_scans: int,
     ):
         super().__init__()
 
-        self._engine = engine
-        self._job_queue = job_queue
+        self._status_repo = status_repo
+        self._dispatcher = dispatcher
         self._jobs = jobs
         self._logger = logger
         self._seconds_between_scans = seconds_between_scans
@@ -33,43 +33,227 @@ class Scheduler(threading.Thread):
         while True:
             try:
                 update_queue(
-                    engine=self._engine,
-                    job_queue=self._job_queue,
+                    status_repo=self._status_repo,
+                    dispatcher=self._dispatcher,
                     jobs=self._jobs,
                     logger=self._logger,
                 )
+                log_saturation(dispatcher=self._dispatcher, logger=self._logger)
             except Exception as e:
                 self._logger.exception(e)
 
             time.sleep(self._seconds_between_scans)
 
 
+class EventScheduler(threading.Thread):
+    """Keeps jobs in a min-heap keyed by the next time they need to be checked and sleeps until
+    the earliest one, or until a job's status changes (see :meth:`notify`)."""
+
+    def __init__(
+        self,
+        *,
+        status_repo: domain.StatusRepo,
+        dispatcher: Dispatcher,
+        jobs: typing.List[domain.Job],
+        logger: domain.Logger,
+        max_seconds_between_checks: int = 60,
+    ):
+        super().__init__()
+
+        self._status_repo = status_repo
+        self._dispatcher = dispatcher
+        self._jobs = {job.job_name: job for job in jobs}
+        self._job_graph = domain.JobGraph(jobs)
+        self._logger = logger
+        self._max_seconds_between_checks = max_seconds_between_checks
+
+        self._events: "queue.Queue[str]" = queue.Queue()
+        self._heap: typing.List[typing.Tuple[datetime.datetime, int, str]] = []
+        self._generation: typing.Dict[str, int] = {}
+
+    def notify(self, job_name: str) -> None:
+        """Re-arm a job and its dependents.  Safe to call from any thread."""
+        self._events.put(job_name)
+
+    def run(self) -> None:
+        now = datetime.datetime.now()
+        for job_name in self._jobs:
+            self._arm(job_name=job_name, ts=now)
+
+        while True:
+            try:
+                job_name = self._events.get(timeout=self._seconds_until_next_check())
+                self._rearm(job_name=job_name)
+                while True:
+                    self._rearm(job_name=self._events.get_nowait())
+            except queue.Empty:
+                pass
+
+            try:
+                self._dispatch_due_jobs()
+                log_saturation(dispatcher=self._dispatcher, logger=self._logger)
+            except Exception as e:
+                self._logger.exception(e)
+
+    def _arm(self, *, job_name: str, ts: datetime.datetime) -> None:
+        generation = self._generation.get(job_name, 0) + 1
+        self._generation[job_name] = generation
+        heapq.heappush(self._heap, (ts, generation, job_name))
+
+    def _dispatch_due_jobs(self) -> None:
+        now = datetime.datetime.now()
+        due_jobs: typing.List[domain.Job] = []
+        while self._heap and self._heap[0][0] <= now:
+            _, generation, job_name = heapq.heappop(self._heap)
+            if self._generation.get(job_name) == generation:
+                due_jobs.append(self._jobs[job_name])
+
+        if not due_jobs:
+            return
+
+        statuses = self._status_repo.status_map(
+            job_names=job_names_to_check(jobs=due_jobs)
+        )
+        for job in due_jobs:
+            job_name = job.job_name
+            self._logger.debug("Checking if [%s] is ready...", job_name)
+            if job_is_ready_to_run(job=job, statuses=statuses):
+                if self._dispatcher.dispatch(
+                    job,
+                    checked_at=now,
+                    due_since=job_due_since(job=job, statuses=statuses, now=now),
+                ):
+                    self._logger.debug("[%s] added to queue.", job_name)
+                else:
+                    self._logger.debug("[%s] is already queued or running.", job_name)
+                # the job runner will notify us when the job starts, this is just a safety net
+                ts = now + datetime.timedelta(seconds=self._max_seconds_between_checks)
+            else:
+                ts = next_check_time(
+                    job=job,
+                    status=statuses.get(job_name),
+                    now=now,
+                    max_seconds_between_checks=self._max_seconds_between_checks,
+                )
+            self._logger.debug("[%s] will be checked again at %s.", job_name, ts)
+            self._arm(job_name=job_name, ts=ts)
+
+    def _rearm(self, *, job_name: str) -> None:
+        now = datetime.datetime.now()
+        if job_name in self._jobs:
+            self._arm(job_name=job_name, ts=now)
+        for dependent in self._job_graph.dependents(job_name):
+            self._arm(job_name=dependent, ts=now)
+
+    def _seconds_until_next_check(self) -> float:
+        while self._heap:
+            ts, generation, job_name = self._heap[0]
+            if self._generation.get(job_name) == generation:
+                return max((ts - datetime.datetime.now()).total_seconds(), 0)
+            heapq.heappop(self._heap)
+        return self._max_seconds_between_checks
+
+
+def next_check_time(
+    *,
+    job: domain.Job,
+    status: typing.Optional[domain.JobStatus],
+    now: datetime.datetime,
+    max_seconds_between_checks: int,
+) -> datetime.datetime:
+    latest = now + datetime.timedelta(seconds=max_seconds_between_checks)
+
+    if status and status.is_running:
+        timed_out = status.started + datetime.timedelta(seconds=job.timeout_seconds + 10)
+        if timed_out > now:
+            return min(timed_out, latest)
+
+    last_completed = status.ended if status else None
+    candidates = [latest]
+    for s in job.schedule:
+        due = s.next_due(last_completed=last_completed, now=now)
+        # a job that is due now but was not ready is waiting on its dependencies, which will
+        # re-arm it when they finish
+        if due and due > now:
+            candidates.append(due)
+    return min(candidates)
+
+
+def log_saturation(*, dispatcher: Dispatcher, logger: domain.Logger) -> None:
+    stats = dispatcher.stats
+    if stats.is_saturated:
+        logger.info(f"All job runners are busy: {stats}")
+    else:
+        logger.debug("%s", stats)
+
+
 def update_queue(
     *,
-    engine: sa.engine.Engine,
-    job_queue: "queue.Queue[domain.Job]",
+    status_repo: domain.StatusRepo,
+    dispatcher: Dispatcher,
     jobs: typing.List[domain.Job],
     logger: domain.Logger,
 ) -> None:
-    logger.debug(f"{datetime.datetime.now()}: running update_queue")
-    status_repo = adapter.DbStatusRepo(engine=engine)
+    logger.debug(lambda: f"{datetime.datetime.now()}: running update_queue")
+    checked_at = datetime.datetime.now()
+    statuses = status_repo.status_map(job_names=job_names_to_check(jobs=jobs))
     job_map = {job.job_name: job for job in jobs}
     for job_name, job in job_map.items():
-        logger.debug(f"Checking if [{job_name}] is ready...")
-        if job_is_ready_to_run(job=job, status_repo=status_repo):
-            logger.debug(f"Adding [{job_name}] to queue.")
-            job_queue.put(job)
-            logger.debug(f"[{job_name}] added to queue...")
+        logger.debug("Checking if [%s] is ready...", job_name)
+        if job_is_ready_to_run(job=job, statuses=statuses):
+            if dispatcher.dispatch(
+                job,
+                checked_at=checked_at,
+                due_since=job_due_since(job=job, statuses=statuses, now=checked_at),
+            ):
+                logger.debug("[%s] added to queue.", job_name)
+            else:
+                logger.debug("[%s] is already queued or running.", job_name)
         else:
-            logger.debug(f"[{job_name}] was skipped.")
+            logger.debug("[%s] was skipped.", job_name)
+
+
+def enqueue_ready_dependents(
+    *,
+    job_name: str,
+    job_graph: domain.JobGraph,
+    dispatcher: Dispatcher,
+    status_repo: domain.StatusRepo,
+    logger: domain.Logger,
+) -> None:
+    """Add the direct dependents of a job that just succeeded to the queue if they are ready"""
+    dependents = [job_graph.get(dependent) for dependent in job_graph.dependents(job_name)]
+    if not dependents:
+        return
+
+    checked_at = datetime.datetime.now()
+    statuses = status_repo.status_map(job_names=job_names_to_check(jobs=dependents))
+    for dependent in dependents:
+        if job_is_ready_to_run(job=dependent, statuses=statuses):
+            if dispatcher.dispatch(
+                dependent,
+                checked_at=checked_at,
+                due_since=job_due_since(job=dependent, statuses=statuses, now=checked_at),
+            ):
+                logger.debug(
+                    f"[{job_name}] finished, so [{dependent.job_name}] was added to the queue."
+                )
+
+
+def job_names_to_check(*, jobs: typing.Iterable[domain.Job]) -> typing.Set[str]:
+    job_names: typing.Set[str] = set()
+    for job in jobs:
+        job_names.add(job.job_name)
+        job_names.update(job.dependencies)
+    return job_names
 
 
 def job_is_ready_to_run(
     *,
     job: domain.Job,
-    status_repo: domain.StatusRepo,
+    statuses: typing.Mapping[str, domain.JobStatus],
 ) -> bool:
-    status = status_repo.status(job_name=job.job_name)
+    status = statuses.get(job.job_name)
     if status:
         last_started: typing.Optional[datetime.datetime] = status.started
         last_completed: typing.Optional[datetime.datetime] = status.ended
@@ -84,7 +268,7 @@ def job_is_ready_to_run(
 
     if job.dependencies:
         if not dependencies_have_run(
-            status_repo=status_repo,
+            statuses=statuses,
             job_last_run=last_completed,
             dependencies=job.dependencies,
         ):
@@ -93,14 +277,31 @@ def job_is_ready_to_run(
     return any(s.is_due(last_completed=last_completed) for s in job.schedule)
 
 
+def job_due_since(
+    *,
+    job: domain.Job,
+    statuses: typing.Mapping[str, domain.JobStatus],
+    now: datetime.datetime,
+) -> typing.Optional[datetime.datetime]:
+    """When the earliest of the job's due schedules became due"""
+    status = statuses.get(job.job_name)
+    last_completed = status.ended if status else None
+    candidates = []
+    for s in job.schedule:
+        due = s.due_since(last_completed=last_completed, now=now)
+        if due:
+            candidates.append(due)
+    return min(candidates, default=None)
+
+
 def dependencies_have_run(
     *,
-    status_repo: domain.StatusRepo,
+    statuses: typing.Mapping[str, domain.JobStatus],
     job_last_run: typing.Optional[datetime.datetime],
     dependencies: typing.FrozenSet[str],
 ) -> bool:
     for dep in dependencies:
-        dep_status = status_repo.status(job_name=dep)
+        dep_status = statuses.get(dep)
         if dep_status:
             if dep_status.is_running:
                 return False
@@ -0,0 +1,126 @@
+import dataclasses
+import threading
+import typing
+
+from letl import domain
+from letl.service.dispatcher import Dispatcher
+from letl.service.job_lifecycle import save_result, start_job
+from letl.service.scheduler import enqueue_ready_dependents
+
+__all__ = ("ShardTracker",)
+
+
+@dataclasses.dataclass
+class FanOut:
+    job: domain.Job
+    pending: typing.Set[str]
+    errors: typing.Dict[str, str]
+
+
+class ShardTracker:
+    def __init__(
+        self,
+        *,
+        status_repo: domain.StatusRepo,
+        dispatcher: Dispatcher,
+        logger: domain.Logger,
+        on_status_change: typing.Optional[typing.Callable[[str], None]] = None,
+        job_graph: typing.Optional[domain.JobGraph] = None,
+    ):
+        """Runs partitioned jobs as shards and finishes the job once every shard has finished
+
+        Each shard is queued as a job of its own, so the shards run in parallel on whichever
+        runners are free, get their own status rows, and are retried on their own.  The job
+        succeeds if all of its shards succeed.
+        """
+        self._status_repo = status_repo
+        self._dispatcher = dispatcher
+        self._logger = logger
+        self._on_status_change = on_status_change
+        self._job_graph = job_graph
+
+        self._lock = threading.Lock()
+        self._fan_outs: typing.Dict[str, FanOut] = {}
+        self._shard_parents: typing.Dict[str, str] = {}
+
+    def fan_out(self, job: domain.Job, /) -> None:
+        """Queue the shards of a partitioned job that a runner took from the queue"""
+        assert job.partitioner is not None
+
+        start_job(
+            job=job,
+            status_repo=self._status_repo,
+            logger=self._logger,
+            on_status_change=self._on_status_change,
+        )
+        try:
+            shards = [
+                job.shard(i, config=config)
+                for i, config in enumerate(job.partitioner(job.config))
+            ]
+        except Exception as e:
+            self._finish(job, domain.JobResult.error(e))
+            return
+
+        self._logger.info(f"[{job.job_name}] was split into {len(shards)} shards.")
+        if not shards:
+            self._finish(job, domain.JobResult.success())
+            return
+
+        with self._lock:
+            self._fan_outs[job.job_name] = FanOut(
+                job=job, pending={shard.job_name for shard in shards}, errors={}
+            )
+            for shard in shards:
+                self._shard_parents[shard.job_name] = job.job_name
+        self._dispatcher.fanned_out(job.job_name)
+        for shard in shards:
+            self._dispatcher.dispatch(shard)
+
+    def is_shard(self, job_name: str, /) -> bool:
+        with self._lock:
+            return job_name in self._shard_parents
+
+    def shard_finished(self, shard: domain.Job, result: domain.JobResult, /) -> None:
+        """Record the final result of a shard, after any retries"""
+        with self._lock:
+            parent_name = self._shard_parents.pop(shard.job_name, None)
+            if parent_name is None:
+                return
+            fan_out = self._fan_outs[parent_name]
+            fan_out.pending.discard(shard.job_name)
+            if result.is_error:
+                fan_out.errors[shard.job_name] = result.error_message or ""
+            if fan_out.pending:
+                return
+            del self._fan_outs[parent_name]
+
+        if fan_out.errors:
+            self._finish(
+                fan_out.job,
+                domain.JobResult.error(
+                    domain.error.ShardsFailed(
+                        job_name=parent_name, errors=fan_out.errors
+                    )
+                ),
+            )
+        else:
+            self._finish(fan_out.job, domain.JobResult.success())
+
+    def _finish(self, job: domain.Job, result: domain.JobResult, /) -> None:
+        save_result(
+            job=job,
+            result=result,
+            status_repo=self._status_repo,
+            logger=self._logger,
+            on_status_change=self._on_status_change,
+        )
+        self._dispatcher.finished(job.job_name)
+        if self._job_graph and not result.is_error:
+            enqueue_ready_dependents(
+                job_name=job.job_name,
+                job_graph=self._job_graph,
+                dispatcher=self._dispatcher,
+                status_repo=self._status_repo,
+                logger=self._logger,
+            )
@@ -0,0 +1,307 @@
+import dataclasses
+import multiprocessing as mp
+import os
+import queue
+import resource
+import time
+import typing
+
+from letl import domain
+from letl.service.logger import flush_logs
+from letl.service.reaper import Reaped, reap, soft_timeout, timed_out
+
+__all__ = ("Worker", "execute_job")
+
+Task = typing.Union[str, domain.Job, None]
+
+mod_logger = domain.root_logger.getChild("worker")
+
+
+class Worker:
+    def __init__(
+        self,
+        *,
+        jobs: typing.Iterable[domain.Job],
+        logger: domain.Logger,
+        resources: typing.FrozenSet[domain.Resource[typing.Any]],
+        max_jobs: int = 100,
+        max_memory_mb: typing.Optional[int] = None,
+    ):
+        """Long-lived process that runs jobs sent to it by name
+
+        The jobs are handed to the process once when it starts, so each run only sends the job's
+        name over a pipe.  The process is recycled after running max_jobs jobs or after its
+        resident memory exceeds max_memory_mb, and it is killed and replaced if a job times out.
+        """
+        self._jobs = {job.job_name: job for job in jobs}
+        self._logger = logger
+        self._resources = resources
+        self._max_jobs = max_jobs
+        self._max_memory_mb = max_memory_mb
+
+        self._process: typing.Optional[mp.Process] = None
+        self._tasks: "typing.Optional[mp.Queue[Task]]" = None
+        self._results: "typing.Optional[mp.Queue[typing.Tuple[domain.JobResult, bool]]]" = None
+
+    def run(
+        self,
+        *,
+        job: domain.Job,
+        on_reaped: typing.Optional[typing.Callable[[Reaped], None]] = None,
+    ) -> domain.JobResult:
+        process, tasks, results = self._start()
+
+        if self._jobs.get(job.job_name) == job:
+            tasks.put(job.job_name)
+        else:
+            # jobs the worker was not started with have to be sent over in full
+            tasks.put(job)
+
+        deadline = time.monotonic() + job.timeout_seconds
+        while True:
+            try:
+                result, recycled = results.get(
+                    timeout=max(min(deadline - time.monotonic(), 1), 0)
+                )
+                break
+            except queue.Empty:
+                if not process.is_alive():
+                    self.stop()
+                    return domain.JobResult.error(
+                        domain.error.WorkerDied(
+                            job_name=job.job_name, exitcode=process.exitcode
+                        )
+                    )
+                if time.monotonic() >= deadline:
+                    reaped = self.stop()
+                    assert reaped is not None
+                    self._logger.info(f"[{job.job_name}] timed out: {reaped}.")
+                    if on_reaped:
+                        on_reaped(reaped)
+                    return timed_out(job=job, reaped=reaped)
+
+        if recycled:
+            self._logger.debug(f"Worker process {process.pid} is being recycled.")
+            process.join()
+            self._reset()
+        return result
+
+    def stop(self) -> typing.Optional[Reaped]:
+        reaped = reap(self._process) if self._process is not None else None
+        self._reset()
+        return reaped
+
+    def _reset(self) -> None:
+        for q in (self._tasks, self._results):
+            if q is not None:
+                q.close()
+        self._process = None
+        self._tasks = None
+        self._results = None
+
+    def _start(
+        self,
+    ) -> typing.Tuple[
+        mp.Process,
+        "mp.Queue[Task]",
+        "mp.Queue[typing.Tuple[domain.JobResult, bool]]",
+    ]:
+        if self._process is None or self._tasks is None or self._results is None:
+            self._tasks = mp.Queue()
+            self._results = mp.Queue()
+            self._process = mp.Process(
+                target=run_worker,
+                args=(
+                    self._tasks,
+                    self._results,
+                    self._jobs,
+                    self._logger,
+                    self._resources,
+                    self._max_jobs,
+                    self._max_memory_mb,
+                    os.getpid(),
+                ),
+            )
+            self._process.start()
+            self._logger.debug(f"Worker process {self._process.pid} started.")
+        return self._process, self._tasks, self._results
+
+
+def run_worker(
+    tasks: "mp.Queue[Task]",
+    results: "mp.Queue[typing.Tuple[domain.JobResult, bool]]",
+    jobs: typing.Dict[str, domain.Job],
+    logger: domain.Logger,
+    resources: typing.FrozenSet[domain.Resource[typing.Any]],
+    max_jobs: int,
+    max_memory_mb: typing.Optional[int],
+    parent_pid: int,
+) -> None:
+    # handles of pooled resources stay open between the jobs this process runs
+    pool = domain.ResourcePool(log=logger)
+    try:
+        run_tasks(
+            tasks=tasks,
+            results=results,
+            jobs=jobs,
+            logger=logger,
+            resources=resources,
+            pool=pool,
+            max_jobs=max_jobs,
+            max_memory_mb=max_memory_mb,
+            parent_pid=parent_pid,
+        )
+    finally:
+        pool.close()
+        flush_logs()
+
+
+def run_tasks(
+    *,
+    tasks: "mp.Queue[Task]",
+    results: "mp.Queue[typing.Tuple[domain.JobResult, bool]]",
+    jobs: typing.Dict[str, domain.Job],
+    logger: domain.Logger,
+    resources: typing.FrozenSet[domain.Resource[typing.Any]],
+    pool: domain.ResourcePool,
+    max_jobs: int,
+    max_memory_mb: typing.Optional[int],
+    parent_pid: int,
+) -> None:
+    jobs_run = 0
+    while True:
+        try:
+            task = tasks.get(timeout=1)
+        except queue.Empty:
+            # don't outlive the process that started us
+            if os.getppid() != parent_pid:
+                return
+            pool.evict_idle()
+            continue
+
+        if task is None:
+            return
+
+        job = jobs[task] if isinstance(task, str) else task
+        try:
+            with soft_timeout(job_name=job.job_name, timeout_seconds=job.timeout_seconds):
+                result = execute_job(
+                    job=job,
+                    logger=logger.new(name=f"{logger.name}.{job.job_name}"),
+                    # the parent holds the job's limiter slots, see domain.keys_to_hold
+                    resources=domain.ResourceManager(
+                        resources=resources,
+                        log=logger,
+                        pool=pool,
+                    ),
+                )
+        except domain.error.JobSoftTimeout:
+            return
+        finally:
+            flush_logs()
+        jobs_run += 1
+
+        memory_mb = resident_memory_mb()
+        recycle = jobs_run >= max_jobs or bool(
+            max_memory_mb and memory_mb and memory_mb > max_memory_mb
+        )
+        results.put((result, recycle))
+        if recycle:
+            return
+
+
+def execute_job(
+    *,
+    job: domain.Job,
+    logger: domain.Logger,
+    resources: domain.ResourceManager,
+) -> domain.JobResult:
+    """Run one attempt of a job in the current process and measure what it used"""
+    before = current_usage()
+    result = run_job_once(job=job, logger=logger, resources=resources)
+    return dataclasses.replace(result, metrics=metrics_since(before))
+
+
+# noinspection PyBroadException
+def run_job_once(
+    *,
+    job: domain.Job,
+    logger: domain.Logger,
+    resources: domain.ResourceManager,
+) -> domain.JobResult:
+    try:
+        result = typing.cast(
+            typing.Optional[domain.JobResult],
+            job.run(job.config, logger, resources),
+        )
+        if result is None:
+            result = domain.JobResult.success()
+        return result
+    except domain.error.JobSoftTimeout:
+        # the parent has given up on the job and is waiting for the process to exit
+        raise
+    except Exception as e:
+        return domain.JobResult.error(e)
+    finally:
+        resources.close()
+
+
+@dataclasses.dataclass(frozen=True)
+class Usage:
+    cpu_user_seconds: float
+    cpu_system_seconds: float
+    peak_rss_mb: float
+    read_bytes: typing.Optional[int]
+    write_bytes: typing.Optional[int]
+
+
+def current_usage() -> Usage:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    io = proc_io()
+    return Usage(
+        cpu_user_seconds=usage.ru_utime,
+        cpu_system_seconds=usage.ru_stime,
+        # ru_maxrss is in kilobytes on Linux
+        peak_rss_mb=usage.ru_maxrss / 1024,
+        read_bytes=io.get("read_bytes"),
+        write_bytes=io.get("write_bytes"),
+    )
+
+
+def metrics_since(before: Usage, /) -> domain.RunMetrics:
+    after = current_usage()
+    return domain.RunMetrics(
+        cpu_user_seconds=after.cpu_user_seconds - before.cpu_user_seconds,
+        cpu_system_seconds=after.cpu_system_seconds - before.cpu_system_seconds,
+        peak_rss_mb=after.peak_rss_mb,
+        read_bytes=(
+            after.read_bytes - before.read_bytes
+            if after.read_bytes is not None and before.read_bytes is not None
+            else None
+        ),
+        write_bytes=(
+            after.write_bytes - before.write_bytes
+            if after.write_bytes is not None and before.write_bytes is not None
+            else None
+        ),
+    )
+
+
+def proc_io() -> typing.Dict[str, int]:
+    """Read the process's I/O counters, which are only available on Linux"""
+    try:
+        with open("/proc/self/io") as fh:
+            return {
+                k.strip(): int(v) for k, v in (line.split(":") for line in fh if line.strip())
+            }
+    except (OSError, ValueError):
+        return {}
+
+
+def resident_memory_mb() -> typing.Optional[float]:
+    try:
+        with open("/proc/self/statm") as fh:
+            resident_pages = int(fh.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        return None
@@ -0,0 +1,51 @@
+import pytest
+import sqlalchemy as sa
+
+import letl
+
+
+def test_writes_go_through_to_the_wrapped_repo(in_memory_db: sa.engine.Engine) -> None:
+    db_repo = letl.DbStatusRepo(engine=in_memory_db)
+    repo = letl.CachedStatusRepo(repo=db_repo)
+
+    repo.start(job_name="test_job_1")
+    repo.error(job_name="test_job_1", error="Whoops!")
+
+    cached = repo.status(job_name="test_job_1")
+    stored = db_repo.status(job_name="test_job_1")
+    assert cached is not None and stored is not None
+    assert cached.status == stored.status == letl.Status.Error
+    assert cached.error_message == stored.error_message == "Whoops!"
+    assert cached.ended is not None
+
+
+def test_reads_are_served_from_memory_until_invalidated(
+    in_memory_db: sa.engine.Engine,
+) -> None:
+    db_repo = letl.DbStatusRepo(engine=in_memory_db)
+    repo = letl.CachedStatusRepo(repo=db_repo)
+    assert repo.all() == set()
+
+    # simulate another process writing to the same database
+    db_repo.start(job_name="test_job_1")
+    assert repo.status(job_name="test_job_1") is None
+
+    repo.invalidate()
+    assert repo.status_map(job_names={"test_job_1"}).keys() == {"test_job_1"}
+
+
+def test_cache_is_reloaded_when_a_write_fails(in_memory_db: sa.engine.Engine) -> None:
+    db_repo = letl.DbStatusRepo(engine=in_memory_db)
+    repo = letl.CachedStatusRepo(repo=db_repo)
+    repo.start(job_name="test_job_1")
+    # the status is saved, but the history row that follows it can't be
+    with in_memory_db.begin() as con:
+        con.execute(sa.text("DROP TABLE letl.job_history"))
+
+    with pytest.raises(sa.exc.OperationalError):
+        repo.error(job_name="test_job_1", error="Whoops!")
+
+    cached = repo.status(job_name="test_job_1")
+    stored = db_repo.status(job_name="test_job_1")
+    assert cached is not None and stored is not None
+    assert cached.status == stored.status == letl.Status.Error
@@ -0,0 +1,26 @@
+import sqlalchemy as sa
+
+import letl
+
+
+def test_lease_can_only_be_held_by_one_node(in_memory_db: sa.engine.Engine) -> None:
+    repo = letl.DbLeaseRepo(engine=in_memory_db)
+    assert repo.claim(job_name="test_job_1", node_id="a", seconds=60)
+    assert not repo.claim(job_name="test_job_1", node_id="b", seconds=60)
+    assert repo.claim(job_name="test_job_2", node_id="b", seconds=60)
+
+    repo.release(job_name="test_job_1", node_id="a")
+    assert repo.claim(job_name="test_job_1", node_id="b", seconds=60)
+
+
+def test_expired_lease_is_taken_over(in_memory_db: sa.engine.Engine) -> None:
+    repo = letl.DbLeaseRepo(engine=in_memory_db)
+    assert repo.claim(job_name="test_job_1", node_id="a", seconds=0)
+    assert repo.claim(job_name="test_job_1", node_id="b", seconds=60)
+
+
+def test_release_by_another_node_is_ignored(in_memory_db: sa.engine.Engine) -> None:
+    repo = letl.DbLeaseRepo(engine=in_memory_db)
+    assert repo.claim(job_name="test_job_1", node_id="a", seconds=60)
+    repo.release(job_name="test_job_1", node_id="b")
+    assert not repo.claim(job_name="test_job_1", node_id="b", seconds=60)
@@ -0,0 +1,58 @@
+import multiprocessing as mp
+import time
+
+import letl
+from letl.service.logger import NamedLogger
+
+
+class Source(letl.Resource[None]):
+    def open(self) -> None:
+        return None
+
+    def close(self, /, handle: None) -> None:
+        pass
+
+
+def test_rate_limit() -> None:
+    limiter = letl.MpResourceLimiter(
+        resources=[Source(key="db", max_per_second=10, burst=2)]
+    )
+    assert limiter.acquire("db", block=False)
+    assert limiter.acquire("db", block=False)
+    assert not limiter.acquire("db", block=False)
+
+    start = time.monotonic()
+    assert limiter.acquire("db")
+    assert 0.05 < time.monotonic() - start < 0.5
+
+
+def test_acquire_all_takes_nothing_if_any_resource_is_saturated() -> None:
+    limiter = letl.MpResourceLimiter(
+        resources=[
+            Source(key="a", max_concurrent=1),
+            Source(key="b", max_concurrent=1),
+        ]
+    )
+    assert limiter.acquire("b")
+    assert not limiter.acquire_all({"a", "b"})
+    assert limiter.acquire("a", block=False)
+    limiter.release("b")
+
+
+def test_unlimited_resources_are_always_available() -> None:
+    limiter = letl.MpResourceLimiter(resources=[Source(key="db")])
+    assert all(limiter.acquire("db", block=False) for _ in range(100))
+
+
+def test_resource_manager_holds_a_slot_until_closed() -> None:
+    res = Source(key="db", max_concurrent=1)
+    limiter = letl.MpResourceLimiter(resources=[res])
+    rm = letl.ResourceManager(
+        resources=frozenset({res}),
+        log=NamedLogger(name="test", message_queue=mp.Queue()),
+        limiter=limiter,
+    )
+    rm.get("db", type(None))
+    assert not limiter.acquire("db", block=False)
+    rm.close()
+    assert limiter.acquire("db", block=False)
@@ -0,0 +1,53 @@
+import datetime
+import typing
+
+import letl
+
+
+def test_highest_priority_first_then_fifo(make_job: typing.Callable[..., letl.Job]) -> None:
+    q = letl.PrioritySetQueue()
+    jobs = [
+        make_job("cheap_1"),
+        make_job("critical", priority=10),
+        make_job("cheap_2"),
+        make_job("important", priority=5),
+    ]
+    for job in jobs:
+        q.put(job)
+    assert [q.get().job_name for _ in jobs] == [
+        "critical",
+        "important",
+        "cheap_1",
+        "cheap_2",
+    ]
+
+
+def test_most_overdue_first_within_a_priority(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30)
+    due_since = {
+        "hourly": now - datetime.timedelta(minutes=50),
+        "every_minute": now - datetime.timedelta(minutes=1),
+        "daily": now - datetime.timedelta(hours=10),
+    }
+    q = letl.PrioritySetQueue(due_since=lambda job: due_since.get(job.job_name))
+    for job_name in due_since:
+        q.put(make_job(job_name))
+    q.put(make_job("critical", priority=10))
+    assert [q.get().job_name for _ in range(4)] == [
+        "critical",
+        "daily",
+        "hourly",
+        "every_minute",
+    ]
+
+
+def test_duplicates_are_ignored(make_job: typing.Callable[..., letl.Job]) -> None:
+    q = letl.PrioritySetQueue()
+    job = make_job("job_1")
+    q.put(job)
+    q.put(job)
+    assert q.qsize() == 1
+    assert q.get() == job
+    assert q.empty()
@@ -0,0 +1,32 @@
+import datetime
+
+import sqlalchemy as sa
+
+import letl
+from letl import domain
+
+
+def test_add_many_keeps_message_timestamps(in_memory_db: sa.engine.Engine) -> None:
+    repo = letl.DbLogRepo(engine=in_memory_db)
+    ts = datetime.datetime(2010, 1, 1, 3)
+    repo.add_many(
+        [
+            domain.LogMessage(
+                logger_name="test",
+                level=domain.LogLevel.Info,
+                message=f"message {i}",
+                ts=ts + datetime.timedelta(seconds=i),
+            )
+            for i in range(3)
+        ]
+    )
+    with in_memory_db.connect() as con:
+        rows = con.execute(
+            sa.text("SELECT message, ts FROM letl.log ORDER BY ts")
+        ).fetchall()
+    assert [row.message for row in rows] == ["message 0", "message 1", "message 2"]
+    assert str(rows[0].ts).startswith("2010-01-01 03:00:00")
+
+
+def test_add_many_with_no_messages_is_a_no_op(in_memory_db: sa.engine.Engine) -> None:
+    letl.DbLogRepo(engine=in_memory_db).add_many([])
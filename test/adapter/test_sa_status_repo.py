@@ -54,3 +54,67 @@ def test_start_happy_path(in_memory_db: sa.engine.Engine) -> None:
         assert result.ended is None
         assert result.error_message is None
         assert result.skipped_reason is None
+
+
+def test_status_map_happy_path(in_memory_db: sa.engine.Engine) -> None:
+    repo = letl.DbStatusRepo(engine=in_memory_db)
+    repo.start(job_name="test_job_1")
+    repo.start(job_name="test_job_2")
+    repo.start(job_name="test_job_3")
+    repo.done(job_name="test_job_2")
+
+    result = repo.status_map(job_names={"test_job_1", "test_job_2", "missing_job"})
+    assert set(result.keys()) == {"test_job_1", "test_job_2"}
+    assert result["test_job_1"].is_running
+    assert result["test_job_2"].status == letl.Status.Success
+    assert repo.status_map(job_names=set()) == {}
+
+
+def test_run_metrics_are_saved_to_history(in_memory_db: sa.engine.Engine) -> None:
+    repo = letl.DbStatusRepo(engine=in_memory_db)
+    repo.start(job_name="test_job_1")
+    repo.done(
+        job_name="test_job_1",
+        metrics=letl.RunMetrics(
+            cpu_user_seconds=1.5, peak_rss_mb=64.0, queue_wait_seconds=0.25
+        ),
+    )
+    with in_memory_db.connect() as con:
+        row = con.execute("SELECT * FROM letl.job_history").first()
+    assert row.cpu_user_seconds == 1.5
+    assert row.cpu_system_seconds is None
+    assert row.peak_rss_mb == 64.0
+    assert row.queue_wait_seconds == 0.25
+
+
+def test_create_tables_adds_metric_columns_to_an_old_job_history() -> None:
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as con:
+        con.execute(sa.text("ATTACH ':memory:' as letl"))
+        # the job_history table as it was before run metrics were recorded
+        con.execute(
+            sa.text(
+                """
+                CREATE TABLE letl.job_history (
+                    id INTEGER PRIMARY KEY
+                ,   job_name VARCHAR
+                ,   status VARCHAR NOT NULL
+                ,   started DATETIME NOT NULL
+                ,   ended DATETIME
+                ,   error_message VARCHAR
+                ,   skipped_reason VARCHAR
+                )
+                """
+            )
+        )
+    letl.db.create_tables(engine=engine)
+    # running it again is a no-op
+    letl.db.create_tables(engine=engine)
+
+    repo = letl.DbStatusRepo(engine=engine)
+    repo.start(job_name="test_job_1")
+    repo.done(job_name="test_job_1", metrics=letl.RunMetrics(read_bytes=1024))
+    with engine.connect() as con:
+        row = con.execute(sa.text("SELECT * FROM letl.job_history")).first()
+    assert row.status == "success"
+    assert row.read_bytes == 1024
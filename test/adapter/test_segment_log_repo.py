@@ -0,0 +1,49 @@
+import datetime
+import pathlib
+
+import pytest
+
+import letl
+from letl import domain
+
+
+def message(i: int, /) -> domain.LogMessage:
+    return domain.LogMessage(
+        logger_name="test",
+        level=domain.LogLevel.Info,
+        message=f"message {i}",
+        ts=datetime.datetime(2010, 1, 1, 3, 0, i),
+    )
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_closed_segments_hold_the_messages_in_order(
+    tmp_path: pathlib.Path, compress: bool
+) -> None:
+    repo = letl.SegmentLogRepo(folder=tmp_path, compress=compress)
+    repo.add_many([message(0), message(1)])
+    assert repo.closed_segments() == []
+
+    repo.close()
+    repo.add_many([message(2)])
+    repo.close()
+    segments = repo.closed_segments()
+    assert len(segments) == 2
+    assert [letl.read_segment(path) for path in segments] == [
+        [message(0), message(1)],
+        [message(2)],
+    ]
+
+
+def test_segment_is_closed_once_it_is_full(tmp_path: pathlib.Path) -> None:
+    repo = letl.SegmentLogRepo(folder=tmp_path, max_segment_bytes=1)
+    repo.add_many([message(0)])
+    repo.add_many([message(1)])
+    assert len(repo.closed_segments()) == 2
+
+
+def test_segments_left_open_are_closed_on_restart(tmp_path: pathlib.Path) -> None:
+    letl.SegmentLogRepo(folder=tmp_path).add_many([message(0)])
+    repo = letl.SegmentLogRepo(folder=tmp_path)
+    [path] = repo.closed_segments()
+    assert letl.read_segment(path) == [message(0)]
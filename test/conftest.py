@@ -1,3 +1,5 @@
+import typing
+
 import pytest
 import sqlalchemy as sa
 
@@ -11,3 +13,36 @@ def in_memory_db() -> sa.engine.Engine:
         con.execute(sa.text("ATTACH ':memory:' as letl"))
         letl.db.create_tables(engine=engine)
     return engine
+
+
+def noop(config: letl.Config, logger: letl.Logger, resources: letl.ResourceManager) -> None:
+    pass
+
+
+def new_job(
+    job_name: str,
+    run: typing.Callable[..., typing.Any] = noop,
+    *,
+    dependencies: typing.Iterable[str] = (),
+    timeout_seconds: int = 10,
+    retries: int = 0,
+    every_seconds: int = 30,
+    config: typing.Optional[letl.Config] = None,
+    **fields: typing.Any,
+) -> letl.Job:
+    return letl.Job(
+        job_name=job_name,
+        timeout_seconds=timeout_seconds,
+        retries=retries,
+        run=run,
+        config=config or letl.config(),
+        schedule=frozenset({letl.Schedule.every_x_seconds(seconds=every_seconds)}),
+        dependencies=frozenset(dependencies),
+        **fields,
+    )
+
+
+@pytest.fixture(scope="session")
+def make_job() -> typing.Callable[..., letl.Job]:
+    """Builds jobs that run every 30 seconds, with any other Job field passed as a keyword"""
+    return new_job
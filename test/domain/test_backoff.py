@@ -0,0 +1,13 @@
+import letl
+
+
+def test_delay_grows_exponentially_up_to_max() -> None:
+    backoff = letl.Backoff(base_seconds=1, factor=2, max_seconds=5, jitter=0)
+    assert [backoff.delay(attempt=i) for i in range(1, 5)] == [1, 2, 4, 5]
+
+
+def test_jitter_only_shortens_the_delay() -> None:
+    backoff = letl.Backoff(base_seconds=10, factor=2, max_seconds=100, jitter=0.5)
+    delays = [backoff.delay(attempt=1) for _ in range(100)]
+    assert all(5 <= d <= 10 for d in delays)
+    assert len(set(delays)) > 1
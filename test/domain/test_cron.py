@@ -0,0 +1,68 @@
+import datetime
+
+import pytest
+
+import letl
+
+
+def test_parse_sets_expected_bits() -> None:
+    expr = letl.CronExpression.parse("5,35 */6 1-3 jan-feb mon-fri")
+    assert expr.minutes == (1 << 5) | (1 << 35)
+    assert expr.hours == (1 << 0) | (1 << 6) | (1 << 12) | (1 << 18)
+    assert expr.monthdays == 0b111
+    assert expr.months == 0b11
+    assert expr.weekdays == 0b0111110
+
+
+def test_sunday_can_be_0_or_7() -> None:
+    assert letl.CronExpression.parse("0 0 * * 7").weekdays == 1
+    assert letl.CronExpression.parse("0 0 * * 0").weekdays == 1
+
+
+def test_next_fire_on_weekdays() -> None:
+    expr = letl.CronExpression.parse("5,35 * * * mon-fri")
+    # Friday
+    assert expr.next_fire(datetime.datetime(2021, 5, 14, 10, 5)) == datetime.datetime(
+        2021, 5, 14, 10, 35
+    )
+    assert expr.next_fire(datetime.datetime(2021, 5, 14, 23, 40)) == datetime.datetime(
+        2021, 5, 17, 0, 5
+    )
+
+
+def test_next_fire_when_either_day_field_matches() -> None:
+    # the 1st of the month or any Monday
+    expr = letl.CronExpression.parse("0 12 1 * mon")
+    # Tuesday, May 11th
+    assert expr.next_fire(datetime.datetime(2021, 5, 11, 13)) == datetime.datetime(
+        2021, 5, 17, 12
+    )
+    assert expr.next_fire(datetime.datetime(2021, 5, 31, 13)) == datetime.datetime(
+        2021, 6, 1, 12
+    )
+
+
+def test_next_fire_on_leap_day() -> None:
+    expr = letl.CronExpression.parse("0 0 29 2 *")
+    assert expr.next_fire(datetime.datetime(2021, 3, 1)) == datetime.datetime(2024, 2, 29)
+
+
+@pytest.mark.parametrize(
+    "expression", ["* * * *", "60 * * * *", "* * * foo *", "5-1 * * * *", "0 0 31 2 *"]
+)
+def test_invalid_expressions_are_rejected(expression: str) -> None:
+    with pytest.raises(letl.error.InvalidCronExpression):
+        letl.CronExpression.parse(expression)
+
+
+def test_cron_schedule_is_due_at_the_next_fire_time() -> None:
+    schedule = letl.Schedule.cron("*/15 9-17 * * *")
+    last_completed = datetime.datetime(2021, 5, 12, 9, 16)
+    now = datetime.datetime(2021, 5, 12, 9, 20)
+    assert schedule.next_due(
+        last_completed=last_completed, now=now
+    ) == datetime.datetime(2021, 5, 12, 9, 30)
+    assert not schedule.is_due(last_completed=last_completed, now=now)
+    assert schedule.is_due(
+        last_completed=last_completed, now=datetime.datetime(2021, 5, 12, 9, 30)
+    )
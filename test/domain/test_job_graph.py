@@ -0,0 +1,39 @@
+import typing
+
+import pytest
+
+import letl
+
+
+def test_topological_order_puts_dependencies_first(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    graph = letl.JobGraph(
+        [
+            make_job("load", dependencies={"transform_a", "transform_b"}),
+            make_job("transform_b", dependencies={"extract"}),
+            make_job("transform_a", dependencies={"extract"}),
+            make_job("extract"),
+        ]
+    )
+    assert graph.topological_order == ["extract", "transform_a", "transform_b", "load"]
+    assert graph.dependents("extract") == {"transform_a", "transform_b"}
+    assert graph.dependents("load") == frozenset()
+
+
+def test_missing_dependencies_are_rejected(make_job: typing.Callable[..., letl.Job]) -> None:
+    with pytest.raises(letl.error.MissingDependencies) as e:
+        letl.JobGraph([make_job("load", dependencies={"extract"})])
+    assert e.value.missing == {"load": {"extract"}}
+
+
+def test_cycles_are_rejected(make_job: typing.Callable[..., letl.Job]) -> None:
+    jobs: typing.List[letl.Job] = [
+        make_job("a", dependencies={"c"}),
+        make_job("b", dependencies={"a"}),
+        make_job("c", dependencies={"b"}),
+        make_job("d"),
+    ]
+    with pytest.raises(letl.error.DependencyCycle) as e:
+        letl.JobGraph(jobs)
+    assert e.value.jobs == {"a", "b", "c"}
@@ -0,0 +1,81 @@
+import itertools
+import multiprocessing as mp
+import typing
+
+import letl
+from letl.service.logger import NamedLogger
+
+
+class Counter(letl.Resource[int]):
+    def __init__(self, *, pool_size: int = 1, max_idle_seconds: float = 300):
+        super().__init__(
+            key="counter", pool_size=pool_size, max_idle_seconds=max_idle_seconds
+        )
+        self._ids = itertools.count()
+        self.closed: typing.List[int] = []
+        self.unhealthy: typing.Set[int] = set()
+
+    def open(self) -> int:
+        return next(self._ids)
+
+    def close(self, /, handle: int) -> None:
+        self.closed.append(handle)
+
+    def is_healthy(self, /, handle: int) -> bool:
+        return handle not in self.unhealthy
+
+
+def logger() -> letl.Logger:
+    return NamedLogger(name="test", message_queue=mp.Queue())
+
+
+def run(res: Counter, pool: typing.Optional[letl.ResourcePool]) -> typing.List[int]:
+    rm = letl.ResourceManager(resources=frozenset({res}), log=logger(), pool=pool)
+    try:
+        return [rm.get("counter", int), rm.get("counter", int)]
+    finally:
+        rm.close()
+
+
+def test_handle_is_opened_once_per_run() -> None:
+    res = Counter()
+    assert run(res, pool=None) == [0, 0]
+    assert run(res, pool=None) == [1, 1]
+    assert res.closed == [0, 1]
+
+
+def test_pooled_handle_is_reused_across_runs() -> None:
+    res = Counter()
+    pool = letl.ResourcePool(log=logger())
+    assert run(res, pool) == [0, 0]
+    assert run(res, pool) == [0, 0]
+    assert res.closed == []
+
+    pool.close()
+    assert res.closed == [0]
+
+
+def test_unhealthy_handle_is_replaced() -> None:
+    res = Counter()
+    pool = letl.ResourcePool(log=logger())
+    run(res, pool)
+    res.unhealthy.add(0)
+    assert run(res, pool) == [1, 1]
+    assert res.closed == [0]
+
+
+def test_idle_handles_are_evicted() -> None:
+    res = Counter(max_idle_seconds=0)
+    pool = letl.ResourcePool(log=logger())
+    run(res, pool)
+    pool.evict_idle()
+    assert res.closed == [0]
+
+
+def test_handles_beyond_pool_size_are_closed() -> None:
+    res = Counter(pool_size=1)
+    pool = letl.ResourcePool(log=logger())
+    first, second = pool.acquire(res), pool.acquire(res)
+    pool.release(res, first)
+    pool.release(res, second)
+    assert res.closed == [second]
@@ -0,0 +1,100 @@
+import datetime
+
+import letl
+
+
+def test_next_due_when_never_run_is_now() -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30, 15)
+    schedule = letl.Schedule.every_x_seconds(seconds=30)
+    assert schedule.next_due(last_completed=None, now=now) == now
+
+
+def test_next_due_respects_the_interval() -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30, 15)
+    schedule = letl.Schedule.every_x_seconds(seconds=3600)
+    last_completed = datetime.datetime(2021, 5, 12, 10, 0, 0)
+    assert schedule.next_due(
+        last_completed=last_completed, now=now
+    ) == datetime.datetime(2021, 5, 12, 11, 0, 0)
+
+
+def test_next_due_daily_is_the_following_midnight() -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30, 15)
+    schedule = letl.Schedule.daily()
+    assert schedule.next_due(
+        last_completed=datetime.datetime(2021, 5, 12, 1, 0, 0), now=now
+    ) == datetime.datetime(2021, 5, 13)
+
+
+def test_next_due_jumps_to_the_next_open_window() -> None:
+    # Wednesday, after the window has closed for the day
+    now = datetime.datetime(2021, 5, 12, 18, 30, 15)
+    schedule = letl.Schedule.every_x_seconds(seconds=60).between(
+        start_weekday=letl.Weekday.Mon,
+        end_weekday=letl.Weekday.Thu,
+        start_hour=9,
+        end_hour=17,
+        start_minute=15,
+        end_minute=45,
+    )
+    due = schedule.next_due(last_completed=None, now=now)
+    assert due == datetime.datetime(2021, 5, 13, 9, 15)
+    assert schedule.is_due(last_completed=None, now=due)
+    assert not schedule.is_due(
+        last_completed=None, now=due - datetime.timedelta(minutes=1)
+    )
+
+    # Thursday after close rolls over the weekend to Monday
+    due = schedule.next_due(
+        last_completed=None, now=datetime.datetime(2021, 5, 13, 17, 46)
+    )
+    assert due == datetime.datetime(2021, 5, 17, 9, 15)
+
+
+def test_next_due_skips_to_the_next_month_and_year() -> None:
+    schedule = letl.Schedule.daily(start_month=3, end_month=4, start_monthday=31)
+    now = datetime.datetime(2021, 4, 2, 12, 0)
+    assert schedule.next_due(
+        last_completed=None, now=now
+    ) == datetime.datetime(2022, 3, 31)
+
+
+def test_next_due_is_none_when_the_window_never_opens() -> None:
+    schedule = letl.Schedule.daily(start_month=2, end_month=2, start_monthday=30)
+    now = datetime.datetime(2021, 1, 1)
+    assert schedule.next_due(last_completed=None, now=now) is None
+
+
+def test_cron_schedule_that_never_ran_waits_for_its_next_fire_time() -> None:
+    schedule = letl.Schedule.cron("0 3 * * *")
+    now = datetime.datetime(2021, 5, 12, 10, 30, 15)
+    assert not schedule.is_due(last_completed=None, now=now)
+    assert schedule.next_due(last_completed=None, now=now) == datetime.datetime(
+        2021, 5, 13, 3
+    )
+
+    # within the minute that the expression fires
+    now = datetime.datetime(2021, 5, 13, 3, 0, 40)
+    assert schedule.is_due(last_completed=None, now=now)
+    assert schedule.next_due(last_completed=None, now=now) == now
+
+
+def test_due_since_is_when_the_interval_elapsed() -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30, 15)
+    schedule = letl.Schedule.every_x_seconds(seconds=3600)
+    last_completed = datetime.datetime(2021, 5, 12, 9, 0, 0)
+    assert schedule.due_since(
+        last_completed=last_completed, now=now
+    ) == datetime.datetime(2021, 5, 12, 10, 0, 0)
+    assert (
+        schedule.due_since(last_completed=datetime.datetime(2021, 5, 12, 10), now=now)
+        is None
+    )
+
+
+def test_due_since_does_not_count_time_outside_the_window() -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30, 15)
+    schedule = letl.Schedule.daily().between(start_hour=8, end_hour=17)
+    assert schedule.due_since(
+        last_completed=datetime.datetime(2021, 5, 11, 9, 0, 0), now=now
+    ) == datetime.datetime(2021, 5, 12, 8, 0, 0)
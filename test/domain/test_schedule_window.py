@@ -0,0 +1,33 @@
+import datetime
+
+import letl
+
+
+def test_compile_sets_expected_bits() -> None:
+    window = letl.ScheduleWindow.compile(
+        start_month=3,
+        end_month=4,
+        start_monthday=1,
+        end_monthday=31,
+        start_weekday=letl.Weekday.Tue,
+        end_weekday=letl.Weekday.Tue,
+        start_hour=9,
+        start_minute=0,
+        end_hour=9,
+        end_minute=1,
+    )
+    assert window.months == 0b1100
+    assert window.monthdays == (1 << 31) - 1
+    tuesday_9am = 24 * 60 + 9 * 60
+    assert window.minutes_of_week == 0b11 << tuesday_9am
+
+
+def test_contains_matches_the_schedule_fields() -> None:
+    schedule = letl.Schedule.daily(start_hour=9, end_hour=17, start_minute=0, end_minute=29)
+    assert schedule.window.contains(datetime.datetime(2021, 5, 12, 9, 29))
+    assert not schedule.window.contains(datetime.datetime(2021, 5, 12, 9, 30))
+    assert not schedule.window.contains(datetime.datetime(2021, 5, 12, 18, 0))
+
+
+def test_identical_windows_share_one_compiled_instance() -> None:
+    assert letl.Schedule.daily().window is letl.Schedule.every_x_seconds(seconds=5).window
@@ -0,0 +1,55 @@
+import asyncio
+import multiprocessing as mp
+import time
+import typing
+from unittest import mock
+
+import letl
+from letl.service.async_job_runner import run_async_job
+from letl.service.logger import NamedLogger
+
+
+async def nap(
+    config: letl.Config, logger: letl.Logger, resources: letl.ResourceManager
+) -> None:
+    await asyncio.sleep(config.get("seconds", float))
+
+
+def run_jobs(jobs: typing.List[letl.Job]) -> typing.List[letl.JobResult]:
+    status_repo = mock.create_autospec(letl.StatusRepo, instance=True)
+    logger = NamedLogger(name="test", message_queue=mp.Queue())
+
+    async def main() -> typing.List[letl.JobResult]:
+        return list(
+            await asyncio.gather(
+                *(
+                    run_async_job(
+                        job=job,
+                        status_repo=status_repo,
+                        logger=logger,
+                        resources=frozenset(),
+                    )
+                    for job in jobs
+                )
+            )
+        )
+
+    return asyncio.run(main())
+
+
+def test_async_jobs_run_concurrently(make_job: typing.Callable[..., letl.Job]) -> None:
+    assert make_job("nap", nap, config=letl.config(seconds=0.0)).is_async
+
+    start = time.monotonic()
+    results = run_jobs(
+        [make_job(f"nap_{i}", nap, config=letl.config(seconds=0.5)) for i in range(10)]
+    )
+    assert time.monotonic() - start < 2
+    assert not any(result.is_error for result in results)
+
+
+def test_async_job_is_cancelled_on_timeout(make_job: typing.Callable[..., letl.Job]) -> None:
+    job = make_job("nap", nap, config=letl.config(seconds=5.0), timeout_seconds=1)
+    [result] = run_jobs([job])
+    assert result.is_error
+    assert "timed out" in (result.error_message or "")
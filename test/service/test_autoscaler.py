@@ -0,0 +1,52 @@
+from letl.service.autoscaler import HostLoad, next_capacity
+from letl.service.dispatcher import DispatchStats
+
+IDLE_HOST = HostLoad(load_per_cpu=0.1, available_memory_mb=8000)
+
+
+def stats(
+    *, runners: int, queued: int, in_flight: int, avg_run_seconds: float = 0
+) -> DispatchStats:
+    return DispatchStats(
+        runners=runners,
+        queued=queued,
+        in_flight=in_flight,
+        async_in_flight=0,
+        retrying=0,
+        oldest_wait_seconds=0,
+        avg_wait_seconds=0,
+        avg_run_seconds=avg_run_seconds,
+    )
+
+
+def capacity(s: DispatchStats, load: HostLoad = IDLE_HOST) -> int:
+    return next_capacity(
+        stats=s,
+        load=load,
+        min_runners=2,
+        max_runners=10,
+        max_load_per_cpu=1.5,
+        min_available_memory_mb=256,
+        seconds_between_checks=30,
+    )
+
+
+def test_grows_to_clear_backlog_up_to_max() -> None:
+    assert capacity(stats(runners=2, queued=3, in_flight=2)) == 5
+    assert capacity(stats(runners=2, queued=30, in_flight=2)) == 10
+
+
+def test_short_jobs_do_not_grow_capacity() -> None:
+    assert capacity(stats(runners=2, queued=3, in_flight=1, avg_run_seconds=1)) == 2
+
+
+def test_shrinks_when_idle_down_to_min() -> None:
+    assert capacity(stats(runners=5, queued=0, in_flight=1)) == 4
+    assert capacity(stats(runners=2, queued=0, in_flight=0)) == 2
+
+
+def test_shrinks_when_host_is_overloaded() -> None:
+    busy = HostLoad(load_per_cpu=3.0, available_memory_mb=8000)
+    low_memory = HostLoad(load_per_cpu=0.1, available_memory_mb=100)
+    assert capacity(stats(runners=5, queued=10, in_flight=5), busy) == 4
+    assert capacity(stats(runners=5, queued=10, in_flight=5), low_memory) == 4
@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+import typing
+
+import letl
+from letl.service.dispatcher import Dispatcher
+from letl.service.reaper import Reaped
+
+
+def test_dispatch_never_blocks_on_a_full_queue(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    dispatcher = Dispatcher(job_queue=queue.Queue(maxsize=1), runners=1)
+    assert dispatcher.dispatch(make_job("job_1"))
+    assert not dispatcher.dispatch(make_job("job_2"))
+    assert dispatcher.stats.queued == 1
+
+
+def test_jobs_are_not_dispatched_while_queued_or_running(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=1)
+    job = make_job("job_1")
+    assert dispatcher.dispatch(job)
+    assert not dispatcher.dispatch(job)
+
+    taken, wait_seconds = dispatcher.take()
+    assert taken == job
+    assert wait_seconds >= 0
+    assert not dispatcher.dispatch(job)
+    assert dispatcher.stats.in_flight == 1
+
+    dispatcher.finished(job.job_name)
+    assert dispatcher.dispatch(job)
+
+
+def test_stats_report_saturation(make_job: typing.Callable[..., letl.Job]) -> None:
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=1)
+    dispatcher.dispatch(make_job("job_1"))
+    dispatcher.take()
+    assert not dispatcher.stats.is_saturated
+
+    dispatcher.dispatch(make_job("job_2"))
+    assert dispatcher.stats.is_saturated
+
+
+def test_retry_frees_the_runner_and_blocks_dispatch_until_due(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=1)
+    job = make_job("job_1")
+    dispatcher.dispatch(job)
+    dispatcher.take()
+
+    dispatcher.retry(job, delay_seconds=0.2)
+    dispatcher.finished(job.job_name)
+    assert dispatcher.stats.in_flight == 0
+    assert dispatcher.stats.retrying == 1
+    assert not dispatcher.dispatch(job)
+
+    time.sleep(0.4)
+    assert dispatcher.stats.queued == 1
+    assert dispatcher.failed_attempts(job.job_name) == 1
+
+    dispatcher.give_up(job.job_name)
+    assert dispatcher.failed_attempts(job.job_name) == 0
+
+
+def test_take_waits_for_capacity(make_job: typing.Callable[..., letl.Job]) -> None:
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=1)
+    dispatcher.dispatch(make_job("job_1"))
+    dispatcher.dispatch(make_job("job_2"))
+    dispatcher.take()
+
+    taken = []
+    t = threading.Thread(target=lambda: taken.append(dispatcher.take()), daemon=True)
+    t.start()
+    t.join(timeout=0.2)
+    assert not taken
+
+    dispatcher.set_capacity(2)
+    t.join(timeout=1)
+    assert len(taken) == 1
+    assert dispatcher.stats.runners == 2
+
+
+def test_finished_frees_capacity_and_records_run_time(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=1)
+    dispatcher.dispatch(make_job("job_1"))
+    dispatcher.dispatch(make_job("job_2"))
+    job, _ = dispatcher.take()
+    time.sleep(0.05)
+    dispatcher.finished(job.job_name)
+
+    assert dispatcher.take()[0].job_name != job.job_name
+    assert dispatcher.stats.avg_run_seconds >= 0.05
+
+
+def test_stats_count_timed_out_processes_and_kills() -> None:
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=1)
+    dispatcher.reaped(Reaped(pid=1, seconds=0.5, killed=False, descendants_killed=0))
+    dispatcher.reaped(Reaped(pid=2, seconds=5.5, killed=True, descendants_killed=1))
+    stats = dispatcher.stats
+    assert stats.timeouts == 2
+    assert stats.timeouts_killed == 1
+    assert stats.avg_reap_seconds == 3
+    assert "2 timed out (1 killed" in str(stats)
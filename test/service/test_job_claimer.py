@@ -0,0 +1,37 @@
+import datetime
+import multiprocessing as mp
+import typing
+
+import sqlalchemy as sa
+
+import letl
+from letl.service.job_claimer import JobClaimer
+from letl.service.logger import NamedLogger
+
+
+def make_claimer(*, engine: sa.engine.Engine, node_id: str) -> JobClaimer:
+    return JobClaimer(
+        lease_repo=letl.DbLeaseRepo(engine=engine),
+        status_repo=letl.DbStatusRepo(engine=engine),
+        node_id=node_id,
+        logger=NamedLogger(name=node_id, message_queue=mp.Queue()),
+    )
+
+
+def test_claim_fails_if_another_node_ran_the_job_since_it_was_checked(
+    in_memory_db: sa.engine.Engine, make_job: typing.Callable[..., letl.Job]
+) -> None:
+    job = make_job("test_job")
+    status_repo = letl.DbStatusRepo(engine=in_memory_db)
+    a = make_claimer(engine=in_memory_db, node_id="a")
+    b = make_claimer(engine=in_memory_db, node_id="b")
+
+    # both nodes read the job's status, then b runs it start to finish before a dispatches it
+    checked_at = datetime.datetime.now()
+    assert b.claim(job, checked_at=checked_at)
+    status_repo.start(job_name=job.job_name)
+    status_repo.done(job_name=job.job_name)
+    b.release(job)
+
+    assert not a.claim(job, checked_at=checked_at)
+    assert a.claim(job, checked_at=datetime.datetime.now())
@@ -0,0 +1,167 @@
+import dataclasses
+import datetime
+import functools
+import multiprocessing as mp
+import time
+import typing
+from unittest import mock
+
+import pytest
+
+import letl
+from letl.service.dispatcher import Dispatcher
+from letl.service.job_claimer import JobClaimer
+from letl.service.job_runner import JobRunner
+from letl.service.logger import NamedLogger
+from letl.service.worker import Worker
+
+
+class Source(letl.Resource[None]):
+    def open(self) -> None:
+        return None
+
+    def close(self, /, handle: None) -> None:
+        pass
+
+
+def use_db_then_hang(
+    config: letl.Config, logger: letl.Logger, resources: letl.ResourceManager
+) -> None:
+    resources.get("db", type(None))
+    time.sleep(30)
+
+
+@pytest.mark.parametrize("use_worker", [False, True])
+def test_limiter_slot_comes_back_after_a_job_process_is_killed(
+    make_job: typing.Callable[..., letl.Job], use_worker: bool
+) -> None:
+    res = Source(key="db", max_concurrent=1)
+    resources = frozenset({res})
+    limiter = letl.MpResourceLimiter(resources=resources)
+    logger = NamedLogger(name="test", message_queue=mp.Queue())
+    # no resource_keys, so the runner holds a slot for every limited resource
+    job = make_job("hang", use_db_then_hang, timeout_seconds=1)
+    status_repo = mock.create_autospec(letl.StatusRepo, instance=True)
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=1)
+    worker: typing.Optional[Worker] = None
+    if use_worker:
+        worker = Worker(jobs=[job], logger=logger, resources=resources)
+    runner = JobRunner(
+        status_repo=status_repo,
+        dispatcher=dispatcher,
+        logger=logger,
+        resources=resources,
+        worker=worker,
+        limiter=limiter,
+    )
+    runner.daemon = True
+    runner.start()
+
+    dispatcher.dispatch(job)
+    deadline = time.monotonic() + 10
+    while not status_repo.error.called and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert "timed out" in status_repo.error.call_args.kwargs["error"]
+
+    # the slot is released after the result is saved
+    while not limiter.acquire("db", block=False):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    # the job exits when SIGTERM raises JobSoftTimeout in it, so it isn't killed
+    stats = dispatcher.stats
+    assert stats.timeouts == 1
+    assert stats.timeouts_killed == 0
+
+
+def succeed(
+    config: letl.Config, logger: letl.Logger, resources: letl.ResourceManager
+) -> None:
+    pass
+
+
+def fail(
+    config: letl.Config, logger: letl.Logger, resources: letl.ResourceManager
+) -> None:
+    raise Exception("boom")
+
+
+def test_retry_without_a_delay_is_not_blocked_by_its_own_lease(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    job = make_job("fail", fail, retries=2, retry_backoff=letl.Backoff(base_seconds=0))
+    # a lease that can't be claimed again until it is released
+    leased: typing.Set[str] = set()
+    claimer = mock.create_autospec(JobClaimer, instance=True)
+    claimer.claim.side_effect = lambda job, checked_at: not (
+        job.job_name in leased or leased.add(job.job_name)
+    )
+
+    def release(job: letl.Job) -> None:
+        # releasing takes a round trip to the database
+        time.sleep(0.2)
+        leased.discard(job.job_name)
+
+    claimer.release.side_effect = release
+
+    status_repo = mock.create_autospec(letl.StatusRepo, instance=True)
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=2)
+    logger = NamedLogger(name="test", message_queue=mp.Queue())
+    for _ in range(2):
+        runner = JobRunner(
+            status_repo=status_repo,
+            dispatcher=dispatcher,
+            logger=logger,
+            resources=frozenset(),
+            claimer=claimer,
+        )
+        runner.daemon = True
+        runner.start()
+
+    dispatcher.dispatch(job)
+    deadline = time.monotonic() + 10
+    while status_repo.error.call_count < 3 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert status_repo.error.call_count == 3
+    assert claimer.claim.call_count == 3
+
+
+def test_dependents_are_not_dispatched_after_a_failure(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    load = make_job("load", succeed, dependencies={"extract"})
+    statuses: typing.Dict[str, letl.JobStatus] = {}
+    status_repo = mock.create_autospec(letl.StatusRepo, instance=True)
+    status_repo.start.side_effect = lambda job_name: statuses.__setitem__(
+        job_name, letl.JobStatus.running(job_name=job_name)
+    )
+
+    def finish(job_name: str, status: letl.Status, **kwargs: typing.Any) -> None:
+        statuses[job_name] = dataclasses.replace(
+            statuses[job_name], status=status, ended=datetime.datetime.now()
+        )
+
+    status_repo.done.side_effect = functools.partial(finish, status=letl.Status.Success)
+    status_repo.error.side_effect = functools.partial(finish, status=letl.Status.Error)
+    status_repo.status_map.side_effect = lambda job_names: {
+        name: s for name, s in statuses.items() if name in job_names
+    }
+    dispatcher = mock.create_autospec(Dispatcher, instance=True)
+    dispatcher.dispatch.return_value = True
+
+    for extract in (make_job("extract", fail), make_job("extract", succeed)):
+        dispatcher.take.side_effect = [(extract, 0.0), SystemExit]
+        runner = JobRunner(
+            status_repo=status_repo,
+            dispatcher=dispatcher,
+            logger=NamedLogger(name="test", message_queue=mp.Queue()),
+            resources=frozenset(),
+            job_graph=letl.JobGraph([extract, load]),
+        )
+        with pytest.raises(SystemExit):
+            runner.run()
+        if extract.run is fail:
+            dispatcher.dispatch.assert_not_called()
+    dispatcher.dispatch.assert_called_once_with(
+        load, checked_at=mock.ANY, due_since=mock.ANY
+    )
@@ -0,0 +1,229 @@
+import dataclasses
+import datetime
+import multiprocessing as mp
+import pathlib
+import queue
+import time
+import typing
+
+import pytest
+import sqlalchemy as sa
+
+import letl
+from letl import domain
+from letl.service.log_shipper import LogShipper
+from letl.service.logger import LoggerThread, NamedLogger, Overflow, flush_logs
+
+
+@pytest.fixture
+def file_db(tmp_path: pathlib.Path) -> sa.engine.Engine:
+    # the logger thread uses its own connection, so an in-memory database won't do
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+
+    @sa.event.listens_for(engine, "connect")
+    def attach(dbapi_con, _):  # type: ignore
+        dbapi_con.execute(f"ATTACH '{tmp_path / 'letl.db'}' AS letl")
+
+    letl.db.create_tables(engine=engine)
+    return engine
+
+
+def message(i: int, /) -> domain.LogMessage:
+    return domain.LogMessage(
+        logger_name="test",
+        level=domain.LogLevel.Info,
+        message=f"message {i}",
+        ts=datetime.datetime.now(),
+    )
+
+
+def log_row_count(engine: sa.engine.Engine, /) -> int:
+    with engine.connect() as con:
+        return con.execute(sa.text("SELECT COUNT(*) FROM letl.log")).scalar()
+
+
+def test_logger_thread_writes_remaining_batch_on_stop(
+    file_db: sa.engine.Engine,
+) -> None:
+    message_queue: "queue.Queue[typing.Optional[domain.LogMessage]]" = queue.Queue()
+    thread = LoggerThread(
+        message_queue=message_queue,  # type: ignore
+        repo=letl.DbLogRepo(engine=file_db),
+        batch_size=1000,
+        flush_seconds=60,
+    )
+    thread.start()
+    for i in range(3):
+        message_queue.put(message(i))
+    # batches from job processes arrive as tuples
+    message_queue.put((message(3), message(4)))  # type: ignore
+    thread.stop()
+    assert not thread.is_alive()
+    assert log_row_count(file_db) == 5
+
+
+def test_logger_thread_flushes_after_flush_seconds(
+    file_db: sa.engine.Engine,
+) -> None:
+    message_queue: "queue.Queue[typing.Optional[domain.LogMessage]]" = queue.Queue()
+    thread = LoggerThread(
+        message_queue=message_queue,  # type: ignore
+        repo=letl.DbLogRepo(engine=file_db),
+        batch_size=1000,
+        flush_seconds=0.1,
+    )
+    thread.start()
+    try:
+        message_queue.put(message(1))
+        deadline = datetime.datetime.now() + datetime.timedelta(seconds=5)
+        while log_row_count(file_db) == 0 and datetime.datetime.now() < deadline:
+            pass
+        assert log_row_count(file_db) == 1
+    finally:
+        thread.stop()
+
+
+def test_named_logger_suppresses_repeats_within_window() -> None:
+    message_queue: "queue.Queue[typing.Optional[domain.LogMessage]]" = queue.Queue()
+    logger = NamedLogger(
+        name="test",
+        message_queue=message_queue,  # type: ignore
+        dedup_seconds=0.2,
+    )
+    for _ in range(3):
+        logger.info("hello")
+    assert logger.suppressed == 2
+    assert message_queue.qsize() == 1
+
+    time.sleep(0.3)
+    logger.info("hello")
+    message_queue.get_nowait()
+    repeated = message_queue.get_nowait()
+    assert repeated is not None
+    assert repeated.message == "hello [repeated 2 more times]"
+
+
+def test_named_logger_forgets_least_recently_seen_messages() -> None:
+    message_queue: "queue.Queue[typing.Optional[domain.LogMessage]]" = queue.Queue()
+    logger = NamedLogger(
+        name="test",
+        message_queue=message_queue,  # type: ignore
+        dedup_capacity=2,
+    )
+    logger.info("a")
+    logger.info("b")
+    logger.info("a")
+    logger.info("c")  # evicts b, since a was seen more recently
+    logger.info("a")
+    logger.info("b")
+    assert [message_queue.get_nowait().message for _ in range(4)] == [  # type: ignore
+        "a",
+        "b",
+        "c",
+        "b",
+    ]
+    assert logger.suppressed == 2
+
+
+def test_named_logger_defers_messages_below_min_log_level() -> None:
+    message_queue: "queue.Queue[typing.Optional[domain.LogMessage]]" = queue.Queue()
+    logger = NamedLogger(
+        name="test",
+        message_queue=message_queue,  # type: ignore
+        min_log_level=domain.LogLevel.Info,
+    )
+    calls = []
+
+    def expensive() -> str:
+        calls.append(1)
+        return "expensive"
+
+    assert not logger.is_enabled(domain.LogLevel.Debug)
+    assert logger.is_enabled(domain.LogLevel.Error)
+    logger.debug(expensive)
+    assert calls == []
+    assert message_queue.empty()
+
+    logger.info(expensive)
+    logger.info("%s of %s", 1, 2)
+    assert calls == [1]
+    assert [message_queue.get_nowait().message for _ in range(2)] == [  # type: ignore
+        "expensive",
+        "1 of 2",
+    ]
+
+
+def log_from_child(logger: NamedLogger, /) -> None:
+    for i in range(3):
+        logger.info("message %s", i)
+    flush_logs()
+
+
+def test_child_process_sends_its_messages_in_one_batch() -> None:
+    message_queue: "mp.Queue[typing.Any]" = mp.Queue()
+    logger = NamedLogger(name="test", message_queue=message_queue)
+    p = mp.Process(target=log_from_child, args=(logger,))
+    p.start()
+    batch = message_queue.get(timeout=5)
+    p.join()
+    assert [msg.message for msg in batch] == ["message 0", "message 1", "message 2"]
+    assert message_queue.empty()
+
+
+def messages_in(message_queue: "queue.Queue[typing.Any]", /) -> typing.List[str]:
+    messages = []
+    while not message_queue.empty():
+        item = message_queue.get_nowait()
+        for msg in item if isinstance(item, tuple) else (item,):
+            messages.append(msg.message)
+    return messages
+
+
+def test_drop_debug_policy_keeps_other_levels() -> None:
+    message_queue: "queue.Queue[typing.Any]" = queue.Queue()
+    overflow = Overflow(message_queue=message_queue)  # type: ignore
+    debug = dataclasses.replace(message(1), level=domain.LogLevel.Debug)
+    overflow.handle((debug, message(2)), policy=domain.LogOverflowPolicy.DropDebug)
+    assert messages_in(message_queue) == ["message 2"]
+    overflow.report(force=True)
+    assert "1 messages were dropped" in messages_in(message_queue)[0]
+
+
+def test_drop_oldest_policy_makes_room_for_new_messages() -> None:
+    message_queue: "queue.Queue[typing.Any]" = queue.Queue(maxsize=2)
+    logger = NamedLogger(
+        name="test",
+        message_queue=message_queue,  # type: ignore
+        overflow_policy=domain.LogOverflowPolicy.DropOldest,
+    )
+    for i in range(4):
+        logger.info("message %s", i)
+    assert messages_in(message_queue) == ["message 2", "message 3"]
+    flush_logs()
+    summary = messages_in(message_queue)
+    assert len(summary) == 1
+    assert "2 messages were dropped" in summary[0]
+
+
+def test_sample_policy_keeps_one_in_ten_repeats() -> None:
+    message_queue: "queue.Queue[typing.Any]" = queue.Queue()
+    overflow = Overflow(message_queue=message_queue)  # type: ignore
+    for _ in range(20):
+        overflow.handle((message(1),), policy=domain.LogOverflowPolicy.Sample)
+    assert messages_in(message_queue) == ["message 1", "message 1"]
+    overflow.report(force=True)
+    assert "18 repeated messages were sampled out" in messages_in(message_queue)[0]
+
+
+def test_log_shipper_loads_and_deletes_closed_segments(
+    file_db: sa.engine.Engine, tmp_path: pathlib.Path
+) -> None:
+    segments = letl.SegmentLogRepo(folder=tmp_path / "segments")
+    shipper = LogShipper(segments=segments, repo=letl.DbLogRepo(engine=file_db))
+    segments.add_many([message(0), message(1)])
+    assert shipper.ship() == 0
+
+    segments.close()
+    assert shipper.ship() == 2
+    assert log_row_count(file_db) == 2
+    assert segments.closed_segments() == []
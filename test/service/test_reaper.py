@@ -0,0 +1,41 @@
+import multiprocessing as mp
+import signal
+import subprocess
+import time
+
+from letl.service.reaper import reap
+
+
+def stubborn(pids: "mp.Queue[int]") -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    child = subprocess.Popen(["sleep", "30"])
+    pids.put(child.pid)
+    time.sleep(30)
+
+
+def polite() -> None:
+    time.sleep(30)
+
+
+def test_process_that_ignores_sigterm_is_killed_with_its_children() -> None:
+    pids: "mp.Queue[int]" = mp.Queue()
+    p = mp.Process(target=stubborn, args=(pids,))
+    p.start()
+    pids.get(timeout=5)
+
+    reaped = reap(p, grace_seconds=0.2)
+
+    assert reaped.killed
+    assert reaped.descendants_killed == 1
+    assert not p.is_alive()
+
+
+def test_process_that_exits_on_sigterm_is_not_killed() -> None:
+    p = mp.Process(target=polite)
+    p.start()
+
+    reaped = reap(p, grace_seconds=5)
+
+    assert not reaped.killed
+    assert reaped.seconds < 5
+    assert not p.is_alive()
@@ -0,0 +1,189 @@
+import datetime
+import heapq
+import multiprocessing as mp
+import typing
+from unittest import mock
+
+import letl
+from letl.service.dispatcher import Dispatcher
+from letl.service.logger import NamedLogger
+from letl.service.scheduler import (
+    EventScheduler,
+    enqueue_ready_dependents,
+    next_check_time,
+)
+
+
+def status(
+    job_name: str, *, started: datetime.datetime, ended: typing.Optional[datetime.datetime]
+) -> letl.JobStatus:
+    return letl.JobStatus(
+        job_name=job_name,
+        status=letl.Status.Success if ended else letl.Status.Running,
+        skipped_reason=None,
+        started=started,
+        ended=ended,
+        error_message=None,
+    )
+
+
+def make_scheduler(
+    jobs: typing.List[letl.Job],
+    statuses: typing.Dict[str, letl.JobStatus],
+) -> typing.Tuple[EventScheduler, mock.Mock]:
+    status_repo = mock.create_autospec(letl.StatusRepo, instance=True)
+    status_repo.status_map.side_effect = lambda job_names: {
+        name: s for name, s in statuses.items() if name in job_names
+    }
+    dispatcher = mock.create_autospec(Dispatcher, instance=True)
+    dispatcher.dispatch.return_value = True
+    scheduler = EventScheduler(
+        status_repo=status_repo,
+        dispatcher=dispatcher,
+        jobs=jobs,
+        logger=NamedLogger(name="test", message_queue=mp.Queue()),
+        max_seconds_between_checks=60,
+    )
+    return scheduler, dispatcher
+
+
+def armed_at(scheduler: EventScheduler, job_name: str, /) -> datetime.datetime:
+    """When the job's current heap entry comes due"""
+    generation = scheduler._generation[job_name]
+    [ts] = [ts for ts, g, name in scheduler._heap if name == job_name and g == generation]
+    return ts
+
+
+def test_next_check_time_is_when_the_job_is_next_due(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30)
+    ended = now - datetime.timedelta(minutes=10)
+    job = make_job("a", every_seconds=3600)
+    assert next_check_time(
+        job=job,
+        status=status("a", started=ended, ended=ended),
+        now=now,
+        max_seconds_between_checks=7200,
+    ) == ended + datetime.timedelta(hours=1)
+
+
+def test_next_check_time_falls_back_to_max_seconds_between_checks(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30)
+    ended = now - datetime.timedelta(minutes=10)
+    assert next_check_time(
+        job=make_job("a", every_seconds=3600),
+        status=status("a", started=ended, ended=ended),
+        now=now,
+        max_seconds_between_checks=60,
+    ) == now + datetime.timedelta(seconds=60)
+
+
+def test_running_job_is_checked_again_when_it_would_time_out(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    now = datetime.datetime(2021, 5, 12, 10, 30)
+    started = now - datetime.timedelta(seconds=5)
+    # a timeout of 30 seconds, plus a 10 second grace period
+    assert next_check_time(
+        job=make_job("a", timeout_seconds=30),
+        status=status("a", started=started, ended=None),
+        now=now,
+        max_seconds_between_checks=600,
+    ) == started + datetime.timedelta(seconds=40)
+
+
+def test_stale_heap_entries_are_skipped(make_job: typing.Callable[..., letl.Job]) -> None:
+    scheduler, _ = make_scheduler([make_job("a")], {})
+    now = datetime.datetime.now()
+    scheduler._arm(job_name="a", ts=now + datetime.timedelta(seconds=5))
+    # re-arming leaves the earlier entry in the heap, but it no longer counts
+    scheduler._arm(job_name="a", ts=now + datetime.timedelta(seconds=50))
+    assert len(scheduler._heap) == 2
+    assert 45 < scheduler._seconds_until_next_check() <= 50
+    assert len(scheduler._heap) == 1
+
+
+def test_rearming_a_job_rearms_its_dependents(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    jobs = [make_job("a"), make_job("b", dependencies={"a"})]
+    scheduler, _ = make_scheduler(jobs, {})
+    later = datetime.datetime.now() + datetime.timedelta(hours=1)
+    scheduler._arm(job_name="a", ts=later)
+    scheduler._arm(job_name="b", ts=later)
+
+    scheduler.notify("a")
+    scheduler._rearm(job_name=scheduler._events.get_nowait())
+    assert armed_at(scheduler, "a") < later
+    assert armed_at(scheduler, "b") < later
+
+
+def test_dispatch_due_jobs_dispatches_ready_jobs_and_rearms_the_rest(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    now = datetime.datetime.now()
+    jobs = [
+        make_job("ready"),
+        make_job("running", timeout_seconds=30),
+        make_job("later"),
+    ]
+    statuses = {"running": status("running", started=now, ended=None)}
+    scheduler, dispatcher = make_scheduler(jobs, statuses)
+    for job in jobs:
+        scheduler._arm(job_name=job.job_name, ts=now)
+    # not due yet, so it is left in the heap
+    scheduler._arm(job_name="later", ts=now + datetime.timedelta(hours=1))
+
+    scheduler._dispatch_due_jobs()
+
+    dispatcher.dispatch.assert_called_once_with(
+        jobs[0], checked_at=mock.ANY, due_since=mock.ANY
+    )
+    # the job runner notifies the scheduler when the job starts, this is the safety net
+    assert armed_at(scheduler, "ready") >= now + datetime.timedelta(seconds=60)
+    # checked again once it would have timed out, capped at max_seconds_between_checks
+    running_check = armed_at(scheduler, "running")
+    assert now + datetime.timedelta(seconds=39) <= running_check
+    assert running_check <= now + datetime.timedelta(seconds=41)
+    assert armed_at(scheduler, "later") == now + datetime.timedelta(hours=1)
+    assert heapq.nsmallest(1, scheduler._heap)[0][0] > now
+
+
+def test_dependent_is_dispatched_after_its_last_prerequisite_succeeds(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    now = datetime.datetime.now()
+    earlier = now - datetime.timedelta(minutes=1)
+    jobs = [
+        make_job("a"),
+        make_job("b"),
+        make_job("c", dependencies={"a", "b"}),
+    ]
+    statuses = {"a": status("a", started=earlier, ended=earlier)}
+    status_repo = mock.create_autospec(letl.StatusRepo, instance=True)
+    status_repo.status_map.side_effect = lambda job_names: {
+        name: s for name, s in statuses.items() if name in job_names
+    }
+    dispatcher = mock.create_autospec(Dispatcher, instance=True)
+
+    def finish(job_name: str) -> None:
+        enqueue_ready_dependents(
+            job_name=job_name,
+            job_graph=letl.JobGraph(jobs),
+            dispatcher=dispatcher,
+            status_repo=status_repo,
+            logger=NamedLogger(name="test", message_queue=mp.Queue()),
+        )
+
+    # b hasn't run yet
+    finish("a")
+    dispatcher.dispatch.assert_not_called()
+
+    statuses["b"] = status("b", started=now, ended=now)
+    finish("b")
+    dispatcher.dispatch.assert_called_once_with(
+        jobs[2], checked_at=mock.ANY, due_since=mock.ANY
+    )
@@ -0,0 +1,67 @@
+import multiprocessing as mp
+import typing
+from unittest import mock
+
+import pytest
+
+import letl
+from letl.service.dispatcher import Dispatcher
+from letl.service.logger import NamedLogger
+from letl.service.shard_tracker import ShardTracker
+
+
+def by_day(config: letl.Config) -> typing.Iterator[letl.Config]:
+    for day in range(config.get("days", int)):
+        yield config.add_options(day=day)
+
+
+@pytest.fixture
+def partitioned_job(make_job: typing.Callable[..., letl.Job]) -> letl.Job:
+    return make_job("extract", config=letl.config(days=3), partitioner=by_day)
+
+
+def fan_out(
+    job: letl.Job, /
+) -> typing.Tuple[ShardTracker, Dispatcher, mock.Mock, typing.List[letl.Job]]:
+    status_repo = mock.create_autospec(letl.StatusRepo, instance=True)
+    dispatcher = Dispatcher(job_queue=letl.SetQueue(), runners=3)
+    tracker = ShardTracker(
+        status_repo=status_repo,
+        dispatcher=dispatcher,
+        logger=NamedLogger(name="test", message_queue=mp.Queue()),
+    )
+    dispatcher.dispatch(job)
+    dispatcher.take()
+    tracker.fan_out(job)
+    shards = [dispatcher.take()[0] for _ in range(3)]
+    return tracker, dispatcher, status_repo, sorted(shards, key=lambda s: s.job_name)
+
+
+def test_shards_are_queued_as_separate_jobs(partitioned_job: letl.Job) -> None:
+    tracker, dispatcher, status_repo, shards = fan_out(partitioned_job)
+    assert [shard.job_name for shard in shards] == ["extract[0]", "extract[1]", "extract[2]"]
+    assert [shard.config.get("day", int) for shard in shards] == [0, 1, 2]
+    assert all(tracker.is_shard(shard.job_name) for shard in shards)
+    status_repo.start.assert_called_once_with(job_name="extract")
+
+    # the job can't be queued again while its shards run
+    assert not dispatcher.dispatch(partitioned_job)
+
+
+def test_job_succeeds_when_all_shards_succeed(partitioned_job: letl.Job) -> None:
+    tracker, dispatcher, status_repo, shards = fan_out(partitioned_job)
+    for shard in shards:
+        status_repo.done.assert_not_called()
+        tracker.shard_finished(shard, letl.JobResult.success())
+    status_repo.done.assert_called_once_with(job_name="extract", metrics=None)
+    assert dispatcher.dispatch(partitioned_job)
+
+
+def test_job_fails_if_any_shard_fails(partitioned_job: letl.Job) -> None:
+    tracker, dispatcher, status_repo, shards = fan_out(partitioned_job)
+    tracker.shard_finished(shards[0], letl.JobResult.success())
+    tracker.shard_finished(shards[1], letl.JobResult.error(Exception("boom")))
+    tracker.shard_finished(shards[2], letl.JobResult.success())
+    status_repo.done.assert_not_called()
+    [call] = status_repo.error.call_args_list
+    assert "[extract[1]]" in call.kwargs["error"]
@@ -0,0 +1,73 @@
+import multiprocessing as mp
+import os
+import time
+import typing
+
+import letl
+from letl.service.logger import NamedLogger
+from letl.service.worker import Worker
+
+
+def report_pid(
+    config: letl.Config, logger: letl.Logger, resources: letl.ResourceManager
+) -> letl.JobResult:
+    return letl.JobResult.skipped(reason=str(os.getpid()))
+
+
+def hang(config: letl.Config, logger: letl.Logger, resources: letl.ResourceManager) -> None:
+    time.sleep(10)
+
+
+def make_worker(*, jobs: typing.List[letl.Job], max_jobs: int) -> Worker:
+    logger = NamedLogger(name="test", message_queue=mp.Queue())
+    return Worker(jobs=jobs, logger=logger, resources=frozenset(), max_jobs=max_jobs)
+
+
+def test_worker_process_is_reused_then_recycled(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    job = make_job("report_pid", report_pid)
+    worker = make_worker(jobs=[job], max_jobs=2)
+    try:
+        pids = [worker.run(job=job).skipped_reason for _ in range(3)]
+    finally:
+        worker.stop()
+    assert pids[0] == pids[1]
+    assert pids[1] != pids[2]
+    assert str(os.getpid()) not in pids
+
+
+def test_timed_out_worker_is_replaced(make_job: typing.Callable[..., letl.Job]) -> None:
+    job = make_job("hang", hang, timeout_seconds=1)
+    other_job = make_job("report_pid", report_pid)
+    worker = make_worker(jobs=[job], max_jobs=100)
+    try:
+        result = worker.run(job=job)
+        assert result.is_error
+        assert "timed out" in (result.error_message or "")
+
+        # not registered with the worker, so it is sent in full
+        assert worker.run(job=other_job).is_skipped
+    finally:
+        worker.stop()
+
+
+def busy(config: letl.Config, logger: letl.Logger, resources: letl.ResourceManager) -> None:
+    deadline = time.process_time() + 0.2
+    while time.process_time() < deadline:
+        pass
+
+
+def test_worker_measures_resources_used_by_the_job(
+    make_job: typing.Callable[..., letl.Job]
+) -> None:
+    job = make_job("busy", busy)
+    worker = make_worker(jobs=[job], max_jobs=100)
+    try:
+        metrics = worker.run(job=job).metrics
+    finally:
+        worker.stop()
+    assert metrics is not None
+    assert metrics.cpu_user_seconds is not None
+    assert metrics.cpu_user_seconds + (metrics.cpu_system_seconds or 0) >= 0.15
+    assert metrics.peak_rss_mb and metrics.peak_rss_mb > 0